@@ -1,7 +1,14 @@
 #!/bin/sh
 
-python /app/src/movies/utils/wait_for_elastic.py
-python -m gunicorn movies.main:create_app --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:8001
+# Prometheus metrics are collected from all gunicorn workers
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# The shared memory cache is created by the first worker
+rm -f "${NMA_SHARED_CACHE_PATH:-/dev/shm/movies-cache}"
+
+# The app is created once and forked to workers, see conf/gunicorn.conf.py
+python -m gunicorn -c /app/conf/gunicorn.conf.py
 
 # Run the main container process
 exec "$@"
@@ -0,0 +1,23 @@
+"""Gunicorn config.
+
+The app is created once in the master process and forked to workers (`movies.main.create_preloaded_app`),
+set `GUNICORN_PRELOAD=false` to create it in every worker.
+"""
+
+import os
+
+from prometheus_client import multiprocess
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8001")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+wsgi_app = "movies.main:create_preloaded_app()" if preload_app else "movies.main:create_app()"
+# Client addresses are taken from `X-Forwarded-For` of these proxies (Traefik), anonymous users are rate limited by them
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def child_exit(server, worker):
+    # Metrics files of the dead worker are merged, so gauges of live workers only are reported
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
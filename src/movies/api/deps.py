@@ -1,13 +1,22 @@
+import datetime
+import hmac
 from typing import ClassVar
+from uuid import UUID
 
-from jose import JWTError, jwt
+from dependency_injector.wiring import Provide, inject
+from jose import JWTError
 
-from fastapi import Depends, Query
+from fastapi import Depends, Header, Query, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from movies.common.constants import DEFAULT_PAGE_SIZE
-from movies.common.exceptions import AuthorizationError
+from movies.common.exceptions import AuthorizationError, BadRequestError, TooManyRequestsError
+from movies.containers import Container
+from movies.core import tracing
 from movies.core.config import get_settings
+from movies.core.rate_limit import RateLimiter
+from movies.core.security import TokenRolesCache
+from movies.domain.films import FilmAgeRating, FilmFilter
 
 settings = get_settings()
 
@@ -52,13 +61,109 @@ class SortQueryParams:
         return formatted_param
 
 
-def get_user_roles(token: HTTPAuthorizationCredentials | None = Depends(jwt_scheme)) -> list[str]:
-    """Get user roles from JWT claim."""
+class SliceQueryParams:
+    """Sliced export query parameters."""
+
+    def __init__(
+        self,
+        slice_id: int | None = Query(default=None, alias="slice[id]", ge=0, description="Slice id."),
+        slice_max: int | None = Query(
+            default=None, alias="slice[max]", ge=1, le=settings.EXPORT_MAX_SLICES, description="Number of slices."),
+    ) -> None:
+        if (slice_id is None) != (slice_max is None):
+            raise BadRequestError("Both `slice[id]` and `slice[max]` must be specified")
+        if slice_id is not None and slice_id >= slice_max:
+            raise BadRequestError("`slice[id]` must be less than `slice[max]`")
+        self.slice_id = slice_id
+        self.slice_max = slice_max
+
+
+class FilmFilterQueryParams:
+    """Films filter query parameters.
+
+    Any of repeated values of a parameter matches, e.g. `filter[genre]=Comedy&filter[genre]=Drama`.
+    """
+
+    def __init__(
+        self,
+        genre: list[str] | None = Query(default=None, alias="filter[genre]", description="Genre name."),
+        age_rating: list[FilmAgeRating] | None = Query(
+            default=None, alias="filter[age_rating]", description="Age rating."),
+        release_date_gte: datetime.date | None = Query(
+            default=None, alias="filter[release_date][gte]", description="Minimal release date."),
+        release_date_lte: datetime.date | None = Query(
+            default=None, alias="filter[release_date][lte]", description="Maximal release date."),
+        imdb_rating_gte: float | None = Query(
+            default=None, alias="filter[imdb_rating][gte]", description="Minimal IMDb rating."),
+        imdb_rating_lte: float | None = Query(
+            default=None, alias="filter[imdb_rating][lte]", description="Maximal IMDb rating."),
+        person: UUID | None = Query(
+            default=None, alias="filter[person]", description="Id of an actor, writer or director."),
+    ) -> None:
+        if release_date_gte is not None and release_date_lte is not None and release_date_gte > release_date_lte:
+            raise BadRequestError("`filter[release_date][gte]` must not be greater than `filter[release_date][lte]`")
+        if imdb_rating_gte is not None and imdb_rating_lte is not None and imdb_rating_gte > imdb_rating_lte:
+            raise BadRequestError("`filter[imdb_rating][gte]` must not be greater than `filter[imdb_rating][lte]`")
+        self.filters = FilmFilter(
+            genre=genre or [], age_rating=age_rating or [],
+            release_date_gte=release_date_gte, release_date_lte=release_date_lte,
+            imdb_rating_gte=imdb_rating_gte, imdb_rating_lte=imdb_rating_lte,
+            person=person,
+        )
+
+
+@inject
+async def get_user_roles(
+    token: HTTPAuthorizationCredentials | None = Depends(jwt_scheme),
+    token_roles_cache: TokenRolesCache = Depends(Provide[Container.token_roles_cache]),
+) -> list[str]:
+    """Get user roles from JWT claim.
+
+    Roles of verified tokens are cached, so the same token isn't decoded on every request.
+    """
     if token is None:
         return []
     try:
-        payload = jwt.decode(token.credentials, settings.JWT_AUTH_SECRET_KEY, algorithms=[settings.JWT_AUTH_ALGORITHM])
-        roles: list[str] = payload.get("roles")
+        with tracing.span("auth.decode_token"):
+            roles: list[str] = token_roles_cache.get_roles(token.credentials)
     except JWTError:
         raise AuthorizationError
     return roles
+
+
+@inject
+async def check_rate_limit(
+    request: Request,
+    token: HTTPAuthorizationCredentials | None = Depends(jwt_scheme),
+    token_roles_cache: TokenRolesCache = Depends(Provide[Container.token_roles_cache]),
+    rate_limiter: RateLimiter = Depends(Provide[Container.rate_limiter]),
+) -> None:
+    """Check the rate limit of the route for the client: the JWT subject or the IP address for anonymous users.
+
+    Raise 429 with `Retry-After` if the limit is exceeded.
+    """
+    retry_after = rate_limiter.hit(request.scope["route"].path, _get_client_key(request, token, token_roles_cache))
+    if retry_after is not None:
+        raise TooManyRequestsError(retry_after=retry_after)
+
+
+def _get_client_key(
+    request: Request, token: HTTPAuthorizationCredentials | None, token_roles_cache: TokenRolesCache, /,
+) -> str:
+    if token is not None:
+        try:
+            subject = token_roles_cache.get_subject(token.credentials)
+        except JWTError:
+            subject = None
+        if subject is not None:
+            return f"user:{subject}"
+    host = request.client.host if request.client is not None else "unknown"
+    return f"ip:{host}"
+
+
+def verify_profiling_token(token: str | None = Header(default=None, alias="X-Profile-Token")) -> None:
+    """Verify the profiling token from the `X-Profile-Token` header."""
+    if settings.PROFILING_TOKEN is None or token is None:
+        raise AuthorizationError
+    if not hmac.compare_digest(token.encode(), settings.PROFILING_TOKEN.encode()):
+        raise AuthorizationError
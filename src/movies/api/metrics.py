@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from movies.core.metrics import export_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    content, content_type = export_metrics()
+    return Response(content=content, media_type=content_type)
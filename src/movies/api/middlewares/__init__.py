@@ -0,0 +1,13 @@
+from .concurrency import ConcurrencyLimitMiddleware
+from .identity_map import IdentityMapMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .tracing import TracingMiddleware
+
+__all__ = [
+    "ConcurrencyLimitMiddleware",
+    "IdentityMapMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+    "TracingMiddleware",
+]
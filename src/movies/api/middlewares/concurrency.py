@@ -0,0 +1,89 @@
+import re
+from typing import Mapping
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from movies.api.responses import ORJSONResponse
+from movies.common.exceptions import ServiceUnavailableError
+from movies.core import concurrency
+from movies.core.metrics import CONCURRENCY_LIMIT, SHED_REQUESTS
+
+
+class ConcurrencyLimitMiddleware:
+    """Shed requests over the adaptive concurrency limit of their route group with 503 and `Retry-After`.
+
+    Every group (e.g. films list, search, details) has its own limit, so a slow group doesn't starve others.
+    A request belongs to the first group whose pattern matches its path, requests of other paths are not limited.
+    Limits are adjusted by latency of Elasticsearch calls made by requests and by server errors
+    (see `concurrency.AIMDLimiter`).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        groups: Mapping[str, str],
+        retry_after: int = 1,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        latency_threshold: float = 0.25,
+        backoff_ratio: float = 0.9,
+    ) -> None:
+        self.app = app
+        self.retry_after = retry_after
+        self.groups: list[tuple[str, re.Pattern, concurrency.AIMDLimiter]] = []
+        for name, pattern in groups.items():
+            limiter = concurrency.AIMDLimiter(
+                initial_limit=initial_limit,
+                min_limit=min_limit,
+                max_limit=max_limit,
+                latency_threshold=latency_threshold,
+                backoff_ratio=backoff_ratio,
+            )
+            self.groups.append((name, re.compile(pattern), limiter))
+        # limits are reported by workers on their first request: the app may be created in the gunicorn master,
+        # which doesn't serve requests and would keep a series of the `liveall` gauge forever
+        self._limits_reported = False
+
+    def get_group(self, path: str) -> tuple[str, concurrency.AIMDLimiter] | None:
+        """Get the name and the limiter of the first group whose pattern matches the path."""
+        return next(((name, limiter) for name, pattern, limiter in self.groups if pattern.match(path)), None)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not self._limits_reported:
+            for name, _, limiter in self.groups:
+                CONCURRENCY_LIMIT.labels(group=name).set(limiter.limit)
+            self._limits_reported = True
+
+        group = self.get_group(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        name, limiter = group
+        if not limiter.try_acquire():
+            SHED_REQUESTS.labels(group=name).inc()
+            error = ServiceUnavailableError()
+            response = ORJSONResponse(
+                status_code=error.status_code, content=error.to_dict(), headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with concurrency.sample_scope() as sample:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                limiter.release(sample.backend_latency, dropped=status_code >= 500)
+                CONCURRENCY_LIMIT.labels(group=name).set(limiter.limit)
@@ -0,0 +1,17 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from movies.infrastructure.db.repositories import identity_map_scope
+
+
+class IdentityMapMiddleware:
+    """Open a new identity map for every request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with identity_map_scope():
+            await self.app(scope, receive, send)
@@ -0,0 +1,39 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from movies.core.metrics import REQUEST_LATENCY
+
+
+class MetricsMiddleware:
+    """Measure latency of HTTP requests.
+
+    Requests are labeled by the route path template (e.g. `/api/v1/films/{uuid}`), so the number of series is bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status_code=status_code,
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,67 @@
+import hmac
+import random
+import time
+from typing import ClassVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from movies.core import profiling
+
+
+class ProfilingMiddleware:
+    """Profile a sampled fraction of requests and requests with the profiling token header.
+
+    Profiles are saved to the given buffer.
+    """
+
+    TOKEN_HEADER: ClassVar[bytes] = b"x-profile-token"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        buffer: profiling.ProfileBuffer,
+        sample_rate: float = 0.0,
+        token: str | None = None,
+        collect_stats: bool = True,
+    ) -> None:
+        self.app = app
+        self.buffer = buffer
+        self.sample_rate = sample_rate
+        self.token = token.encode() if token else None
+        self.collect_stats = collect_stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._get_reason(scope)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiling.RequestProfile(method=scope["method"], path=scope["path"], reason=reason)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            with profiling.profile_scope(profile, collect_stats=self.collect_stats):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            profile.route = getattr(scope.get("route"), "path", None)
+            self.buffer.add(profile)
+
+    def _get_reason(self, scope: Scope) -> str | None:
+        """Get reason for profiling the request, `None` if the request should not be profiled."""
+        if self.token is not None:
+            token = next((value for name, value in scope["headers"] if name == self.TOKEN_HEADER), None)
+            if token is not None and hmac.compare_digest(token, self.token):
+                return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
@@ -0,0 +1,39 @@
+from opentelemetry.trace import Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from movies.core import tracing
+
+
+class TracingMiddleware:
+    """Start a root span for every HTTP request.
+
+    The span is named by the route path template (e.g. `GET /api/v1/persons/{uuid}/films`)
+    once the route has been resolved.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracing.is_tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        attributes = {"http.method": method, "http.target": scope["path"]}
+        with tracing.span(f"{method} {scope['path']}", attributes, kind=tracing.SpanKind.SERVER) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.update_name(f"{method} {route.path}")
+                    span.set_attribute("http.route", route.path)
@@ -0,0 +1,13 @@
+from typing import Any
+
+from fastapi.responses import ORJSONResponse as BaseORJSONResponse
+
+from movies.core import tracing
+
+
+class ORJSONResponse(BaseORJSONResponse):
+    """ORJSON response, rendering is traced."""
+
+    def render(self, content: Any) -> bytes:
+        with tracing.span("response.render"):
+            return super().render(content)
@@ -0,0 +1,30 @@
+from dependency_injector.wiring import Provide, inject
+
+from fastapi import APIRouter, Depends
+
+from movies.api.deps import verify_profiling_token
+from movies.common.exceptions import NotFoundError
+from movies.containers import Container
+from movies.core.profiling import ProfileBuffer
+
+router = APIRouter(tags=["Admin"], dependencies=[Depends(verify_profiling_token)], include_in_schema=False)
+
+
+@router.get("/profiles", summary="Request profiles")
+@inject
+async def get_profiles(profile_buffer: ProfileBuffer = Depends(Provide[Container.profile_buffer])):
+    """Get the latest request profiles (without cProfile stats), latest first.
+
+    Requires the `X-Profile-Token` header.
+    """
+    return [profile.to_dict(with_stats=False) for profile in profile_buffer.list()]
+
+
+@router.get("/profiles/{profile_id}", summary="Request profile")
+@inject
+async def get_profile(profile_id: int, profile_buffer: ProfileBuffer = Depends(Provide[Container.profile_buffer])):
+    """Get request profile with cProfile stats."""
+    profile = profile_buffer.get(profile_id)
+    if profile is None:
+        raise NotFoundError
+    return profile.to_dict()
@@ -0,0 +1,66 @@
+from uuid import UUID
+
+from dependency_injector.wiring import Provide, inject
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from movies.api.deps import SliceQueryParams, get_user_roles
+from movies.containers import Container
+from movies.domain.exports import ExportResource, ExportService, gzip_stream
+from movies.domain.films import FilmAccessType
+from movies.domain.users import UserService
+
+router = APIRouter(tags=["Export"])
+
+
+@router.get("/{resource}", response_class=StreamingResponse, summary="Bulk export")
+@inject
+async def export_resource(
+    request: Request,
+    resource: ExportResource,
+    slice_params: SliceQueryParams = Depends(SliceQueryParams),
+    after: UUID | None = Query(default=None, description="Resume token: `uuid` of the last received document."),
+    user_roles: list[str] = Depends(get_user_roles),
+    export_service: ExportService = Depends(Provide[Container.export_service]),
+    user_service: UserService = Depends(Provide[Container.user_service]),
+):
+    """Export all documents of the resource as NDJSON.
+
+    Documents are sorted by `uuid`: pass `uuid` of the last received document in `after` to resume the export.
+    Use `slice[id]` and `slice[max]` to export the resource with several parallel requests.
+    The response is compressed with gzip if the client accepts it (`Accept-Encoding: gzip`, but not `gzip;q=0`).
+
+    Example: `GET /api/v1/export/films?slice[id]=0&slice[max]=4`.
+    """
+    filter_fields = None
+    if resource is ExportResource.FILMS and not user_service.is_subscriber(user_roles):
+        filter_fields = {"access_type": FilmAccessType.PUBLIC.value}
+    content = export_service.export(
+        resource,
+        slice_id=slice_params.slice_id, max_slices=slice_params.slice_max,
+        after=None if after is None else str(after),
+        filter_fields=filter_fields,
+    )
+    headers = {}
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        content = gzip_stream(content)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(content, media_type="application/x-ndjson", headers=headers)
+
+
+def _accepts_gzip(accept_encoding: str, /) -> bool:
+    """Check that `Accept-Encoding` accepts gzip: listed (or `*` if gzip isn't listed) with a non-zero q-value."""
+    qvalues = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        qvalue = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding.lower()] = qvalue
+    return qvalues.get("gzip", qvalues.get("*", 0.0)) > 0
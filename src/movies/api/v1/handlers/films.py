@@ -2,11 +2,13 @@ from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query
 
-from movies.api.deps import PageNumberPaginationQueryParams, SortQueryParams, get_user_roles
+from movies.api.deps import (
+    FilmFilterQueryParams, PageNumberPaginationQueryParams, SortQueryParams, check_rate_limit, get_user_roles,
+)
 from movies.containers import Container
-from movies.domain.films import FilmDetail, FilmList, FilmRepository
+from movies.domain.films import FilmDetail, FilmList, FilmRepository, FilmSuggestion
 from movies.domain.users import UserService
 
 router = APIRouter(tags=["Films"])
@@ -15,10 +17,9 @@ router = APIRouter(tags=["Films"])
 @router.get("/", response_model=list[FilmList], summary="Films")
 @inject
 async def get_films(
-    request: Request,
     sort_params: SortQueryParams = Depends(SortQueryParams),
     pagination_params: PageNumberPaginationQueryParams = Depends(PageNumberPaginationQueryParams),
-    genre: str | None = Query(default=None, alias="filter[genre]", description="Genre filter."),
+    filter_params: FilmFilterQueryParams = Depends(FilmFilterQueryParams),
     user_roles: list[str] = Depends(get_user_roles),
     film_repository: FilmRepository = Depends(Provide[Container.film_repository]),
     user_service: UserService = Depends(Provide[Container.user_service]),
@@ -29,24 +30,29 @@ async def get_films(
 
     Sorting `sort`: https://www.elastic.co/guide/en/elasticsearch/reference/current/sort-search-results.html.
 
-    Example: `GET /api/v1/films?sort=-imdb_rating`.
+    Filters `filter[...]`: genre, age rating, release date and IMDb rating ranges, person (any role).
+
+    Example: `GET /api/v1/films?sort=-imdb_rating&filter[genre]=Comedy&filter[imdb_rating][gte]=7`.
     """
     is_subscriber = user_service.is_subscriber(user_roles)
     params = {
-        "url": request.url.query,
         "page_size": pagination_params.page_size, "page_number": pagination_params.page_number,
         "sort": sort_params.sort,
-        "genre": genre,
+        "filters": filter_params.filters,
     }
     if is_subscriber:
         return await film_repository.get_all(**params)
     return await film_repository.get_public(**params)
 
 
-@router.get("/search", response_model=list[FilmList], summary="Films search")
+@router.get(
+    "/search",
+    response_model=list[FilmList],
+    summary="Films search",
+    dependencies=[Depends(check_rate_limit)],
+)
 @inject
 async def search_films(
-    request: Request,
     sort_params: SortQueryParams = Depends(SortQueryParams),
     pagination_params: PageNumberPaginationQueryParams = Depends(PageNumberPaginationQueryParams),
     query: str = Query(..., description="Search query.", required=True),
@@ -59,11 +65,25 @@ async def search_films(
     Example: `GET /api/v1/films/search?sort=-imdb_rating`.
     """
     return await film_repository.search(
-        query=query, url=request.url.query,
+        query=query,
         page_size=pagination_params.page_size, page_number=pagination_params.page_number, sort=sort_params.sort,
     )
 
 
+@router.get("/suggest", response_model=list[FilmSuggestion], summary="Films suggestions")
+@inject
+async def suggest_films(
+    query: str = Query(..., max_length=100, description="Beginning of a film title."),
+    size: int = Query(default=10, ge=1, le=20, description="Number of suggestions."),
+    film_repository: FilmRepository = Depends(Provide[Container.film_repository]),
+):
+    """Suggest films by the beginning of their titles (search-as-you-type), only ids and titles are returned.
+
+    Example: `GET /api/v1/films/suggest?query=star w`.
+    """
+    return await film_repository.suggest(query, size)
+
+
 @router.get("/{uuid}", response_model=FilmDetail, summary="Film")
 @inject
 async def get_film(
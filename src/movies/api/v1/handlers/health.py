@@ -1,9 +1,64 @@
-from fastapi import APIRouter
+from http import HTTPStatus
+
+from dependency_injector.wiring import Provide, inject
+
+from fastapi import APIRouter, Depends
+
+from movies.api.responses import ORJSONResponse
+from movies.containers import Container
+from movies.core import health
+from movies.core.health import DependencyChecks, HealthProbes, Readiness
 
 router = APIRouter(tags=["health"])
 
 
 @router.get("/", summary="Service health")
 async def healthcheck():
-    """Check service health."""
+    """Check service health (liveness)."""
+    return {"status": "ok"}
+
+
+@router.get("/live", summary="Service liveness")
+async def liveness_check():
+    """Check that the worker is up and responds."""
     return {"status": "ok"}
+
+
+@router.get("/ready", summary="Service readiness")
+@inject
+async def readiness_check(
+    readiness: Readiness = Depends(Provide[Container.readiness]),
+    dependency_checks: DependencyChecks = Depends(Provide[Container.dependency_checks]),
+):
+    """Check that the worker is ready to serve traffic.
+
+    The worker is ready if its resources are initialized, it isn't shutting down and Elasticsearch and Redis
+    are reachable (they are checked concurrently). Return 503 with the reasons the worker isn't ready otherwise.
+    """
+    if not readiness.is_ready:
+        return ORJSONResponse(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE, content={"status": "not_ready", "reasons": readiness.reasons},
+        )
+    checks = await dependency_checks.run()
+    unavailable = [name for name, available in checks.items() if not available]
+    if unavailable:
+        return ORJSONResponse(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            content={"status": "not_ready", "reasons": unavailable, "checks": checks},
+        )
+    return {"status": "ok", "checks": checks}
+
+
+@router.get("/deep", summary="Service deep health")
+@inject
+async def deep_health_check(health_probes: HealthProbes = Depends(Provide[Container.health_probes])):
+    """Get the state of Elasticsearch, Redis master, replica and Sentinel with their recent latency percentiles.
+
+    Backends are probed in the background, so the endpoint doesn't add load to them.
+    Return 503 if a backend is down. Degraded backends (shared by all workers) are reported with 200,
+    so load balancers don't take every worker out of rotation at once.
+    """
+    report = health_probes.report()
+    if report["status"] == health.DOWN:
+        return ORJSONResponse(status_code=HTTPStatus.SERVICE_UNAVAILABLE, content=report)
+    return report
@@ -4,7 +4,7 @@ from dependency_injector.wiring import Provide, inject
 
 from fastapi import APIRouter, Depends, Query, Request
 
-from movies.api.deps import PageNumberPaginationQueryParams
+from movies.api.deps import PageNumberPaginationQueryParams, check_rate_limit
 from movies.containers import Container
 from movies.domain.films import FilmList
 from movies.domain.persons.repositories import PersonRepository
@@ -26,21 +26,36 @@ async def get_persons(
         url=request.url.query, page_size=pagination_params.page_size, page_number=pagination_params.page_number)
 
 
-@router.get("/search", response_model=list[PersonShortDetail], summary="Persons search")
+@router.get(
+    "/search",
+    response_model=list[PersonShortDetail],
+    summary="Persons search",
+    dependencies=[Depends(check_rate_limit)],
+)
 @inject
 async def search_persons(
-    request: Request,
     pagination_params: PageNumberPaginationQueryParams = Depends(PageNumberPaginationQueryParams),
     query: str = Query(..., description="Search query.", required=True),
     person_repository: PersonRepository = Depends(Provide[Container.person_repository]),
 ):
     """Persons search."""
     return await person_repository.search(
-        query=query, url=request.url.query,
+        query=query,
         page_size=pagination_params.page_size, page_number=pagination_params.page_number,
     )
 
 
+@router.get("/suggest", response_model=list[PersonList], summary="Persons suggestions")
+@inject
+async def suggest_persons(
+    query: str = Query(..., max_length=100, description="Beginning of a person full name."),
+    size: int = Query(default=10, ge=1, le=20, description="Number of suggestions."),
+    person_repository: PersonRepository = Depends(Provide[Container.person_repository]),
+):
+    """Suggest persons by the beginning of their full names (search-as-you-type), only ids and names are returned."""
+    return await person_repository.suggest(query, size)
+
+
 @router.get("/{uuid}", response_model=PersonShortDetail, summary="Person")
 @inject
 async def get_person(
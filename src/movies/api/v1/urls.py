@@ -1,12 +1,14 @@
 from fastapi import APIRouter
 
-from movies.api.v1.handlers import films, genres, health, persons
+from movies.api.v1.handlers import admin, export, films, genres, health, persons
 
 api_v1_router = APIRouter(prefix="/v1")
 
 api_v1_router.include_router(router=films.router, prefix="/films")
 api_v1_router.include_router(router=genres.router, prefix="/genres")
 api_v1_router.include_router(router=persons.router, prefix="/persons")
+api_v1_router.include_router(router=export.router, prefix="/export")
+api_v1_router.include_router(router=admin.router, prefix="/admin")
 
 # Healthcheck
 api_v1_router.include_router(router=health.router, prefix="/healthcheck")
@@ -1,3 +1,4 @@
+import math
 from http import HTTPStatus
 
 
@@ -7,6 +8,7 @@ class APIErrorMixin:
     message: str
     code: str
     status_code: int = HTTPStatus.INTERNAL_SERVER_ERROR
+    headers: dict[str, str] | None = None
 
     def __init__(self, message: str | None = None, code: str | None = None):
         if message is not None:
@@ -57,3 +59,31 @@ class AuthorizationError(NetflixMoviesError):
     message = "Authorization error"
     code = "authorization_error"
     status_code = HTTPStatus.UNAUTHORIZED
+
+
+class BadRequestError(NetflixMoviesError):
+    """Invalid request."""
+
+    message = "Bad request"
+    code = "bad_request"
+    status_code = HTTPStatus.BAD_REQUEST
+
+
+class ServiceUnavailableError(NetflixMoviesError):
+    """Service is overloaded."""
+
+    message = "Service is overloaded, retry later"
+    code = "service_unavailable"
+    status_code = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+class TooManyRequestsError(NetflixMoviesError):
+    """Client has exceeded the rate limit."""
+
+    message = "Too many requests, retry later"
+    code = "too_many_requests"
+    status_code = HTTPStatus.TOO_MANY_REQUESTS
+
+    def __init__(self, message: str | None = None, code: str | None = None, *, retry_after: float = 1) -> None:
+        super().__init__(message, code)
+        self.headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
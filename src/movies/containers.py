@@ -1,8 +1,12 @@
 from dependency_injector import containers, providers
 
+from movies.core import health, profiling, rate_limit, security, tasks
 from movies.core.logging import configure_logger
-from movies.domain import films, genres, persons, users
-from movies.infrastructure.db import cache, elastic, redis, repositories, storage
+from movies.core.tracing import configure_tracing
+from movies.domain import exports, films, genres, persons, search, suggestions, users
+from movies.infrastructure.db import (
+    cache, compression, elastic, rate_limits, redis, repositories, shared_memory, storage, stubs, views,
+)
 
 
 class Container(containers.DeclarativeContainer):
@@ -13,6 +17,10 @@ class Container(containers.DeclarativeContainer):
             "movies.api.v1.handlers.genres",
             "movies.api.v1.handlers.films",
             "movies.api.v1.handlers.persons",
+            "movies.api.v1.handlers.export",
+            "movies.api.v1.handlers.admin",
+            "movies.api.v1.handlers.health",
+            "movies.api.deps",
         ],
     )
 
@@ -20,6 +28,32 @@ class Container(containers.DeclarativeContainer):
 
     logging = providers.Resource(configure_logger)
 
+    tracing = providers.Resource(
+        configure_tracing,
+        enabled=config.TRACING_ENABLED,
+        service_name=config.PROJECT_NAME,
+        exporter=config.TRACING_EXPORTER,
+        jaeger_host=config.TRACING_JAEGER_HOST,
+        jaeger_port=config.TRACING_JAEGER_PORT,
+        file_path=config.TRACING_FILE_PATH,
+    )
+
+    readiness = providers.Singleton(health.Readiness)
+
+    profile_buffer = providers.Singleton(profiling.ProfileBuffer, size=config.PROFILING_BUFFER_SIZE)
+
+    token_roles_cache = providers.Singleton(
+        security.TokenRolesCache,
+        backend=providers.Singleton(
+            security.get_jwt_backend,
+            config.JWT_AUTH_BACKEND,
+            secret_key=config.JWT_AUTH_SECRET_KEY,
+            algorithm=config.JWT_AUTH_ALGORITHM,
+        ),
+        max_size=config.JWT_CACHE_SIZE,
+        max_ttl=config.JWT_CACHE_MAX_TTL,
+    )
+
     # Infrastructure
 
     elastic_connection = providers.Resource(
@@ -53,15 +87,89 @@ class Container(containers.DeclarativeContainer):
         ),
     )
 
+    dependency_checks = providers.Singleton(
+        health.DependencyChecks,
+        checks=providers.Dict(
+            elasticsearch=elastic_client.provided.ping,
+            redis=redis_client.provided.ping,
+        ),
+        timeout=config.HEALTH_CHECK_TIMEOUT,
+    )
+
+    health_probes = providers.Singleton(
+        health.HealthProbes,
+        probes=providers.Dict(
+            elasticsearch=elastic_client.provided.health,
+            redis_master=redis_client.provided.ping,
+            redis_replica=redis_client.provided.ping_replica,
+            redis_sentinel=redis_client.provided.sentinel_state,
+        ),
+        timeout=config.HEALTH_CHECK_TIMEOUT,
+        window=config.HEALTH_PROBES_WINDOW,
+        latency_threshold=config.HEALTH_PROBES_LATENCY_THRESHOLD,
+    )
+
+    health_probes_task = providers.Resource(
+        tasks.periodic_task,
+        health_probes.provided.probe,
+        interval=config.HEALTH_PROBES_INTERVAL,
+        name="health_probes",
+        enabled=config.HEALTH_PROBES_ENABLED,
+    )
+
+    cache_compression = providers.Singleton(
+        compression.CacheCompression,
+        algorithm=config.CACHE_COMPRESSION_ALGORITHM,
+        min_size=config.CACHE_COMPRESSION_MIN_SIZE,
+    )
+
+    # Cache values are bytes: they are loaded with orjson and may be compressed
+    redis_cache_client = providers.Singleton(
+        redis.RedisClient,
+        sentinel_client=redis_sentinel_connection,
+        service_name=config.REDIS_MASTER_SET,
+        connection_options=providers.Dict(
+            dict_={
+                "password": config.REDIS_PASSWORD,
+                "decode_responses": False,
+                "retry_on_timeout": config.REDIS_RETRY_ON_TIMEOUT,
+            },
+        ),
+    )
+
     redis_cache = providers.Singleton(
         cache.RedisCache,
-        client=redis_client,
+        client=redis_cache_client,
         default_ttl=config.CACHE_DEFAULT_TTL,
+        compression=cache_compression,
+    )
+
+    shared_memory_cache = providers.Resource(
+        shared_memory.init_shared_memory_cache,
+        enabled=config.SHARED_CACHE_ENABLED,
+        path=config.SHARED_CACHE_PATH,
+        slots=config.SHARED_CACHE_SLOTS,
+        slot_size=config.SHARED_CACHE_SLOT_SIZE,
+        default_ttl=config.SHARED_CACHE_TTL,
+    )
+
+    tiered_cache = providers.Singleton(
+        cache.TieredCache,
+        remote=redis_cache,
+        local=shared_memory_cache,
+        local_ttl=config.SHARED_CACHE_TTL,
     )
 
     cache_repository = providers.Singleton(
         repositories.CacheRepository,
-        cache=redis_cache,
+        cache=tiered_cache,
+    )
+
+    # Suggestions are requested on every keystroke: they are cached for a short time
+    suggest_cache_repository = providers.Singleton(
+        repositories.CacheRepository,
+        cache=tiered_cache,
+        cache_ttl=config.SUGGEST_CACHE_TTL,
     )
 
     cache_key_builder = providers.Singleton(cache.CacheKeyBuilder)
@@ -71,22 +179,60 @@ class Container(containers.DeclarativeContainer):
         client=elastic_client,
     )
 
+    identity_map = providers.Callable(repositories.get_identity_map)
+
+    view_store = providers.Singleton(
+        views.RedisViewStore,
+        client=redis_cache_client,
+    )
+
+    rate_limit_store = providers.Singleton(
+        rate_limits.RedisRateLimitStore,
+        client=redis_cache_client,
+    )
+
+    rate_limiter = providers.Singleton(
+        rate_limit.RateLimiter,
+        store=rate_limit_store,
+        limits=config.RATE_LIMITS,
+        enabled=config.RATE_LIMIT_ENABLED,
+        local_share=config.RATE_LIMIT_LOCAL_SHARE,
+    )
+
+    rate_limiter_sync = providers.Resource(
+        tasks.periodic_task,
+        rate_limiter.provided.sync,
+        interval=config.RATE_LIMIT_SYNC_INTERVAL,
+        name="rate_limiter_sync",
+        enabled=config.RATE_LIMIT_ENABLED,
+    )
+
     # Domain -> Genres
 
+    genre_elastic_repository = providers.Singleton(
+        repositories.ElasticRepository,
+        storage=elastic_storage,
+        index_name="genre",
+    )
+
     genre_repository = providers.Singleton(
         genres.GenreRepository,
         storage_repository=providers.Singleton(
             repositories.ElasticCacheRepository,
-            elastic_repository=providers.Singleton(
-                repositories.ElasticRepository,
-                storage=elastic_storage,
-                index_name="genre",
-            ),
+            elastic_repository=genre_elastic_repository,
             cache_repository=cache_repository,
+            identity_map=identity_map.provider,
             key_factory=providers.Callable(genres.genre_key_factory).provider,
         ),
     )
 
+    # Domain -> Search
+
+    query_normalizer = providers.Singleton(
+        search.QueryNormalizer,
+        remove_stopwords=config.SEARCH_QUERY_REMOVE_STOPWORDS,
+    )
+
     # Domain -> Films
 
     film_key_factory_ = providers.Callable(
@@ -95,18 +241,86 @@ class Container(containers.DeclarativeContainer):
         min_length=config.CACHE_HASHED_KEY_LENGTH,
     )
 
+    film_elastic_repository = providers.Singleton(
+        repositories.ElasticRepository,
+        storage=elastic_storage,
+        index_name="movies",
+        nested_fields=["genre", "actors", "writers", "directors"],
+    )
+
+    film_genre_views = providers.Singleton(
+        films.FilmGenreViews,
+        store=view_store,
+        storage_repository=film_elastic_repository,
+        genre_storage_repository=genre_elastic_repository,
+        enabled=config.FILMS_GENRE_VIEWS_ENABLED,
+        sorts=config.FILMS_GENRE_VIEWS_SORTS,
+        depth=config.FILMS_GENRE_VIEWS_DEPTH,
+        refresh_interval=config.FILMS_GENRE_VIEWS_REFRESH_INTERVAL,
+    )
+
+    film_genre_views_refresh = providers.Resource(
+        tasks.periodic_task,
+        film_genre_views.provided.refresh,
+        interval=config.FILMS_GENRE_VIEWS_REFRESH_INTERVAL,
+        name="film_genre_views_refresh",
+        enabled=config.FILMS_GENRE_VIEWS_ENABLED,
+    )
+
+    film_rating_index = providers.Singleton(
+        films.FilmRatingIndex,
+        store=view_store,
+        storage=elastic_storage,
+        index_name="movies",
+        enabled=config.FILMS_RATING_INDEX_ENABLED,
+        sync_interval=config.FILMS_RATING_INDEX_SYNC_INTERVAL,
+    )
+
+    film_rating_index_sync = providers.Resource(
+        tasks.periodic_task,
+        film_rating_index.provided.refresh,
+        interval=config.FILMS_RATING_INDEX_SYNC_INTERVAL,
+        name="film_rating_index_sync",
+        enabled=config.FILMS_RATING_INDEX_ENABLED,
+    )
+
+    film_suggest_index = providers.Singleton(
+        suggestions.SuggestIndex,
+        storage=elastic_storage,
+        index_name="movies",
+        field="title",
+        enabled=config.SUGGEST_INDEX_ENABLED,
+    )
+
+    film_suggest_index_refresh = providers.Resource(
+        tasks.periodic_task,
+        film_suggest_index.provided.refresh,
+        interval=config.SUGGEST_INDEX_REFRESH_INTERVAL,
+        name="film_suggest_index_refresh",
+        enabled=config.SUGGEST_INDEX_ENABLED,
+    )
+
     film_repository = providers.Singleton(
         films.FilmRepository,
         storage_repository=providers.Singleton(
             repositories.ElasticCacheRepository,
-            elastic_repository=providers.Singleton(
-                repositories.ElasticRepository,
-                storage=elastic_storage,
-                index_name="movies",
-            ),
+            elastic_repository=film_elastic_repository,
             cache_repository=cache_repository,
+            identity_map=identity_map.provider,
+            key_factory=film_key_factory_.provider,
+        ),
+        shared_list_depth=config.FILMS_SHARED_LIST_DEPTH,
+        genre_views=film_genre_views,
+        rating_index=film_rating_index,
+        suggest_storage_repository=providers.Singleton(
+            repositories.ElasticCacheRepository,
+            elastic_repository=film_elastic_repository,
+            cache_repository=suggest_cache_repository,
+            identity_map=identity_map.provider,
             key_factory=film_key_factory_.provider,
         ),
+        suggest_index=film_suggest_index,
+        query_normalizer=query_normalizer,
     )
 
     # Domain -> Persons
@@ -117,26 +331,101 @@ class Container(containers.DeclarativeContainer):
         min_length=config.CACHE_HASHED_KEY_LENGTH,
     )
 
+    person_elastic_repository = providers.Singleton(
+        repositories.ElasticRepository,
+        storage=elastic_storage,
+        index_name="person",
+    )
+
+    person_suggest_index = providers.Singleton(
+        suggestions.SuggestIndex,
+        storage=elastic_storage,
+        index_name="person",
+        field="full_name",
+        enabled=config.SUGGEST_INDEX_ENABLED,
+    )
+
+    person_suggest_index_refresh = providers.Resource(
+        tasks.periodic_task,
+        person_suggest_index.provided.refresh,
+        interval=config.SUGGEST_INDEX_REFRESH_INTERVAL,
+        name="person_suggest_index_refresh",
+        enabled=config.SUGGEST_INDEX_ENABLED,
+    )
+
     person_repository = providers.Singleton(
         persons.PersonRepository,
         storage_repository=providers.Singleton(
             repositories.ElasticCacheRepository,
-            elastic_repository=providers.Singleton(
-                repositories.ElasticRepository,
-                storage=elastic_storage,
-                index_name="person",
-            ),
+            elastic_repository=person_elastic_repository,
             cache_repository=cache_repository,
+            identity_map=identity_map.provider,
             key_factory=person_key_factory_.provider,
         ),
         film_repository=film_repository,
+        suggest_storage_repository=providers.Singleton(
+            repositories.ElasticCacheRepository,
+            elastic_repository=person_elastic_repository,
+            cache_repository=suggest_cache_repository,
+            identity_map=identity_map.provider,
+            key_factory=person_key_factory_.provider,
+        ),
+        suggest_index=person_suggest_index,
+        query_normalizer=query_normalizer,
     )
 
     # Domain -> Users
 
     user_service = providers.Singleton(users.UserService)
 
+    # Domain -> Exports
+
+    export_service = providers.Singleton(
+        exports.ExportService,
+        storage=elastic_storage,
+        indices=providers.Dict(
+            films="movies",
+            persons="person",
+            genres="genre",
+        ),
+        batch_size=config.EXPORT_BATCH_SIZE,
+    )
+
 
 def override_providers(container: Container, /) -> Container:
     """Override providers with stubs."""
+    if not container.config.USE_STUBS():
+        return container
+
+    container.elastic_connection.override(providers.Object(None))
+    container.redis_sentinel_connection.override(providers.Object(None))
+    container.elastic_storage.override(
+        providers.Singleton(
+            stubs.InMemoryStorage,
+            documents=providers.Callable(stubs.load_documents, path=container.config.STUBS_DATASET_PATH),
+        ),
+    )
+    container.redis_cache.override(
+        providers.Singleton(
+            stubs.InMemoryCache,
+            default_ttl=container.config.CACHE_DEFAULT_TTL,
+            compression=container.cache_compression,
+        ),
+    )
+    container.view_store.override(providers.Singleton(stubs.InMemoryViewStore))
+    container.dependency_checks.override(providers.Singleton(health.DependencyChecks, checks={}))
+    container.rate_limit_store.override(providers.Singleton(stubs.InMemoryRateLimitStore))
+    container.health_probes.override(providers.Singleton(health.HealthProbes, probes={}))
+    return container
+
+
+def preload_providers(container: Container, /) -> Container:
+    """Create singletons that don't open connections, so they are shared by forked workers."""
+    container.readiness()
+    container.cache_key_builder()
+    container.cache_compression()
+    container.token_roles_cache()
+    container.user_service()
+    if container.config.USE_STUBS():
+        container.elastic_storage()
     return container
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import contextlib
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+_sample: ContextVar[RequestSample | None] = ContextVar("concurrency_sample", default=None)
+
+
+@dataclass
+class RequestSample:
+    """Latency of backend calls made while handling a request, the limit is adjusted by the slowest one."""
+
+    backend_latency: float = 0
+
+
+class AIMDLimiter:
+    """Adaptive concurrency limit: additive increase, multiplicative decrease.
+
+    The limit grows by one after a successful request if at least half of it has been used, and is multiplied by
+    `backoff_ratio` after a failed request or a request whose backend calls took longer than `latency_threshold`
+    seconds, so it follows the concurrency the backends can handle. Requests over the limit are rejected.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        latency_threshold: float = 0.25,
+        backoff_ratio: float = 0.9,
+    ) -> None:
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        """Start a request, `False` if the limit is reached."""
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, backend_latency: float, /, *, dropped: bool = False) -> None:
+        """Finish a request and adjust the limit."""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if dropped or backend_latency > self.latency_threshold:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        elif in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+
+def add_backend_latency(latency: float, /) -> None:
+    """Record latency of a backend call made by the current request."""
+    sample = _sample.get()
+    if sample is not None:
+        sample.backend_latency = max(sample.backend_latency, latency)
+
+
+@contextlib.contextmanager
+def sample_scope() -> Iterator[RequestSample]:
+    """Collect latency of backend calls made inside the scope."""
+    sample = RequestSample()
+    token = _sample.set(sample)
+    try:
+        yield sample
+    finally:
+        _sample.reset(token)
@@ -24,8 +24,68 @@ class Settings(BaseSettings):
     PROJECT_NAME: str
     DEBUG: bool = False
     PROJECT_BASE_URL: str
+    USE_STUBS: bool = False  # in-memory storage and cache instead of Elasticsearch and Redis
+    STUBS_DATASET_PATH: str | None = None
     CACHE_DEFAULT_TTL: int = 5 * 60  # 5 minutes
     CACHE_HASHED_KEY_LENGTH: int = 10
+    CACHE_COMPRESSION_ALGORITHM: str | None = None  # zlib, zstd or lz4
+    CACHE_COMPRESSION_MIN_SIZE: int = 1024  # 1 KB
+    SUGGEST_CACHE_TTL: int = 60  # seconds, suggestions are cached per prefix
+    SEARCH_QUERY_REMOVE_STOPWORDS: bool = False  # drop stop words of the `ru_en` analyzer from search queries
+    FILMS_SHARED_LIST_DEPTH: int = 200  # films cached once for all access types, 0 disables the shared list
+    HEALTH_CHECK_TIMEOUT: float = 1.0  # seconds, backends that don't respond in time are reported unavailable
+
+    # Background probes of backends for the deep health check
+    HEALTH_PROBES_ENABLED: bool = False
+    HEALTH_PROBES_INTERVAL: int = 10  # seconds
+    HEALTH_PROBES_WINDOW: int = 60  # probes per backend latency percentiles are computed from
+    HEALTH_PROBES_LATENCY_THRESHOLD: float = 0.5  # seconds, backends with higher p95 latency are degraded
+
+    # Cache shared by workers of the host in front of Redis
+    SHARED_CACHE_ENABLED: bool = False
+    SHARED_CACHE_PATH: str = "/dev/shm/movies-cache"
+    SHARED_CACHE_SLOTS: int = 4096  # a multiple of 4
+    SHARED_CACHE_SLOT_SIZE: int = 8 * 1024  # bytes, larger values are cached in Redis only
+    SHARED_CACHE_TTL: int = 30  # seconds, shared values may be stale for this long
+
+    # Materialized views of films lists by genre
+    FILMS_GENRE_VIEWS_ENABLED: bool = False
+    # "" is no `sort`: genre queries are filter-only (no score), so films come in Elasticsearch index order
+    FILMS_GENRE_VIEWS_SORTS: list[str] = ["", "imdb_rating:desc", "imdb_rating"]
+    FILMS_GENRE_VIEWS_DEPTH: int = 1000  # films per view, deeper pages are queried from Elasticsearch
+    FILMS_GENRE_VIEWS_REFRESH_INTERVAL: int = 10 * 60  # seconds
+
+    # Index of films sorted by rating
+    FILMS_RATING_INDEX_ENABLED: bool = False
+    FILMS_RATING_INDEX_SYNC_INTERVAL: int = 10 * 60  # seconds
+
+    # In-process prefix index of film titles and person names for suggestions
+    SUGGEST_INDEX_ENABLED: bool = False
+    SUGGEST_INDEX_REFRESH_INTERVAL: int = 10 * 60  # seconds
+
+    # Adaptive concurrency limits per route group (path patterns), excess requests are rejected with 503
+    CONCURRENCY_LIMIT_ENABLED: bool = False
+    CONCURRENCY_LIMIT_GROUPS: dict[str, str] = {
+        "search": r"^/api/v1/(films|persons)/search",
+        "suggest": r"^/api/v1/(films|persons)/suggest",
+        "films_list": r"^/api/v1/films/?$",
+        "detail": r"^/api/v1/(films|genres|persons)/[^/]+",
+    }
+    CONCURRENCY_LIMIT_INITIAL: int = 20  # concurrent requests per group and worker
+    CONCURRENCY_LIMIT_MIN: int = 2
+    CONCURRENCY_LIMIT_MAX: int = 200
+    CONCURRENCY_LIMIT_LATENCY_THRESHOLD: float = 0.25  # seconds, slower Elasticsearch calls decrease the limit
+    CONCURRENCY_LIMIT_BACKOFF_RATIO: float = 0.9
+    CONCURRENCY_LIMIT_RETRY_AFTER: int = 1  # seconds
+
+    # Rate limits per route path and client (JWT subject or IP address), e.g. `60/minute`
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMITS: dict[str, str] = {
+        "/api/v1/films/search": "60/minute",
+        "/api/v1/persons/search": "60/minute",
+    }
+    RATE_LIMIT_SYNC_INTERVAL: float = 0.5  # seconds between syncs of local buckets with Redis
+    RATE_LIMIT_LOCAL_SHARE: float = 0.1  # share of a limit a worker may use between syncs
 
     # Redis
     REDIS_SENTINELS: Union[str, list[str]]
@@ -40,6 +100,24 @@ class Settings(BaseSettings):
     ES_PORT: int = Field(env="NE_ES_PORT")
     ES_RETRY_ON_TIMEOUT: bool = True
 
+    # Export
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_MAX_SLICES: int = 8
+
+    # Tracing
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "jaeger"  # jaeger, file or console
+    TRACING_JAEGER_HOST: str = "localhost"
+    TRACING_JAEGER_PORT: int = 6831
+    TRACING_FILE_PATH: str | None = None
+
+    # Profiling
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0  # fraction of profiled requests
+    PROFILING_TOKEN: str | None = None  # requests with the `X-Profile-Token` header are always profiled
+    PROFILING_COLLECT_STATS: bool = True  # collect cProfile stats, not only timings
+    PROFILING_BUFFER_SIZE: int = 100
+
     # Netflix Auth
     AUTH_SERVICE_URL: str
     AUTH0_DOMAIN: str = Field(env="NAA_AUTH0_DOMAIN")
@@ -50,6 +128,9 @@ class Settings(BaseSettings):
     AUTH0_AUTHORIZATION_URL: str = Field(env="NAA_AUTH0_AUTHORIZATION_URL")
     JWT_AUTH_SECRET_KEY: str = Field(env="NAA_SECRET_KEY")
     JWT_AUTH_ALGORITHM: str = "HS256"
+    JWT_AUTH_BACKEND: str = "jose"  # jose or hmac (faster, HMAC algorithms only)
+    JWT_CACHE_SIZE: int = 10_000  # verified tokens cached per worker, 0 disables the cache
+    JWT_CACHE_MAX_TTL: int = 5 * 60  # seconds, tokens are cached until `exp` but not longer
 
     class Config(EnvConfig):
         env_prefix = "NMA_"
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Final, Mapping, Union
+
+logger = logging.getLogger(__name__)
+
+STARTUP: Final[str] = "startup"
+SHUTDOWN: Final[str] = "shutdown"
+
+# Statuses of backends from the best to the worst
+OK: Final[str] = "ok"
+UNKNOWN: Final[str] = "unknown"
+DEGRADED: Final[str] = "degraded"
+DOWN: Final[str] = "down"
+STATUSES: Final[tuple[str, ...]] = (OK, UNKNOWN, DEGRADED, DOWN)
+PERCENTILES: Final[tuple[int, ...]] = (50, 95, 99)
+
+# A probe returns whether the backend is available or details of its state with an optional `status`
+ProbeResult = Union[bool, dict[str, Any]]
+
+
+class Readiness:
+    """Readiness of the worker to serve traffic.
+
+    Unlike liveness (the process is up and responds), the worker isn't ready until its resources are initialized
+    and after it has started shutting down, so load balancers don't route requests to it meanwhile.
+    Readiness is blocked by named reasons, the worker is ready if there are none.
+    """
+
+    def __init__(self) -> None:
+        self._reasons: set[str] = {STARTUP}
+
+    @property
+    def is_ready(self) -> bool:
+        return not self._reasons
+
+    @property
+    def reasons(self) -> list[str]:
+        return sorted(self._reasons)
+
+    def block(self, reason: str, /) -> None:
+        """Mark the worker as not ready for the given reason."""
+        self._reasons.add(reason)
+
+    def unblock(self, reason: str, /) -> None:
+        """Remove the reason the worker is not ready for."""
+        self._reasons.discard(reason)
+
+
+class DependencyChecks:
+    """Checks of backends (Elasticsearch, Redis) the worker depends on.
+
+    A check is an async callable returning whether the backend is available. Checks are run concurrently,
+    a check that raises or doesn't finish in `timeout` seconds fails, so the slowest backend bounds the probe time.
+    """
+
+    def __init__(self, checks: Mapping[str, Callable[[], Awaitable[bool]]], *, timeout: float = 1.0) -> None:
+        self.checks = dict(checks)
+        self.timeout = timeout
+
+    async def run(self) -> dict[str, bool]:
+        """Run all checks, return whether each backend is available."""
+        results = await asyncio.gather(*(self._run_check(name, check) for name, check in self.checks.items()))
+        return dict(zip(self.checks, results))
+
+    async def _run_check(self, name: str, check: Callable[[], Awaitable[bool]], /) -> bool:
+        try:
+            return bool(await asyncio.wait_for(check(), timeout=self.timeout))
+        except Exception:
+            logger.warning("Health check %s has failed", name, exc_info=True)
+            return False
+
+
+class HealthProbes:
+    """Background probes of backends with their recent latency.
+
+    `probe` is called periodically (see `tasks.periodic_task`) and runs all probes concurrently, the last `window`
+    results of every probe are kept, so `report` is cheap and doesn't add load to backends however often
+    it's requested. A probe fails if it raises, returns `False` or doesn't finish in `timeout` seconds (the backend
+    is down), a backend is degraded if the probe says so or its 95th percentile latency exceeds `latency_threshold`.
+    """
+
+    def __init__(
+        self,
+        probes: Mapping[str, Callable[[], Awaitable[ProbeResult]]],
+        *,
+        timeout: float = 1.0,
+        window: int = 60,
+        latency_threshold: float = 0.5,
+    ) -> None:
+        self.probes = dict(probes)
+        self.timeout = timeout
+        self.latency_threshold = latency_threshold
+        # (latency in seconds, whether the probe has succeeded)
+        self._samples: dict[str, deque[tuple[float, bool]]] = {name: deque(maxlen=window) for name in self.probes}
+        self._results: dict[str, dict[str, Any]] = {}
+
+    async def probe(self) -> None:
+        """Run all probes and save their results."""
+        await asyncio.gather(*(self._run_probe(name, probe) for name, probe in self.probes.items()))
+
+    def report(self) -> dict[str, Any]:
+        """Get the overall status and status, details and latency percentiles (in ms) of every backend."""
+        backends = {name: self._report_backend(name) for name in self.probes}
+        status = max((backend["status"] for backend in backends.values()), key=STATUSES.index, default=OK)
+        return {"status": status, "backends": backends}
+
+    async def _run_probe(self, name: str, probe: Callable[[], Awaitable[ProbeResult]], /) -> None:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(probe(), timeout=self.timeout)
+        except Exception:
+            logger.warning("Health probe %s has failed", name, exc_info=True)
+            result = False
+        latency = time.perf_counter() - start
+        details = dict(result) if isinstance(result, dict) else {"status": OK if result else DOWN}
+        status = details.pop("status", OK)
+        self._samples[name].append((latency, status != DOWN))
+        self._results[name] = {
+            "status": status,
+            "checked_at": datetime.datetime.now(tz=datetime.timezone.utc),
+            "details": details,
+        }
+
+    def _report_backend(self, name: str, /) -> dict[str, Any]:
+        result = self._results.get(name)
+        if result is None:
+            return {"status": UNKNOWN}
+        samples = self._samples[name]
+        latencies = sorted(latency for latency, succeeded in samples if succeeded)
+        latency_ms = None
+        status = result["status"]
+        if latencies:
+            latency_ms = {
+                f"p{percentile}": round(_get_percentile(latencies, percentile) * 1000, 2)
+                for percentile in PERCENTILES
+            }
+            if status == OK and _get_percentile(latencies, 95) > self.latency_threshold:
+                status = DEGRADED
+        return {
+            **result,
+            "status": status,
+            "latency_ms": latency_ms,
+            "failures": sum(not succeeded for _, succeeded in samples),
+            "samples": len(samples),
+        }
+
+
+def _get_percentile(values: list[float], percentile: int, /) -> float:
+    """Get the percentile of sorted values (nearest rank)."""
+    return values[max(math.ceil(len(values) * percentile / 100) - 1, 0)]
@@ -0,0 +1,103 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_SIZE_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072, 262144, 524288)
+
+REQUEST_LATENCY = Histogram(
+    "movies_http_request_duration_seconds",
+    "HTTP request latency.",
+    ["method", "route", "status_code"],
+    buckets=LATENCY_BUCKETS,
+)
+
+ELASTIC_REQUEST_LATENCY = Histogram(
+    "movies_elastic_request_duration_seconds",
+    "Elasticsearch request latency.",
+    ["index", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+REDIS_REQUEST_LATENCY = Histogram(
+    "movies_redis_request_duration_seconds",
+    "Redis request latency.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+CACHE_REQUESTS = Counter(
+    "movies_cache_requests_total",
+    "Cache lookups by key prefix and result: hit, miss or error.",
+    ["prefix", "result"],
+)
+
+SEARCH_QUERIES = Counter(
+    "movies_search_queries_total",
+    "Search queries by cache key prefix and whether normalization changed them.",
+    ["prefix", "normalized"],
+)
+
+CACHE_PAYLOAD_SIZE = Histogram(
+    "movies_cache_payload_size_bytes",
+    "Size of cached values.",
+    ["prefix", "operation"],
+    buckets=PAYLOAD_SIZE_BUCKETS,
+)
+
+MATERIALIZED_VIEW_REQUESTS = Counter(
+    "movies_materialized_view_requests_total",
+    "Materialized view lookups by view and result: hit or miss.",
+    ["view", "result"],
+)
+
+SHARED_CACHE_REQUESTS = Counter(
+    "movies_shared_cache_requests_total",
+    "Shared memory cache requests by operation and result: hit, miss, stored, too_large or locked.",
+    ["operation", "result"],
+)
+
+JWT_CACHE_REQUESTS = Counter(
+    "movies_jwt_cache_requests_total",
+    "Verified JWT cache lookups by result: hit or miss.",
+    ["result"],
+)
+
+CONCURRENCY_LIMIT = Gauge(
+    "movies_concurrency_limit",
+    "Adaptive concurrency limit of the worker by route group.",
+    ["group"],
+    multiprocess_mode="liveall",
+)
+
+SHED_REQUESTS = Counter(
+    "movies_shed_requests_total",
+    "Requests rejected by the concurrency limiter by route group.",
+    ["group"],
+)
+
+RATE_LIMITED_REQUESTS = Counter(
+    "movies_rate_limited_requests_total",
+    "Requests checked by the rate limiter by route and result: allowed or limited.",
+    ["route", "result"],
+)
+
+
+def get_registry() -> CollectorRegistry:
+    """Get metrics registry.
+
+    If the app is served by several worker processes (`PROMETHEUS_MULTIPROC_DIR` is set),
+    metrics from all workers are collected.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def export_metrics() -> tuple[bytes, str]:
+    """Export metrics in the Prometheus text format."""
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
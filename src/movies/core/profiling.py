@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import datetime
+import io
+import itertools
+import pstats
+import threading
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+_profile: ContextVar[RequestProfile | None] = ContextVar("profile", default=None)
+
+_ids = itertools.count(1)
+
+# only one cProfile profiler can be enabled at a time
+_profiler_lock = threading.Lock()
+
+
+@dataclass
+class Timing:
+    """Number of calls and total time of an operation."""
+
+    count: int = 0
+    total_ms: float = 0
+
+    def add(self, elapsed: float, /) -> None:
+        self.count += 1
+        self.total_ms += elapsed * 1000
+
+
+@dataclass
+class RequestProfile:
+    """Profile of a single request.
+
+    `timings` are collected from spans (`movies.core.tracing.span`): JWT decoding, cache and Elasticsearch calls,
+    (de)serialization, etc. Nested spans are not subtracted from their parents.
+    """
+
+    method: str
+    path: str
+    reason: str
+    profile_id: int = field(default_factory=lambda: next(_ids))
+    started_at: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(tz=datetime.timezone.utc))
+    route: str | None = None
+    status_code: int | None = None
+    duration_ms: float = 0
+    timings: dict[str, Timing] = field(default_factory=dict)
+    stats: str | None = None
+
+    def add_timing(self, name: str, elapsed: float, /) -> None:
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing()
+        timing.add(elapsed)
+
+    def to_dict(self, *, with_stats: bool = True) -> dict:
+        data = {
+            "id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "reason": self.reason,
+            "status_code": self.status_code,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "timings": {
+                name: {"count": timing.count, "total_ms": round(timing.total_ms, 3)}
+                for name, timing in sorted(self.timings.items(), key=lambda item: -item[1].total_ms)
+            },
+        }
+        if with_stats:
+            data["stats"] = self.stats
+        return data
+
+
+class ProfileBuffer:
+    """Bounded buffer with the latest request profiles."""
+
+    def __init__(self, size: int = 100) -> None:
+        self._profiles: deque[RequestProfile] = deque(maxlen=size)
+
+    def add(self, profile: RequestProfile, /) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: int, /) -> RequestProfile | None:
+        return next((profile for profile in self._profiles if profile.profile_id == profile_id), None)
+
+    def list(self) -> list[RequestProfile]:
+        """Get profiles, latest first."""
+        return list(reversed(self._profiles))
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+def get_profile() -> RequestProfile | None:
+    """Get profile of the current request."""
+    return _profile.get()
+
+
+@contextlib.contextmanager
+def profile_scope(profile: RequestProfile, /, *, collect_stats: bool = True, stats_limit: int = 30) -> Iterator[None]:
+    """Profile the code inside the scope.
+
+    If `collect_stats` is set, cProfile stats are collected as well, unless another request is being profiled.
+    Stats include other coroutines that have been running concurrently with the request.
+    """
+    profiler = None
+    if collect_stats and _profiler_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+    token = _profile.set(profile)
+    try:
+        if profiler is None:
+            yield
+            return
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _profiler_lock.release()
+            profile.stats = _format_stats(profiler, stats_limit)
+    finally:
+        _profile.reset(token)
+
+
+def _format_stats(profiler: cProfile.Profile, limit: int, /) -> str:
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return stream.getvalue()
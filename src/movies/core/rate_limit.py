@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, ClassVar, Mapping
+
+from movies.common.exceptions import ImproperlyConfiguredError
+
+from .metrics import RATE_LIMITED_REQUESTS
+
+if TYPE_CHECKING:
+    from movies.infrastructure.db.rate_limits import RateLimitStore
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`requests` per `period` seconds, all of them may be made at once."""
+
+    PERIODS: ClassVar[dict[str, int]] = {"second": 1, "minute": 60, "hour": 60 * 60, "day": 24 * 60 * 60}
+    PATTERN: ClassVar[re.Pattern] = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+
+    requests: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str, /) -> RateLimit:
+        """Parse a limit like `60/minute`."""
+        match = cls.PATTERN.match(value)
+        if match is None or int(match[1]) <= 0:
+            raise ImproperlyConfiguredError(f"Invalid rate limit: {value}")
+        return cls(requests=int(match[1]), period=cls.PERIODS[match[2]])
+
+    @property
+    def interval(self) -> float:
+        """Emission interval: time a request takes from the limit."""
+        return self.period / self.requests
+
+
+class TokenBucket:
+    """Local share of a client's rate limit.
+
+    The bucket refills at the limit's rate up to `capacity` tokens, requests it has served since the last sync
+    are `pending`. Syncs set tokens to what is left of the shared limit or block the bucket until `blocked_until`.
+    """
+
+    __slots__ = ("limit", "capacity", "tokens", "updated_at", "blocked_until", "pending")
+
+    def __init__(self, limit: RateLimit, capacity: int, now: float) -> None:
+        self.limit = limit
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = now
+        self.blocked_until = 0.0
+        self.pending = 0
+
+    def consume(self, now: float) -> float | None:
+        """Take a token, return `None` if the request is allowed or seconds to retry after."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) / self.limit.interval)
+        self.updated_at = now
+        if self.tokens < 1:
+            return (1 - self.tokens) * self.limit.interval
+        self.tokens -= 1
+        self.pending += 1
+        return None
+
+    def sync(self, backlog: float, now: float) -> None:
+        """Apply the shared state: how far the client's next allowed request time is ahead of now, in seconds."""
+        overdraft = backlog - self.limit.period
+        if overdraft > 0:
+            self.tokens = 0
+            self.blocked_until = now + overdraft
+        else:
+            self.tokens = min(self.capacity, math.floor(-overdraft / self.limit.interval))
+            self.blocked_until = 0.0
+        self.updated_at = now
+
+
+class RateLimiter:
+    """Rate limiter of routes by client (JWT subject or IP address).
+
+    Limits are shared by all workers with GCRA (generic cell rate algorithm) in the `store`, but requests are
+    checked against local token buckets, so they don't wait for a round trip to Redis. Requests served by every
+    bucket are sent to the store in one batch by `sync` (see `tasks.periodic_task`), which updates the buckets
+    with the shared state. A bucket holds `local_share` of the limit, so clients may exceed their limits by
+    that share per worker between syncs. Buckets that haven't been used for a limit period are dropped.
+    """
+
+    KEY_PREFIX: ClassVar[str] = "rate_limit"
+
+    def __init__(
+        self, store: RateLimitStore, limits: Mapping[str, str], *, enabled: bool = True, local_share: float = 0.1,
+    ) -> None:
+        self.store = store
+        self.limits = {route: RateLimit.parse(limit) for route, limit in limits.items()}
+        self.enabled = enabled
+        self.local_share = local_share
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+
+    def hit(self, route: str, client: str, /) -> float | None:
+        """Count a request of the client to the route, return `None` if it's allowed or seconds to retry after."""
+        limit = self.limits.get(route)
+        if not self.enabled or limit is None:
+            return None
+        now = time.monotonic()
+        bucket = self._buckets.get((route, client))
+        if bucket is None:
+            capacity = max(1, math.ceil(limit.requests * self.local_share))
+            bucket = self._buckets[(route, client)] = TokenBucket(limit, capacity, now)
+        retry_after = bucket.consume(now)
+        RATE_LIMITED_REQUESTS.labels(route=route, result="allowed" if retry_after is None else "limited").inc()
+        return retry_after
+
+    async def sync(self) -> int:
+        """Send requests served since the last sync to the store, return the number of synced buckets."""
+        now = time.monotonic()
+        for key, bucket in list(self._buckets.items()):
+            if not bucket.pending and now - bucket.updated_at > bucket.limit.period:
+                del self._buckets[key]
+        pending = [(key, bucket) for key, bucket in self._buckets.items() if bucket.pending]
+        if not pending:
+            return 0
+        requests = [
+            (self.make_key(route, client), bucket.pending, bucket.limit.interval)
+            for (route, client), bucket in pending
+        ]
+        for _, bucket in pending:
+            bucket.pending = 0
+        backlogs = await self.store.consume(requests)
+        now = time.monotonic()
+        for (_, bucket), backlog in zip(pending, backlogs):
+            bucket.sync(backlog, now)
+        return len(pending)
+
+    @classmethod
+    def make_key(cls, route: str, client: str) -> str:
+        return f"{cls.KEY_PREFIX}:{route}:{client}"
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, ClassVar, Final
+
+import orjson
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from movies.common.exceptions import ImproperlyConfiguredError
+
+from .metrics import JWT_CACHE_REQUESTS
+
+
+class JWTBackend(ABC):
+    """JWT verification backend."""
+
+    def __init__(self, secret_key: str, algorithm: str) -> None:
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+
+    @abstractmethod
+    def decode(self, token: str, /) -> dict[str, Any]:
+        """Verify the token and return its claims.
+
+        Raises `JWTError` if the token is invalid or expired.
+        """
+
+
+class JoseJWTBackend(JWTBackend):
+    """JWT backend based on `python-jose`.
+
+    `jose.jwt` (with crypto backends) is imported when the backend is created, not on startup.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str) -> None:
+        from jose import jwt
+
+        super().__init__(secret_key, algorithm)
+        self._jwt = jwt
+
+    def decode(self, token: str, /) -> dict[str, Any]:
+        return self._jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+
+
+class HMACJWTBackend(JWTBackend):
+    """Fast JWT backend for HMAC algorithms (HS256, HS384, HS512) based on `hmac` and `orjson`.
+
+    Verifies the signature and `exp`/`nbf` claims, tokens signed with other algorithms are rejected.
+    """
+
+    DIGESTS: ClassVar[dict[str, Any]] = {
+        "HS256": hashlib.sha256,
+        "HS384": hashlib.sha384,
+        "HS512": hashlib.sha512,
+    }
+
+    def __init__(self, secret_key: str, algorithm: str) -> None:
+        if algorithm not in self.DIGESTS:
+            raise ImproperlyConfiguredError(f"Algorithm {algorithm} is not supported by the HMAC JWT backend")
+        super().__init__(secret_key, algorithm)
+        self._key = secret_key.encode()
+        self._digest = self.DIGESTS[algorithm]
+
+    def decode(self, token: str, /) -> dict[str, Any]:
+        try:
+            signing_input, _, signature_segment = token.rpartition(".")
+            header_segment, payload_segment = signing_input.split(".")
+            header = orjson.loads(_base64url_decode(header_segment))
+            signature = _base64url_decode(signature_segment)
+        except (ValueError, binascii.Error):
+            raise JWTError("Invalid token")
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise JWTError("The specified alg value is not allowed")
+
+        expected_signature = hmac.new(self._key, signing_input.encode(), self._digest).digest()
+        if not hmac.compare_digest(signature, expected_signature):
+            raise JWTError("Signature verification failed")
+
+        try:
+            claims = orjson.loads(_base64url_decode(payload_segment))
+        except (ValueError, binascii.Error):
+            raise JWTError("Invalid payload")
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload")
+        self._verify_time_claims(claims)
+        return claims
+
+    @staticmethod
+    def _verify_time_claims(claims: dict[str, Any], /) -> None:
+        now = time.time()
+        for claim in ("exp", "nbf"):
+            value = claims.get(claim)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise JWTError(f"Invalid `{claim}` claim")
+        if claims.get("exp") is not None and claims["exp"] < now:
+            raise ExpiredSignatureError("Signature has expired")
+        if claims.get("nbf") is not None and claims["nbf"] > now:
+            raise JWTError("The token is not yet valid (nbf)")
+
+
+JWT_BACKENDS: Final[dict[str, type[JWTBackend]]] = {
+    "jose": JoseJWTBackend,
+    "hmac": HMACJWTBackend,
+}
+
+
+def get_jwt_backend(name: str, *, secret_key: str, algorithm: str) -> JWTBackend:
+    """Create JWT backend by its name."""
+    if name not in JWT_BACKENDS:
+        raise ImproperlyConfiguredError(f"Unknown JWT backend: {name}")
+    return JWT_BACKENDS[name](secret_key, algorithm)
+
+
+class TokenRolesCache:
+    """Bounded LRU cache of user roles and subjects from verified tokens.
+
+    Tokens are identified by their hash. Claims are cached until the token's `exp`, but not longer than `max_ttl`.
+    The cache isn't thread-safe: it must be used from the event loop only.
+    """
+
+    CACHED_CLAIMS: ClassVar[tuple[str, ...]] = ("roles", "sub")
+
+    def __init__(self, backend: JWTBackend, max_size: int = 10_000, max_ttl: int = 5 * 60) -> None:
+        self.backend = backend
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._claims: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+
+    def get_roles(self, token: str, /) -> list[str] | None:
+        """Get roles from the `roles` claim of the token.
+
+        Raises `JWTError` if the token is invalid or expired.
+        """
+        return self._get_claims(token).get("roles")
+
+    def get_subject(self, token: str, /) -> str | None:
+        """Get the `sub` claim of the token.
+
+        Raises `JWTError` if the token is invalid or expired.
+        """
+        subject = self._get_claims(token).get("sub")
+        return None if subject is None else str(subject)
+
+    def clear(self) -> None:
+        self._claims.clear()
+
+    def _get_claims(self, token: str, /) -> dict[str, Any]:
+        if self.max_size <= 0:
+            return self.backend.decode(token)
+
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached = self._claims.get(key)
+        if cached is not None:
+            claims, expires_at = cached
+            if expires_at > time.time():
+                self._claims.move_to_end(key)
+                JWT_CACHE_REQUESTS.labels(result="hit").inc()
+                return claims
+            del self._claims[key]
+
+        JWT_CACHE_REQUESTS.labels(result="miss").inc()
+        decoded = self.backend.decode(token)
+        claims = {name: decoded[name] for name in self.CACHED_CLAIMS if name in decoded}
+        expires_at = time.time() + self.max_ttl
+        if isinstance(decoded.get("exp"), (int, float)):
+            expires_at = min(expires_at, decoded["exp"])
+        self._claims[key] = (claims, expires_at)
+        if len(self._claims) > self.max_size:
+            self._claims.popitem(last=False)
+        return claims
+
+
+def _base64url_decode(segment: str, /) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(func: Callable[[], Awaitable[object]], *, interval: float, name: str) -> None:
+    """Call `func` every `interval` seconds, errors are logged and don't stop the loop."""
+    while True:
+        try:
+            await func()
+        except Exception:
+            logger.exception("Periodic task %s failed", name)
+        await asyncio.sleep(interval)
+
+
+async def periodic_task(
+    func: Callable[[], Awaitable[object]], *, interval: float, name: str, enabled: bool = True,
+) -> AsyncIterator[asyncio.Task | None]:
+    """Resource that runs `func` in the background every `interval` seconds while the app is running."""
+    if not enabled:
+        yield None
+        return
+    task = asyncio.create_task(run_periodically(func, interval=interval, name=name), name=name)
+    yield task
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import time
+from typing import TYPE_CHECKING, AsyncIterator, ContextManager, Final, Iterator, TextIO
+
+from opentelemetry import trace
+
+from movies.common.exceptions import ImproperlyConfiguredError
+
+from . import profiling
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import ReadableSpan
+    from opentelemetry.sdk.trace.export import SpanExporter
+
+SpanKind = trace.SpanKind
+
+TRACING_EXPORTERS: Final[tuple[str, ...]] = ("jaeger", "file", "console")
+
+_NOOP_SPAN: Final[ContextManager[trace.Span]] = contextlib.nullcontext(trace.INVALID_SPAN)
+
+_tracer: trace.Tracer | None = None
+
+
+def is_tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def span(
+    name: str, /, attributes: dict | None = None, *, kind: SpanKind = SpanKind.INTERNAL,
+) -> ContextManager[trace.Span]:
+    """Start a new span as a child of the current one.
+
+    If tracing is disabled, a shared no-op context manager with a non-recording span is returned.
+    If the current request is being profiled, duration of the span is added to the request profile.
+    """
+    profile = profiling.get_profile()
+    if _tracer is None:
+        return _NOOP_SPAN if profile is None else _timed(profile, name, _NOOP_SPAN)
+    span_context = _tracer.start_as_current_span(name, attributes=attributes, kind=kind)
+    return span_context if profile is None else _timed(profile, name, span_context)
+
+
+async def configure_tracing(
+    enabled: bool,
+    service_name: str,
+    exporter: str = "jaeger",
+    jaeger_host: str = "localhost",
+    jaeger_port: int = 6831,
+    file_path: str | None = None,
+) -> AsyncIterator[None]:
+    """Configure OpenTelemetry tracing.
+
+    Spans are exported to a Jaeger agent (or OpenTelemetry collector with the Jaeger receiver),
+    to a file with one JSON span per line, or to stdout. The OpenTelemetry SDK is imported only if tracing is enabled.
+    """
+    global _tracer
+
+    if not enabled:
+        yield
+        return
+
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if exporter not in TRACING_EXPORTERS:
+        raise ImproperlyConfiguredError(f"Unknown tracing exporter: {exporter}")
+
+    output: TextIO | None = None
+    span_exporter: SpanExporter
+    if exporter == "jaeger":
+        from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+        span_exporter = JaegerExporter(agent_host_name=jaeger_host, agent_port=jaeger_port)
+    elif exporter == "file":
+        if file_path is None:
+            raise ImproperlyConfiguredError("Tracing file path is required for the `file` exporter")
+        output = open(file_path, "a")
+        span_exporter = ConsoleSpanExporter(out=output, formatter=_format_span)
+    else:
+        span_exporter = ConsoleSpanExporter(formatter=_format_span)
+
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: service_name}))
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    _tracer = provider.get_tracer(__name__)
+    yield
+    _tracer = None
+    provider.shutdown()
+    if output is not None:
+        output.close()
+
+
+@contextlib.contextmanager
+def _timed(
+    profile: profiling.RequestProfile, name: str, span_context: ContextManager[trace.Span], /,
+) -> Iterator[trace.Span]:
+    start = time.perf_counter()
+    try:
+        with span_context as current_span:
+            yield current_span
+    finally:
+        profile.add_timing(name, time.perf_counter() - start)
+
+
+def _format_span(readable_span: ReadableSpan, /) -> str:
+    return readable_span.to_json(indent=None) + os.linesep
@@ -0,0 +1,9 @@
+from .schemas import ExportResource
+from .services import ExportService, gzip_stream, to_ndjson
+
+__all__ = [
+    "ExportResource",
+    "ExportService",
+    "gzip_stream",
+    "to_ndjson",
+]
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class ExportResource(str, Enum):
+    """Resource available for export."""
+
+    FILMS = "films"
+    PERSONS = "persons"
+    GENRES = "genres"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import zlib
+from typing import TYPE_CHECKING, AsyncIterator
+
+import orjson
+
+if TYPE_CHECKING:
+    from movies.infrastructure.db.storage import AsyncNoSQLStorage
+
+    from .schemas import ExportResource
+
+
+class ExportService:
+    """Bulk export of the catalog.
+
+    Documents are read with a single pass over the index (point in time + `search_after`) instead of deep-offset
+    searches. Every document has a `uuid` field, documents are sorted by it, so the `uuid` of the last received
+    document works as a resume token.
+    """
+
+    def __init__(self, storage: AsyncNoSQLStorage, indices: dict[str, str], batch_size: int) -> None:
+        self.storage = storage
+        self.indices = indices
+        self.batch_size = batch_size
+
+    async def iter_batches(
+        self,
+        resource: ExportResource, *,
+        slice_id: int | None = None, max_slices: int | None = None,
+        after: str | None = None,
+        filter_fields: dict[str, str] | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """Iterate over all documents of the given resource in batches."""
+        index_name = self.indices[resource.value]
+        query: dict = {"query": {"match_all": {}}}
+        if filter_fields:
+            query = {"query": {"bool": {"filter": {"term": filter_fields}}}}
+        search_after = [after] if after is not None else None
+        batches = self.storage.scan(
+            index_name, query,
+            batch_size=self.batch_size, slice_id=slice_id, max_slices=max_slices, search_after=search_after,
+        )
+        async for batch in batches:
+            yield batch
+
+    async def export(self, resource: ExportResource, **options) -> AsyncIterator[bytes]:
+        """Export documents of the given resource as NDJSON, one chunk per batch."""
+        async for batch in self.iter_batches(resource, **options):
+            yield to_ndjson(batch)
+
+
+def to_ndjson(docs: list[dict], /) -> bytes:
+    """Serialize documents to NDJSON."""
+    return b"".join(orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE) for doc in docs)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], /, *, level: int = 6) -> AsyncIterator[bytes]:
+    """Compress stream of chunks with gzip."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed_chunk = compressor.compress(chunk)
+        if compressed_chunk:
+            yield compressed_chunk
+    yield compressor.flush()
@@ -1,11 +1,16 @@
 from .repositories import FilmRepository, film_key_factory
-from .schemas import FilmAccessType, FilmAgeRating, FilmDetail, FilmList
+from .schemas import FilmAccessType, FilmAgeRating, FilmDetail, FilmFilter, FilmList, FilmSuggestion
+from .views import FilmGenreViews, FilmRatingIndex
 
 __all__ = [
     "FilmAgeRating",
     "FilmAccessType",
     "FilmDetail",
+    "FilmFilter",
     "FilmList",
+    "FilmSuggestion",
     "FilmRepository",
+    "FilmGenreViews",
+    "FilmRatingIndex",
     "film_key_factory",
 ]
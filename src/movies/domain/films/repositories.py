@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, ClassVar, Sequence
+from typing import TYPE_CHECKING, Any, ClassVar, Sequence
 from uuid import UUID
 
-from .schemas import FilmAccessType, FilmDetail, FilmList
+import orjson
+
+from movies.domain.search import QueryNormalizer
+
+from .schemas import FilmAccessType, FilmDetail, FilmFilter, FilmList, FilmSuggestion
 
 if TYPE_CHECKING:
+    from movies.domain.suggestions import SuggestIndex
     from movies.infrastructure.db.cache import CacheKeyBuilder
     from movies.infrastructure.db.repositories import NoSQLStorageRepository
 
+    from .views import FilmGenreViews, FilmRatingIndex
+
 
 class FilmRepository:
     """Film repository."""
@@ -16,10 +23,30 @@ class FilmRepository:
     es_film_index_search_fields: ClassVar[Sequence[str]] = [
         "title", "description", "genres_names", "actors_names", "directors_names", "writers_names",
     ]
-    es_film_genre_search_fields: ClassVar[Sequence[str]] = ["genres_names"]
+    es_film_genre_filter_field: ClassVar[str] = "genre.name.raw"
+    es_film_person_filter_fields: ClassVar[tuple[str, ...]] = ("actors.uuid", "writers.uuid", "directors.uuid")
+    # `search_as_you_type` field and its shingle subfields
+    es_film_suggest_fields: ClassVar[Sequence[str]] = ["title.suggest", "title.suggest._2gram", "title.suggest._3gram"]
+    # sorts of the rating index (`FilmRatingIndex`): films with equal ratings are ordered by id in the same direction
+    es_film_tie_breaker_sorts: ClassVar[dict[str, str]] = {"imdb_rating": "uuid", "imdb_rating:desc": "uuid:desc"}
 
-    def __init__(self, storage_repository: NoSQLStorageRepository) -> None:
+    def __init__(
+        self,
+        storage_repository: NoSQLStorageRepository,
+        shared_list_depth: int = 0,
+        genre_views: FilmGenreViews | None = None,
+        rating_index: FilmRatingIndex | None = None,
+        suggest_storage_repository: NoSQLStorageRepository | None = None,
+        suggest_index: SuggestIndex | None = None,
+        query_normalizer: QueryNormalizer | None = None,
+    ) -> None:
         self.storage_repository = storage_repository
+        self.suggest_storage_repository = suggest_storage_repository or storage_repository
+        self.suggest_index = suggest_index
+        self.query_normalizer = query_normalizer or QueryNormalizer()
+        self.shared_list_depth = shared_list_depth
+        self.genre_views = genre_views
+        self.rating_index = rating_index
 
     async def get_by_id(self, film_id: UUID, /) -> FilmDetail:
         """Get film by id."""
@@ -27,49 +54,208 @@ class FilmRepository:
 
     async def get_all(
         self, *,
-        url: str,
-        page_size: int, page_number: int, sort: str | None = None,
-        genre: str | None = None,
+        page_size: int, page_number: int, sort: list[str] | None = None,
+        filters: FilmFilter | None = None,
         filter_fields: dict[str, str] | None = None,
     ) -> list[FilmList]:
-        """Get paginated films."""
+        """Get paginated films.
+
+        Cache keys are built from normalized `filters`, sort and pagination, so equal requests share cached pages
+        regardless of the order and case of query parameters.
+        Genre pages are served from materialized views (`genre_views`) and pages sorted by rating from
+        the rating index (`rating_index`), if they are enabled.
+        If `shared_list_depth` is set, the first films of the list are cached once for all access types
+        (`films:list:shared`) and filtered in-process. Deeper pages are cached per access type.
+        """
+        genre, other_filters = _split_genre(filters)
+        if other_filters is None:
+            films = await self._get_genre_view_page(
+                page_size=page_size, page_number=page_number, sort=sort, genre=genre, filter_fields=filter_fields)
+            if films is not None:
+                return films
+            films = await self._get_rating_index_page(
+                page_size=page_size, page_number=page_number, sort=sort, genre=genre, filter_fields=filter_fields)
+            if films is not None:
+                return films
+            films = await self._get_shared_page(
+                page_size=page_size, page_number=page_number, sort=sort, genre=genre, filter_fields=filter_fields)
+            if films is not None:
+                return films
+
         cache_key_prefix = self._get_film_list_key_prefix(filter_fields)
         request_options = {
-            "search_query": genre, "page_size": page_size, "page_number": page_number,
-            "search_fields": self.es_film_genre_search_fields, "filter_fields": filter_fields,
+            **self.get_list_request_options(filters, filter_fields),
+            "page_size": page_size, "page_number": page_number,
         }
+        base_key = orjson.dumps(
+            {
+                "filters": filters.dict(exclude_defaults=True) if filters is not None else {},
+                "sort": sort, "page": [page_size, page_number],
+            },
+            option=orjson.OPT_SORT_KEYS,
+        ).decode()
         search_options = {
-            "cache_options": {"base_key": url, "prefix": cache_key_prefix},
-            "sort": sort,
+            "cache_options": {"base_key": base_key, "prefix": cache_key_prefix},
+            "sort": self.get_list_sort(sort),
         }
         search_query = self.storage_repository.prepare_search_request(**request_options)
         return await self.storage_repository.search(search_query, FilmList, **search_options)
 
     async def get_public(
-        self, url: str, page_size: int, page_number: int, sort: str | None = None, genre: str | None = None,
+        self, page_size: int, page_number: int, sort: list[str] | None = None, filters: FilmFilter | None = None,
     ) -> list[FilmList]:
         """Get 'public' films (ones that are accessible for all users)."""
         return await self.get_all(
-            url=url, page_size=page_size, page_number=page_number,
-            sort=sort, genre=genre,
+            page_size=page_size, page_number=page_number,
+            sort=sort, filters=filters,
             filter_fields={"access_type": FilmAccessType.PUBLIC.value},
         )
 
     async def search(
-        self, query: str, url: str, page_size: int, page_number: int, sort: str | None = None,
+        self, query: str, page_size: int, page_number: int, sort: list[str] | None = None,
     ) -> list[FilmList]:
-        """Films search."""
+        """Films search.
+
+        The query is normalized (`query_normalizer`) before building the cache key and the Elasticsearch query,
+        so queries that differ in case or whitespace share cached pages.
+        """
+        cache_key_prefix = "films:search"
+        query = self.query_normalizer.normalize(query, prefix=cache_key_prefix)
         request_options = {
             "search_query": query, "page_size": page_size, "page_number": page_number,
             "search_fields": self.es_film_index_search_fields,
         }
+        base_key = orjson.dumps(
+            {"query": query, "sort": sort, "page": [page_size, page_number]}, option=orjson.OPT_SORT_KEYS,
+        ).decode()
         search_options = {
-            "cache_options": {"base_key": url, "prefix": "films:search"},
+            "cache_options": {"base_key": base_key, "prefix": cache_key_prefix},
             "sort": sort,
         }
         search_query = self.storage_repository.prepare_search_request(**request_options)
         return await self.storage_repository.search(search_query, FilmList, **search_options)
 
+    async def suggest(self, query: str, size: int) -> list[FilmSuggestion]:
+        """Suggest films whose titles start with the words of `query` (search-as-you-type).
+
+        Suggestions are served from the local `suggest_index` if it's loaded. Otherwise only ids and titles
+        are fetched and cached per normalized prefix by `suggest_storage_repository`, which is expected to have
+        a short cache TTL.
+        """
+        prefix = self.query_normalizer.normalize(query, prefix="films:suggest", prefix_search=True)
+        if not prefix:
+            return []
+        if self.suggest_index is not None:
+            found = self.suggest_index.find(prefix, size)
+            if found is not None:
+                return [FilmSuggestion(uuid=film_id, title=title) for film_id, title in found]
+        search_query = self.suggest_storage_repository.prepare_search_request(
+            search_query=prefix, search_fields=self.es_film_suggest_fields, search_type="bool_prefix",
+            source_fields=list(FilmSuggestion.__fields__), page_size=size, page_number=1,
+        )
+        search_options = {
+            "cache_options": {"base_key": f"{size}:{prefix}", "prefix": "films:suggest"},
+        }
+        return await self.suggest_storage_repository.search(search_query, FilmSuggestion, **search_options)
+
+    @classmethod
+    def get_list_sort(cls, sort: list[str] | None) -> list[str] | None:
+        """Get sort of the films list search request.
+
+        Films with equal ratings are ordered by id, like in the rating index, so pages served from the index
+        and from Elasticsearch don't overlap.
+        """
+        tie_breaker = cls.es_film_tie_breaker_sorts.get(",".join(sort or []))
+        return [*sort, tie_breaker] if sort and tie_breaker else sort
+
+    @classmethod
+    def get_list_request_options(cls, filters: FilmFilter | None, filter_fields: dict | None = None) -> dict:
+        """Get options of the films list search request for `prepare_search_request`.
+
+        All filters are exact, so they run in the filter context. Genres are matched by name case-insensitively,
+        persons by id in any role.
+        """
+        filter_fields = dict(filter_fields or {})
+        if filters is None:
+            return {"filter_fields": filter_fields}
+        if filters.genre:
+            genres = [{"value": genre, "case_insensitive": True} for genre in filters.genre]
+            filter_fields[cls.es_film_genre_filter_field] = genres[0] if len(genres) == 1 else genres
+        if filters.age_rating:
+            filter_fields["age_rating"] = [age_rating.value for age_rating in filters.age_rating]
+        release_date = _get_range(
+            filters.release_date_gte and filters.release_date_gte.isoformat(),
+            filters.release_date_lte and filters.release_date_lte.isoformat(),
+        )
+        if release_date:
+            filter_fields["release_date"] = release_date
+        imdb_rating = _get_range(filters.imdb_rating_gte, filters.imdb_rating_lte)
+        if imdb_rating:
+            filter_fields["imdb_rating"] = imdb_rating
+        if filters.person is not None:
+            filter_fields[cls.es_film_person_filter_fields] = str(filters.person)
+        return {"filter_fields": filter_fields}
+
+    async def _get_genre_view_page(
+        self, *,
+        page_size: int | None, page_number: int | None, sort: list[str] | None,
+        genre: str | None,
+        filter_fields: dict[str, str] | None,
+    ) -> list[FilmList] | None:
+        """Get page of films from the materialized genre view, `None` if the page isn't there."""
+        filter_fields = filter_fields or {}
+        if self.genre_views is None or genre is None or page_size is None or page_number is None:
+            return None
+        if filter_fields.keys() - {"access_type"}:
+            return None
+        return await self.genre_views.get_page(
+            genre=genre, sort=sort, access_type=filter_fields.get("access_type"),
+            offset=self.storage_repository.calc_offset(page_size, page_number), size=page_size,
+        )
+
+    async def _get_rating_index_page(
+        self, *,
+        page_size: int | None, page_number: int | None, sort: list[str] | None,
+        genre: str | None,
+        filter_fields: dict[str, str] | None,
+    ) -> list[FilmList] | None:
+        """Get page of films sorted by rating from the rating index, `None` if the page isn't there."""
+        filter_fields = filter_fields or {}
+        if self.rating_index is None or genre is not None or page_size is None or page_number is None:
+            return None
+        if filter_fields.keys() - {"access_type"}:
+            return None
+        return await self.rating_index.get_page(
+            sort=sort, access_type=filter_fields.get("access_type"),
+            offset=self.storage_repository.calc_offset(page_size, page_number), size=page_size,
+        )
+
+    async def _get_shared_page(
+        self, *,
+        page_size: int | None, page_number: int | None, sort: list[str] | None,
+        genre: str | None,
+        filter_fields: dict[str, str] | None,
+    ) -> list[FilmList] | None:
+        """Get page of films from the list shared by all access types, `None` if the page isn't there."""
+        filter_fields = filter_fields or {}
+        if not self.shared_list_depth or page_size is None or page_number is None:
+            return None
+        if filter_fields.keys() - {"access_type"}:
+            return None
+        access_type = filter_fields.get("access_type")
+        filters = FilmFilter(genre=[genre]) if genre is not None else None
+        search_query = self.storage_repository.prepare_search_request(**self.get_list_request_options(filters))
+        # pagination isn't a part of the key: all pages are taken from the same list
+        base_key = orjson.dumps({"sort": sort, "genre": genre}).decode()
+        return await self.storage_repository.search_partition(
+            search_query, FilmList,
+            partition_field="access_type", partition_values=None if access_type is None else {access_type},
+            offset=self.storage_repository.calc_offset(page_size, page_number), size=page_size,
+            max_depth=self.shared_list_depth,
+            cache_options={"base_key": base_key, "prefix": "films:list:shared"},
+            sort=self.get_list_sort(sort),
+        )
+
     @staticmethod
     def _get_film_list_key_prefix(filter_fields: dict | None) -> str:
         """Get cache key prefix."""
@@ -82,6 +268,21 @@ class FilmRepository:
         return prefix
 
 
+def _split_genre(filters: FilmFilter | None, /) -> tuple[str | None, FilmFilter | None]:
+    """Split a single genre off `filters`, return the genre and the rest of filters (`None` if there are none)."""
+    if filters is None:
+        return None, None
+    genre = filters.genre[0] if len(filters.genre) == 1 else None
+    other_filters = filters.dict(exclude_defaults=True, exclude={"genre"} if genre is not None else set())
+    return genre, filters if other_filters else None
+
+
+def _get_range(gte: Any, lte: Any, /) -> dict:
+    return {
+        operator: value for operator, value in (("gte", gte), ("lte", lte)) if value is not None
+    }
+
+
 def film_key_factory(key_builder: CacheKeyBuilder, min_length: int, *args, **kwargs) -> str:
     """Cache key factory."""
     film_id: str | None = kwargs.pop("doc_id", None)
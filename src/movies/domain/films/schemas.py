@@ -1,9 +1,12 @@
 import datetime
 from enum import Enum
+from uuid import UUID
+
+from pydantic import validator
 
 from movies.domain.genres import GenreDetail
 from movies.domain.persons.schemas import PersonList
-from movies.domain.schemas import BaseIdOrjsonSchema
+from movies.domain.schemas import BaseIdOrjsonSchema, BaseOrjsonSchema
 
 
 class FilmAgeRating(str, Enum):
@@ -47,3 +50,35 @@ class FilmList(BaseIdOrjsonSchema):
     title: str
     imdb_rating: float | None
     access_type: FilmAccessType
+
+
+class FilmSuggestion(BaseIdOrjsonSchema):
+    """Film title suggestion."""
+
+    title: str
+
+
+class FilmFilter(BaseOrjsonSchema):
+    """Films list filter.
+
+    Any of the values of a list filter matches, all the filters must match. Values are normalized
+    (genres are lowercased, lists are deduplicated and sorted), so equal filters have equal `dict()`.
+    """
+
+    genre: list[str] = []
+    age_rating: list[FilmAgeRating] = []
+    release_date_gte: datetime.date | None = None
+    release_date_lte: datetime.date | None = None
+    imdb_rating_gte: float | None = None
+    imdb_rating_lte: float | None = None
+    person: UUID | None = None
+
+    @validator("genre")
+    @classmethod
+    def _normalize_genre(cls, genres):
+        return sorted({genre.lower() for genre in genres})
+
+    @validator("age_rating")
+    @classmethod
+    def _normalize_age_rating(cls, age_ratings):
+        return sorted(set(age_ratings), key=lambda age_rating: age_rating.value)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING, ClassVar, Sequence
+
+import orjson
+
+from movies.core import tracing
+from movies.core.metrics import MATERIALIZED_VIEW_REQUESTS
+from movies.domain.genres import GenreDetail
+
+from .repositories import FilmRepository
+from .schemas import FilmAccessType, FilmFilter, FilmList
+
+if TYPE_CHECKING:
+    from movies.infrastructure.db.repositories import NoSQLStorageRepository
+    from movies.infrastructure.db.storage import AsyncNoSQLStorage
+    from movies.infrastructure.db.views import ViewStore
+
+logger = logging.getLogger(__name__)
+
+
+class FilmGenreViews:
+    """Materialized views of films lists filtered by genre.
+
+    Ordered ids of the first `depth` films are precomputed per genre × sort × access type by `materialize`,
+    so genre pages are served by slicing the views and reading films from the `films:brief` collection,
+    without Elasticsearch queries. Views are refreshed by a single worker every `refresh_interval` seconds
+    and expire if they haven't been refreshed three times in a row.
+    """
+
+    VIEW_KEY_PREFIX: ClassVar[str] = "films:view:genre"
+    ITEMS_KEY: ClassVar[str] = "films:brief"
+    LOCK_KEY: ClassVar[str] = "films:view:lock"
+    MAX_GENRES: ClassVar[int] = 1000
+
+    def __init__(
+        self,
+        store: ViewStore,
+        storage_repository: NoSQLStorageRepository,
+        genre_storage_repository: NoSQLStorageRepository,
+        *,
+        enabled: bool = False,
+        sorts: Sequence[str] = ("",),
+        depth: int = 1000,
+        refresh_interval: int = 10 * 60,
+    ) -> None:
+        self.store = store
+        self.storage_repository = storage_repository
+        self.genre_storage_repository = genre_storage_repository
+        self.enabled = enabled
+        self.sorts = list(sorts)
+        self.depth = depth
+        self.refresh_interval = refresh_interval
+
+    @property
+    def ttl(self) -> int:
+        return self.refresh_interval * 3
+
+    @classmethod
+    def make_key(cls, genre: str, sort: list[str] | None, access_type: str | None) -> str:
+        """Create a view key, `access_type=None` stands for all films."""
+        return f"{cls.VIEW_KEY_PREFIX}:{genre.lower()}:{_get_sort_key(sort)}:{access_type or 'all'}"
+
+    async def get_page(
+        self, *, genre: str, sort: list[str] | None, access_type: str | None, offset: int, size: int,
+    ) -> list[FilmList] | None:
+        """Get page of films from the view, `None` if the page isn't materialized."""
+        if not self.enabled or _get_sort_key(sort) not in self.sorts:
+            return None
+        with tracing.span("views.get_page", {"view.name": self.VIEW_KEY_PREFIX}):
+            ids = await self.store.get_page(self.make_key(genre, sort, access_type), offset, size)
+            items = await self.store.get_items(self.ITEMS_KEY, ids) if ids is not None else None
+            if items is None or any(item is None for item in items):
+                MATERIALIZED_VIEW_REQUESTS.labels(view=self.VIEW_KEY_PREFIX, result="miss").inc()
+                return None
+            MATERIALIZED_VIEW_REQUESTS.labels(view=self.VIEW_KEY_PREFIX, result="hit").inc()
+            return [FilmList.parse_obj(orjson.loads(item)) for item in items]
+
+    async def refresh(self) -> bool:
+        """Materialize views unless another worker has refreshed them within `refresh_interval`."""
+        if not await self.store.acquire_lock(self.LOCK_KEY, ttl=self.refresh_interval):
+            return False
+        await self.materialize()
+        return True
+
+    async def materialize(self) -> int:
+        """Precompute views of all genres, return the number of saved views.
+
+        Films are saved before views, so views never refer to missing films.
+        """
+        start = time.perf_counter()
+        views: dict[str, tuple[list[str], bool]] = {}
+        items: dict[str, bytes] = {}
+        with tracing.span("views.materialize", {"view.name": self.VIEW_KEY_PREFIX}):
+            genres = await self.genre_storage_repository.get_list(GenreDetail, size=self.MAX_GENRES)
+            for genre in genres:
+                for sort_key in self.sorts:
+                    sort = sort_key.split(",") if sort_key else None
+                    search_query = self.storage_repository.prepare_search_request(
+                        **FilmRepository.get_list_request_options(FilmFilter(genre=[genre.name])),
+                        page_size=self.depth, page_number=1,
+                    )
+                    films = await self.storage_repository.search(
+                        search_query, FilmList, sort=FilmRepository.get_list_sort(sort))
+                    truncated = len(films) >= self.depth
+                    views[self.make_key(genre.name, sort, None)] = ([str(film.uuid) for film in films], truncated)
+                    views[self.make_key(genre.name, sort, FilmAccessType.PUBLIC.value)] = (
+                        [str(film.uuid) for film in films if film.access_type == FilmAccessType.PUBLIC],
+                        truncated,
+                    )
+                    items.update((str(film.uuid), orjson.dumps(film.dict())) for film in films)
+            if items:
+                await self.store.save_items(self.ITEMS_KEY, items, ttl=self.ttl)
+            await self.store.save_views(views, ttl=self.ttl)
+        logger.info(
+            "Materialized %d genre views with %d films in %.2fs", len(views), len(items), time.perf_counter() - start)
+        return len(views)
+
+
+class FilmRatingIndex:
+    """Index of films sorted by `imdb_rating`: one sorted set of film ids per access type.
+
+    Pages of films sorted by rating (`imdb_rating` or `imdb_rating:desc`) are served with `ZRANGE`/`ZREVRANGE`
+    and reading films from the `films:brief` collection in O(log n + k). Films without rating are not indexed,
+    so pages that reach them are queried from Elasticsearch. Films with the same rating are ordered by id
+    in the sort direction, the same as in Elasticsearch (`FilmRepository.get_list_sort`).
+    The index is synced from the whole index by a single worker every `sync_interval` seconds.
+    """
+
+    RANKING_KEY_PREFIX: ClassVar[str] = "films:top_rated"
+    ITEMS_KEY: ClassVar[str] = FilmGenreViews.ITEMS_KEY
+    LOCK_KEY: ClassVar[str] = "films:top_rated:lock"
+    SORTS: ClassVar[dict[str, bool]] = {"imdb_rating:desc": True, "imdb_rating": False}
+    SOURCE_FIELDS: ClassVar[list[str]] = list(FilmList.__fields__)
+
+    def __init__(
+        self,
+        store: ViewStore,
+        storage: AsyncNoSQLStorage,
+        index_name: str,
+        *,
+        enabled: bool = False,
+        sync_interval: int = 10 * 60,
+        batch_size: int = 1000,
+    ) -> None:
+        self.store = store
+        self.storage = storage
+        self.index_name = index_name
+        self.enabled = enabled
+        self.sync_interval = sync_interval
+        self.batch_size = batch_size
+
+    @property
+    def ttl(self) -> int:
+        return self.sync_interval * 3
+
+    @classmethod
+    def make_key(cls, access_type: str | None) -> str:
+        """Create a ranking key, `access_type=None` stands for all films."""
+        return f"{cls.RANKING_KEY_PREFIX}:{access_type or 'all'}"
+
+    async def get_page(
+        self, *, sort: list[str] | None, access_type: str | None, offset: int, size: int,
+    ) -> list[FilmList] | None:
+        """Get page of films sorted by rating, `None` if the page can't be served from the index."""
+        descending = self.SORTS.get(_get_sort_key(sort))
+        if not self.enabled or descending is None:
+            return None
+        with tracing.span("views.get_page", {"view.name": self.RANKING_KEY_PREFIX}):
+            ids = await self.store.get_ranked_page(self.make_key(access_type), offset, size, descending=descending)
+            items = await self.store.get_items(self.ITEMS_KEY, ids) if ids is not None else None
+            if items is None or any(item is None for item in items):
+                MATERIALIZED_VIEW_REQUESTS.labels(view=self.RANKING_KEY_PREFIX, result="miss").inc()
+                return None
+            MATERIALIZED_VIEW_REQUESTS.labels(view=self.RANKING_KEY_PREFIX, result="hit").inc()
+            return [FilmList.parse_obj(orjson.loads(item)) for item in items]
+
+    async def refresh(self) -> bool:
+        """Sync the index unless another worker has synced it within `sync_interval`."""
+        if not await self.store.acquire_lock(self.LOCK_KEY, ttl=self.sync_interval):
+            return False
+        await self.sync()
+        return True
+
+    async def sync(self) -> int:
+        """Rebuild rankings from all films, return the number of indexed films."""
+        start = time.perf_counter()
+        scores: dict[str, float] = {}
+        public_scores: dict[str, float] = {}
+        with tracing.span("views.sync", {"view.name": self.RANKING_KEY_PREFIX}):
+            query = {"query": {"match_all": {}}, "_source": self.SOURCE_FIELDS}
+            async for batch in self.storage.scan(self.index_name, query, batch_size=self.batch_size):
+                films = [FilmList.parse_obj(doc) for doc in batch]
+                items = {str(film.uuid): orjson.dumps(film.dict()) for film in films}
+                await self.store.save_items(self.ITEMS_KEY, items, ttl=self.ttl)
+                for film in films:
+                    if film.imdb_rating is None:
+                        continue
+                    scores[str(film.uuid)] = film.imdb_rating
+                    if film.access_type == FilmAccessType.PUBLIC:
+                        public_scores[str(film.uuid)] = film.imdb_rating
+            await self.store.save_ranking(self.make_key(None), scores, ttl=self.ttl)
+            await self.store.save_ranking(self.make_key(FilmAccessType.PUBLIC.value), public_scores, ttl=self.ttl)
+        logger.info("Synced rating index with %d films in %.2fs", len(scores), time.perf_counter() - start)
+        return len(scores)
+
+
+def _get_sort_key(sort: list[str] | None, /) -> str:
+    return ",".join(sort or [])
@@ -3,12 +3,17 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, ClassVar, Sequence
 from uuid import UUID
 
+import orjson
+
+from movies.domain.search import QueryNormalizer
+
 from .schemas import PersonList, PersonShortDetail
 
 if TYPE_CHECKING:
     from movies.common.types import ApiSchemaClass
     from movies.domain.films import FilmList, FilmRepository
     from movies.domain.roles.schemas import PersonFullDetail
+    from movies.domain.suggestions import SuggestIndex
     from movies.infrastructure.db.cache import CacheKeyBuilder
     from movies.infrastructure.db.repositories import NoSQLStorageRepository
 
@@ -17,10 +22,24 @@ class PersonRepository:
     """Person repository."""
 
     es_person_index_search_fields: ClassVar[Sequence[str]] = ["full_name"]
-
-    def __init__(self, storage_repository: NoSQLStorageRepository, film_repository: FilmRepository) -> None:
+    # `search_as_you_type` field and its shingle subfields
+    es_person_suggest_fields: ClassVar[Sequence[str]] = [
+        "full_name.suggest", "full_name.suggest._2gram", "full_name.suggest._3gram",
+    ]
+
+    def __init__(
+        self,
+        storage_repository: NoSQLStorageRepository,
+        film_repository: FilmRepository,
+        suggest_storage_repository: NoSQLStorageRepository | None = None,
+        suggest_index: SuggestIndex | None = None,
+        query_normalizer: QueryNormalizer | None = None,
+    ) -> None:
         self.storage_repository = storage_repository
         self.film_repository = film_repository
+        self.suggest_storage_repository = suggest_storage_repository or storage_repository
+        self.suggest_index = suggest_index
+        self.query_normalizer = query_normalizer or QueryNormalizer()
 
     async def get_by_id(self, person_id: UUID, /) -> PersonShortDetail:
         """Get person by id."""
@@ -40,18 +59,44 @@ class PersonRepository:
         request_body = self.storage_repository.prepare_search_request(page_size=page_size, page_number=page_number)
         return await self.storage_repository.search(request_body, PersonList, **search_options)
 
-    async def search(self, query: str, url: str, page_size: int, page_number: int) -> list[PersonShortDetail]:
-        """Persons search."""
+    async def search(self, query: str, page_size: int, page_number: int) -> list[PersonShortDetail]:
+        """Persons search, the query is normalized (`query_normalizer`) before building the cache key."""
+        cache_key_prefix = "persons:search"
+        query = self.query_normalizer.normalize(query, prefix=cache_key_prefix)
         request_options = {
             "search_query": query, "page_size": page_size, "page_number": page_number,
             "search_fields": self.es_person_index_search_fields,
         }
+        base_key = orjson.dumps({"query": query, "page": [page_size, page_number]}, option=orjson.OPT_SORT_KEYS)
         search_options = {
-            "cache_options": {"base_key": url, "prefix": "persons:search"},
+            "cache_options": {"base_key": base_key.decode(), "prefix": cache_key_prefix},
         }
         search_query = self.storage_repository.prepare_search_request(**request_options)
         return await self.storage_repository.search(search_query, PersonShortDetail, **search_options)
 
+    async def suggest(self, query: str, size: int) -> list[PersonList]:
+        """Suggest persons whose full names start with the words of `query` (search-as-you-type).
+
+        Suggestions are served from the local `suggest_index` if it's loaded. Otherwise only ids and names
+        are fetched and cached per normalized prefix by `suggest_storage_repository`, which is expected to have
+        a short cache TTL.
+        """
+        prefix = self.query_normalizer.normalize(query, prefix="persons:suggest", prefix_search=True)
+        if not prefix:
+            return []
+        if self.suggest_index is not None:
+            found = self.suggest_index.find(prefix, size)
+            if found is not None:
+                return [PersonList(uuid=person_id, full_name=full_name) for person_id, full_name in found]
+        search_query = self.suggest_storage_repository.prepare_search_request(
+            search_query=prefix, search_fields=self.es_person_suggest_fields, search_type="bool_prefix",
+            source_fields=list(PersonList.__fields__), page_size=size, page_number=1,
+        )
+        search_options = {
+            "cache_options": {"base_key": f"{size}:{prefix}", "prefix": "persons:suggest"},
+        }
+        return await self.suggest_storage_repository.search(search_query, PersonList, **search_options)
+
     async def get_person_films(self, person_id: UUID, /) -> list[FilmList]:
         """Get person films by id."""
         from movies.domain.films.schemas import FilmList
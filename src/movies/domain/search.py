@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import unicodedata
+from typing import Final
+
+from movies.core.metrics import SEARCH_QUERIES
+
+# Stop words of the `ru_en` analyzer: `_english_` and `_russian_` lists of Elasticsearch (Lucene)
+ENGLISH_STOPWORDS: Final[frozenset[str]] = frozenset((
+    "a an and are as at be but by for if in into is it no not of on or such that the their then there these they "
+    "this to was will with"
+).split())
+RUSSIAN_STOPWORDS: Final[frozenset[str]] = frozenset((
+    "а без более больше будет будто бы был была были было быть в вам вас вдруг ведь во вот впрочем все всегда всего "
+    "всех всю вы где говорил да даже два для до другой его ее ей ему если есть еще ж же жизнь за зачем здесь и из "
+    "или им иногда их к кажется как какая какой когда конечно кто куда ли лучше между меня мне много может можно мой "
+    "моя мы на над надо наконец нас не него нее ней нельзя нет ни нибудь никогда ним них ничего но ну о об один он "
+    "она они опять от перед по под после потом потому почти при про раз разве с сам свою себе себя сегодня сейчас "
+    "сказал сказала сказать со совсем так такой там тебя тем теперь то тогда того тоже только том тот три тут ты у "
+    "уж уже хорошо хоть чего человек чем через что чтоб чтобы чуть эти этого этой этом этот эту я"
+).split())
+STOPWORDS: Final[frozenset[str]] = ENGLISH_STOPWORDS | RUSSIAN_STOPWORDS
+
+
+def normalize_query(query: str, /) -> str:
+    """Normalize Unicode (NFKC), lowercase the query and collapse whitespace."""
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+class QueryNormalizer:
+    """Normalizer of search queries, applied before building cache keys and Elasticsearch queries.
+
+    Queries that differ only in case, whitespace or Unicode forms share cached results. Lowercasing is the same
+    as the `lowercase` filter of the `ru_en` analyzer (not `str.casefold`, e.g. "ß" isn't "ss"), so results
+    don't change. If `remove_stopwords` is set, stop words of the analyzer are removed too: they are dropped
+    by the analyzer anyway, so "the matrix" and "matrix" share results. A query of stop words only is kept.
+    Queries are counted by cache key prefix and whether the normalization changed them.
+    """
+
+    def __init__(self, *, remove_stopwords: bool = False) -> None:
+        self.remove_stopwords = remove_stopwords
+
+    def normalize(self, query: str, /, *, prefix: str, prefix_search: bool = False) -> str:
+        """Normalize the query of requests cached with the key prefix.
+
+        Stop words are kept in `prefix_search` queries (search-as-you-type): the last word may be unfinished.
+        """
+        normalized = normalize_query(query)
+        if self.remove_stopwords and not prefix_search:
+            normalized = " ".join(word for word in normalized.split(" ") if word not in STOPWORDS) or normalized
+        SEARCH_QUERIES.labels(prefix=prefix, normalized=str(normalized != query).lower()).inc()
+        return normalized
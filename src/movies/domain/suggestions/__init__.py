@@ -0,0 +1,6 @@
+from .index import PrefixIndex, SuggestIndex
+
+__all__ = [
+    "PrefixIndex",
+    "SuggestIndex",
+]
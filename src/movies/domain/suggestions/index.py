@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time
+from array import array
+from typing import TYPE_CHECKING, ClassVar, Iterable
+
+from movies.core import tracing
+from movies.core.metrics import MATERIALIZED_VIEW_REQUESTS
+from movies.domain.search import normalize_query
+
+if TYPE_CHECKING:
+    from movies.infrastructure.db.storage import AsyncNoSQLStorage
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\x00"
+
+
+class _StringArray:
+    """Immutable list of strings packed into a single string with an array of offsets.
+
+    Takes a byte (two or four bytes if any string has wider characters) per character and 4 bytes per string
+    instead of a `str` object and a list pointer (~60 bytes) per string.
+    """
+
+    __slots__ = ("text", "offsets")
+
+    def __init__(self, values: Iterable[str]) -> None:
+        self.offsets = array("I")
+        parts = []
+        position = 0
+        for value in values:
+            self.offsets.append(position)
+            parts.append(value)
+            position += len(value) + 1
+        self.text = SEPARATOR.join(parts) + SEPARATOR
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> str:
+        return self.get(self.offsets[index])
+
+    def get(self, offset: int) -> str:
+        """Get the string (or its suffix) at the offset in the text."""
+        return self.text[offset:self.text.index(SEPARATOR, offset)]
+
+    def find(self, offset: int) -> int:
+        """Find the index of the string that contains the offset."""
+        return bisect.bisect_right(self.offsets, offset) - 1
+
+
+class PrefixIndex:
+    """In-memory prefix index of entries (id and label, e.g. a film title or a person name).
+
+    Normalized labels (`normalize`) are packed into a single string, the index is two arrays of offsets
+    in it sorted by the strings they start: offsets of labels and offsets of their other words (suffixes like
+    "wars of the roses", "of the roses", ...). Like `bool_prefix` queries of the Elasticsearch fallback, a query
+    matches labels that have a word starting with every word of the query, in any order ("wars star" matches
+    "Star Wars"). Labels that start with the query come first, then labels with a word that starts with it,
+    then other matches. Unlike Elasticsearch, words are not stemmed and stop words are not dropped, and every
+    query word (not only the last one) may be a prefix. A lookup is a binary search plus a scan of matching offsets.
+    """
+
+    __slots__ = ("_ids", "_labels", "_keys", "_heads", "_tails")
+
+    def __init__(self, entries: Iterable[tuple[str, str]]) -> None:
+        ids, labels, keys = [], [], []
+        for entry_id, label in entries:
+            key = self.normalize(label)
+            if key:
+                ids.append(entry_id)
+                labels.append(label)
+                keys.append(key)
+        self._ids = _StringArray(ids)
+        self._labels = _StringArray(labels)
+        self._keys = _StringArray(keys)
+        words = [
+            offset + position + 1
+            for offset, key in zip(self._keys.offsets, keys)
+            for position, char in enumerate(key) if char == " "
+        ]
+        self._heads = array("I", sorted(self._keys.offsets, key=self._keys.get))
+        self._tails = array("I", sorted(words, key=self._keys.get))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def normalize(text: str, /) -> str:
+        """Normalize the text the same way as search queries (`normalize_query`)."""
+        return normalize_query(text.replace(SEPARATOR, " "))
+
+    def find(self, query: str, size: int) -> list[tuple[str, str]]:
+        """Find up to `size` entries with a word of the label starting with every query word, return ids and labels."""
+        prefix = self.normalize(query)
+        if not prefix:
+            return []
+        words = prefix.split(" ")
+        # the whole query as a prefix, then every word in any order: word starts matching the most selective word
+        # are filtered by the other words
+        passes = [(self._heads, prefix, None), (self._tails, prefix, None)]
+        if len(words) > 1:
+            rarest = min(words, key=lambda word: sum(len(self._range(offsets, word)) for offsets in self._arrays))
+            passes += [(offsets, rarest, words) for offsets in self._arrays]
+        found: dict[int, None] = {}
+        for offsets, key_prefix, required_words in passes:
+            for index in self._range(offsets, key_prefix):
+                ref = self._keys.find(offsets[index])
+                if ref in found or (required_words is not None and not _has_words(self._keys[ref], required_words)):
+                    continue
+                found[ref] = None
+                if len(found) >= size:
+                    return self._get_entries(found)
+        return self._get_entries(found)
+
+    def _get_entries(self, refs: Iterable[int]) -> list[tuple[str, str]]:
+        return [(self._ids[ref], self._labels[ref]) for ref in refs]
+
+    @property
+    def _arrays(self) -> tuple[array, array]:
+        return self._heads, self._tails
+
+    def _range(self, offsets: array, prefix: str) -> range:
+        """Get the range of indices of sorted offsets of strings that start with the prefix.
+
+        Strings are compared by their first `len(prefix)` characters (with the separator and the next strings
+        if they are shorter): the separator sorts before any other character, so these heads are sorted too,
+        and a head equals the prefix only if the string starts with it.
+        """
+        text = self._keys.text
+        length = len(prefix)
+
+        def head(offset: int) -> str:
+            return text[offset:offset + length]
+
+        return range(bisect.bisect_left(offsets, prefix, key=head), bisect.bisect_right(offsets, prefix, key=head))
+
+
+def _has_words(key: str, prefixes: list[str]) -> bool:
+    """Check that every prefix starts a word of the key (words of normalized keys are separated by single spaces)."""
+    key = f" {key}"
+    return all(f" {prefix}" in key for prefix in prefixes)
+
+
+class SuggestIndex:
+    """Local index of labels of all documents of a collection for search-as-you-type without network calls.
+
+    Every worker loads `field` of all documents of `index_name` with `refresh` (see `tasks.periodic_task`)
+    and swaps the index when it's built. Lookups return `None` until the first load or if the index is disabled,
+    so callers fall back to Elasticsearch. Suggestions may be stale for up to the refresh interval.
+    """
+
+    VIEW_PREFIX: ClassVar[str] = "suggest"
+
+    def __init__(
+        self, storage: AsyncNoSQLStorage, index_name: str, field: str, *, enabled: bool = False, batch_size: int = 1000,
+    ) -> None:
+        self.storage = storage
+        self.index_name = index_name
+        self.field = field
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self._index: PrefixIndex | None = None
+
+    @property
+    def view_name(self) -> str:
+        return f"{self.VIEW_PREFIX}:{self.index_name}"
+
+    def find(self, query: str, size: int) -> list[tuple[str, str]] | None:
+        """Find ids and labels of up to `size` documents by prefix, `None` if the index isn't loaded."""
+        if not self.enabled:
+            return None
+        if self._index is None:
+            MATERIALIZED_VIEW_REQUESTS.labels(view=self.view_name, result="miss").inc()
+            return None
+        MATERIALIZED_VIEW_REQUESTS.labels(view=self.view_name, result="hit").inc()
+        return self._index.find(query, size)
+
+    async def refresh(self) -> int:
+        """Load labels of all documents and rebuild the index, return the number of indexed documents."""
+        start = time.perf_counter()
+        entries = []
+        with tracing.span("views.sync", {"view.name": self.view_name}):
+            query = {"query": {"match_all": {}}, "_source": ["uuid", self.field]}
+            async for batch in self.storage.scan(self.index_name, query, batch_size=self.batch_size):
+                entries.extend((str(doc["uuid"]), doc[self.field]) for doc in batch if doc.get(self.field))
+            # build in a thread: the event loop keeps serving requests between GIL switches
+            self._index = await asyncio.to_thread(PrefixIndex, entries)
+        logger.info(
+            "Loaded suggest index of %s with %d documents in %.2fs",
+            self.index_name, len(self._index), time.perf_counter() - start,
+        )
+        return len(self._index)
@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING, Any
 if TYPE_CHECKING:
     from movies.common.types import seconds
 
+    from .compression import CacheCompression
     from .redis import RedisClient
 
 
@@ -73,16 +74,32 @@ class AsyncCache(ABC):
 
 
 class RedisCache(AsyncCache):
-    """Redis cache."""
+    """Redis cache.
 
-    def __init__(self, client: RedisClient, default_ttl: seconds | datetime.timedelta | None = None) -> None:
+    Values are compressed with the given `compression`, if any.
+    """
+
+    def __init__(
+        self,
+        client: RedisClient,
+        default_ttl: seconds | datetime.timedelta | None = None,
+        compression: CacheCompression | None = None,
+    ) -> None:
         self.client = client
         self.default_ttl = default_ttl
+        self.compression = compression
 
     async def get(self, key: str, /, *, default: Any | None = None) -> Any:
-        return await self.client.get(key, default=default)
+        data = await self.client.get(key)
+        if data is None:
+            return default
+        if self.compression is not None:
+            return self.compression.decode(data)
+        return data
 
     async def set(self, key: str, data: Any, *, ttl: seconds | None = None) -> bool:
+        if self.compression is not None:
+            data = self.compression.encode(data)
         return await self.client.set(key, data, timeout=self.get_ttl(ttl))
 
     def get_ttl(self, ttl: seconds | datetime.timedelta | None = None, /) -> seconds | datetime.timedelta | None:
@@ -91,3 +108,45 @@ class RedisCache(AsyncCache):
         if isinstance(ttl, datetime.timedelta):
             return ttl
         return None if ttl is None else max(0, int(ttl))
+
+
+class TieredCache(AsyncCache):
+    """Two-level cache: values are read from the `local` cache (e.g. shared by workers of the host) first.
+
+    Values read from or saved to the `remote` cache are copied to the `local` one for `local_ttl` seconds at most,
+    so local values may be stale for up to `local_ttl` seconds. Without `local` cache all calls go to `remote`.
+    """
+
+    def __init__(self, remote: AsyncCache, local: AsyncCache | None = None, local_ttl: seconds = 30) -> None:
+        self.remote = remote
+        self.local = local
+        self.local_ttl = local_ttl
+
+    async def get(self, key: str, /, *, default: Any | None = None) -> Any:
+        if self.local is not None:
+            data = await self.local.get(key)
+            if data is not None:
+                return data
+        data = await self.remote.get(key)
+        if data is None:
+            return default
+        if self.local is not None:
+            await self.local.set(key, data, ttl=self.local_ttl)
+        return data
+
+    async def set(self, key: str, data: Any, *, ttl: seconds | datetime.timedelta | None = None) -> bool:
+        saved = await self.remote.set(key, data, ttl=ttl)
+        if self.local is not None:
+            await self.local.set(key, data, ttl=self._get_local_ttl(ttl))
+        return saved
+
+    def get_ttl(self, ttl: seconds | datetime.timedelta | None = None, /) -> seconds | datetime.timedelta | None:
+        return self.remote.get_ttl(ttl)
+
+    def _get_local_ttl(self, ttl: seconds | datetime.timedelta | None, /) -> seconds:
+        remote_ttl = self.remote.get_ttl(ttl)
+        if isinstance(remote_ttl, datetime.timedelta):
+            remote_ttl = int(remote_ttl.total_seconds())
+        if remote_ttl is None:
+            return self.local_ttl
+        return min(self.local_ttl, remote_ttl)
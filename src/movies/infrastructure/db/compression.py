@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import zlib
+from abc import ABC, abstractmethod
+from typing import ClassVar
+
+from movies.common.exceptions import ImproperlyConfiguredError
+
+
+class Compressor(ABC):
+    """Compression algorithm."""
+
+    name: ClassVar[str]
+    header: ClassVar[bytes]
+
+    @abstractmethod
+    def compress(self, data: bytes, /) -> bytes:
+        """Compress data."""
+
+    @abstractmethod
+    def decompress(self, data: bytes, /) -> bytes:
+        """Decompress data."""
+
+
+class ZlibCompressor(Compressor):
+    """Zlib compressor."""
+
+    name = "zlib"
+    header = b"\x01"
+
+    def compress(self, data: bytes, /) -> bytes:
+        return zlib.compress(data)
+
+    def decompress(self, data: bytes, /) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    """Zstandard compressor.
+
+    Requires `zstandard` package.
+    """
+
+    name = "zstd"
+    header = b"\x02"
+
+    def __init__(self) -> None:
+        try:
+            import zstandard
+        except ImportError:
+            raise ImproperlyConfiguredError("`zstandard` package is required for zstd compression")
+        self._compressor = zstandard.ZstdCompressor()
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes, /) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes, /) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    """LZ4 compressor.
+
+    Requires `lz4` package.
+    """
+
+    name = "lz4"
+    header = b"\x03"
+
+    def __init__(self) -> None:
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ImproperlyConfiguredError("`lz4` package is required for lz4 compression")
+        self._lz4 = lz4.frame
+
+    def compress(self, data: bytes, /) -> bytes:
+        return self._lz4.compress(data)
+
+    def decompress(self, data: bytes, /) -> bytes:
+        return self._lz4.decompress(data)
+
+
+COMPRESSORS: dict[str, type[Compressor]] = {
+    compressor_cls.name: compressor_cls
+    for compressor_cls in (ZlibCompressor, ZstdCompressor, Lz4Compressor)
+}
+COMPRESSORS_BY_HEADER: dict[bytes, type[Compressor]] = {
+    compressor_cls.header: compressor_cls
+    for compressor_cls in COMPRESSORS.values()
+}
+
+
+class CacheCompression:
+    """Transparent compression of cache values.
+
+    Values larger than `min_size` bytes are compressed and prefixed with a header byte of the compressor.
+    Smaller values are saved as is, so compressed and uncompressed values can coexist in the cache.
+    """
+
+    def __init__(self, algorithm: str | None = None, min_size: int = 1024) -> None:
+        if algorithm is not None and algorithm not in COMPRESSORS:
+            raise ImproperlyConfiguredError(f"Unknown compression algorithm: {algorithm}")
+        self.compressor = COMPRESSORS[algorithm]() if algorithm is not None else None
+        self.min_size = min_size
+        self._decompressors: dict[bytes, Compressor] = {}
+        if self.compressor is not None:
+            self._decompressors[self.compressor.header] = self.compressor
+
+    def encode(self, data: bytes, /) -> bytes:
+        """Compress data if it is large enough."""
+        if self.compressor is None or len(data) < self.min_size:
+            return data
+        return self.compressor.header + self.compressor.compress(data)
+
+    def decode(self, data: bytes, /) -> bytes:
+        """Decompress data if it has been compressed."""
+        header = data[:1]
+        if header not in COMPRESSORS_BY_HEADER:
+            return data
+        compressor = self._decompressors.get(header)
+        if compressor is None:
+            # value has been saved with another algorithm
+            compressor = self._decompressors[header] = COMPRESSORS_BY_HEADER[header]()
+        return compressor.decompress(data[1:])
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-from typing import AsyncIterator, ClassVar
+import contextlib
+import time
+from typing import Any, AsyncIterator, ClassVar, Iterator
 
 from elasticsearch import AsyncElasticsearch
 from elasticsearch import NotFoundError as ElasticNotFoundError
 
 from movies.common.exceptions import NotFoundError
 from movies.common.types import Id, Query
+from movies.core import concurrency, health, tracing
+from movies.core.metrics import ELASTIC_REQUEST_LATENCY
 
 
 async def init_elastic(host: str, port: int, retry_on_timeout: bool = True) -> AsyncIterator[AsyncElasticsearch]:
@@ -27,6 +31,8 @@ class ElasticClient:
     """Elasticsearch client."""
 
     REQUEST_TIMEOUT: ClassVar[int] = 5  # 5 seconds
+    PIT_KEEP_ALIVE: ClassVar[str] = "1m"
+    CLUSTER_STATUSES: ClassVar[dict[str, str]] = {"green": health.OK, "yellow": health.DEGRADED, "red": health.DOWN}
 
     def __init__(self, elastic_client: AsyncElasticsearch) -> None:
         self.elastic_client = elastic_client
@@ -34,10 +40,28 @@ class ElasticClient:
     def get_client(self, *, index: str) -> AsyncElasticsearch:
         return self._get_client(index=index)
 
+    async def ping(self) -> bool:
+        """Check that the cluster is reachable."""
+        return await self.elastic_client.ping(request_timeout=ElasticClient.REQUEST_TIMEOUT)
+
+    async def health(self) -> dict[str, Any]:
+        """Get the cluster health: yellow clusters are degraded, red ones are down."""
+        cluster_health = await self.elastic_client.cluster.health(request_timeout=ElasticClient.REQUEST_TIMEOUT)
+        return {
+            "status": ElasticClient.CLUSTER_STATUSES.get(cluster_health["status"], health.DOWN),
+            "cluster_status": cluster_health["status"],
+            "nodes": cluster_health["number_of_nodes"],
+            "unassigned_shards": cluster_health["unassigned_shards"],
+        }
+
     async def get_by_id(self, document_id: Id, /, *, index: str) -> dict:
         client = self.get_client(index=index)
         try:
-            doc = await client.get(index=index, id=str(document_id), request_timeout=ElasticClient.REQUEST_TIMEOUT)
+            with (
+                tracing.span("elastic.get", _span_attributes(index, "get"), kind=tracing.SpanKind.CLIENT),
+                _measure_latency(index, "get"),
+            ):
+                doc = await client.get(index=index, id=str(document_id), request_timeout=ElasticClient.REQUEST_TIMEOUT)
         except ElasticNotFoundError:
             raise NotFoundError
         return doc["_source"]
@@ -45,9 +69,54 @@ class ElasticClient:
     async def search(self, index: str, query: Query, **options) -> list[dict]:
         client = self.get_client(index=index)
         timeout = options.pop("request_timeout", ElasticClient.REQUEST_TIMEOUT)
-        docs = await client.search(index=index, body=query, request_timeout=timeout, **options)
+        with (
+            tracing.span("elastic.search", _span_attributes(index, "search"), kind=tracing.SpanKind.CLIENT),
+            _measure_latency(index, "search"),
+        ):
+            docs = await client.search(index=index, body=query, request_timeout=timeout, **options)
         return self._prepare_documents_list(docs)
 
+    async def scan(
+        self,
+        index: str,
+        query: Query,
+        *,
+        batch_size: int,
+        slice_id: int | None = None,
+        max_slices: int | None = None,
+        search_after: list | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """Iterate over all documents that match the `query` in batches.
+
+        Uses a point in time (PIT) with `search_after` pagination, documents are sorted by `uuid`.
+        The last seen `uuid` can be passed in `search_after` to resume the iteration.
+        If `max_slices` is given, only documents from the `slice_id` slice are returned.
+        """
+        client = self.get_client(index=index)
+        pit = await client.open_point_in_time(index=index, keep_alive=ElasticClient.PIT_KEEP_ALIVE)
+        pit_id = pit["id"]
+        body = {**query, "size": batch_size, "sort": [{"uuid": "asc"}]}
+        if max_slices is not None and max_slices > 1:
+            body["slice"] = {"id": slice_id, "max": max_slices}
+        try:
+            while True:
+                body["pit"] = {"id": pit_id, "keep_alive": ElasticClient.PIT_KEEP_ALIVE}
+                if search_after is not None:
+                    body["search_after"] = search_after
+                with (
+                    tracing.span("elastic.scan", _span_attributes(index, "scan"), kind=tracing.SpanKind.CLIENT),
+                    _measure_latency(index, "scan"),
+                ):
+                    docs = await client.search(body=body, request_timeout=ElasticClient.REQUEST_TIMEOUT)
+                hits = docs["hits"]["hits"]
+                if not hits:
+                    break
+                pit_id = docs.get("pit_id", pit_id)
+                search_after = hits[-1]["sort"]
+                yield self._prepare_documents_list(docs)
+        finally:
+            await client.close_point_in_time(body={"id": pit_id})
+
     def _get_client(self, *, index: str) -> AsyncElasticsearch:
         return self.elastic_client
 
@@ -58,3 +127,19 @@ class ElasticClient:
             for doc in docs["hits"]["hits"]
         ]
         return results
+
+
+def _span_attributes(index: str, operation: str, /) -> dict[str, str]:
+    return {"db.system": "elasticsearch", "db.operation": operation, "db.elasticsearch.index": index}
+
+
+@contextlib.contextmanager
+def _measure_latency(index: str, operation: str, /) -> Iterator[None]:
+    """Observe latency of the request in metrics and for the concurrency limiter of the current HTTP request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        latency = time.perf_counter() - start
+        ELASTIC_REQUEST_LATENCY.labels(index=index, operation=operation).observe(latency)
+        concurrency.add_backend_latency(latency)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from .redis import RedisClient
+
+# GCRA: a key stores the theoretical arrival time (TAT) of the next request, every request moves it by the emission
+# interval. Returns backlogs: how far TATs are ahead of now (Redis time), keys expire when their TAT passes.
+# KEYS: rate limit keys, ARGV: number of requests and emission interval (seconds) of every key
+GCRA_SCRIPT: Final[str] = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local backlogs = {}
+for index, key in ipairs(KEYS) do
+    local count = tonumber(ARGV[index * 2 - 1])
+    local interval = tonumber(ARGV[index * 2])
+    local tat = math.max(tonumber(redis.call("GET", key) or now), now) + count * interval
+    local backlog = tat - now
+    redis.call("SET", key, string.format("%.6f", tat), "PX", math.max(1, math.ceil(backlog * 1000)))
+    backlogs[index] = string.format("%.6f", backlog)
+end
+return backlogs
+"""
+
+
+class RateLimitStore(ABC):
+    """Shared state of rate limits (GCRA)."""
+
+    @abstractmethod
+    async def consume(self, requests: list[tuple[str, int, float]]) -> list[float]:
+        """Count requests by keys, return backlogs of the keys in seconds.
+
+        `requests` are tuples of a key, the number of requests and their emission interval (seconds). A backlog
+        is how far the time the next request of the key would be allowed at with no burst is ahead of now.
+        """
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Redis store of rate limits: all keys are updated by a single Lua script call."""
+
+    def __init__(self, client: RedisClient) -> None:
+        self.client = client
+
+    async def consume(self, requests: list[tuple[str, int, float]]) -> list[float]:
+        keys = [key for key, _, _ in requests]
+        args = [value for _, count, interval in requests for value in (count, repr(interval))]
+        backlogs = await self.client.run_script("rate_limits.consume", GCRA_SCRIPT, keys, args)
+        return [float(backlog) for backlog in backlogs]
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING, Any, AsyncIterator
 
 import aioredis
 import aioredis.sentinel
 
+from movies.core import health, tracing
+from movies.core.metrics import REDIS_REQUEST_LATENCY
+
 if TYPE_CHECKING:
     from movies.common.types import seconds
 
@@ -36,16 +40,82 @@ class RedisClient:
         await self.post_init_client(client)
         return client
 
+    async def ping(self) -> bool:
+        """Check that Sentinel is reachable and the master it reports responds."""
+        client = await self.get_client(write=True)
+        return await client.ping()
+
+    async def ping_replica(self) -> bool:
+        """Check that a replica reported by Sentinel responds."""
+        replica = await self.sentinel_client.slave_for(self.service_name, **self.connection_options)
+        return await replica.ping()
+
+    async def sentinel_state(self) -> dict[str, Any]:
+        """Get the master address, the number of alive replicas and reachable sentinels.
+
+        The state is degraded if there are no replicas or some sentinels are unreachable.
+        """
+        host, port = await self.sentinel_client.discover_master(self.service_name)
+        replicas = await self.sentinel_client.discover_slaves(self.service_name)
+        pings = await asyncio.gather(
+            *(sentinel.ping() for sentinel in self.sentinel_client.sentinels), return_exceptions=True,
+        )
+        sentinels_up = sum(ping is True for ping in pings)
+        degraded = not replicas or sentinels_up < len(pings)
+        return {
+            "status": health.DEGRADED if degraded else health.OK,
+            "master": f"{host}:{port}",
+            "replicas": len(replicas),
+            "sentinels": f"{sentinels_up}/{len(pings)}",
+        }
+
     async def get(self, key: str, /, *, default: Any | None = None) -> Any:
-        client = await self.get_client(key)
-        value = await client.get(key)
+        with (
+            tracing.span("redis.get", {"db.system": "redis", "db.operation": "get"}, kind=tracing.SpanKind.CLIENT),
+            REDIS_REQUEST_LATENCY.labels(operation="get").time(),
+        ):
+            client = await self.get_client(key)
+            value = await client.get(key)
         return default if value is None else value
 
     async def set(self, key: str, data: Any, *, timeout: seconds | None = None) -> bool:
-        client = await self.get_client(key, write=True)
-        if timeout is not None:
-            return await client.set(key, data, ex=timeout)
-        return await client.set(key, data)
+        with (
+            tracing.span("redis.set", {"db.system": "redis", "db.operation": "set"}, kind=tracing.SpanKind.CLIENT),
+            REDIS_REQUEST_LATENCY.labels(operation="set").time(),
+        ):
+            client = await self.get_client(key, write=True)
+            if timeout is not None:
+                return await client.set(key, data, ex=timeout)
+            return await client.set(key, data)
+
+    async def pipeline(self, operation: str, commands: list[tuple], /, *, write: bool = False) -> list[Any]:
+        """Execute the commands in a single round trip (without a transaction).
+
+        `operation` is used for tracing and metrics, e.g. `views.get`.
+        """
+        with (
+            tracing.span(
+                f"redis.{operation}", {"db.system": "redis", "db.operation": operation}, kind=tracing.SpanKind.CLIENT),
+            REDIS_REQUEST_LATENCY.labels(operation=operation).time(),
+        ):
+            client = await self.get_client(write=write)
+            pipe = client.pipeline(transaction=False)
+            for command in commands:
+                pipe.execute_command(*command)
+            return await pipe.execute()
+
+    async def run_script(self, operation: str, script: str, keys: list[str], args: list[Any], /) -> Any:
+        """Run the Lua script on the master (`EVALSHA`, the script is loaded if Redis doesn't have it).
+
+        `operation` is used for tracing and metrics, e.g. `rate_limits.consume`.
+        """
+        with (
+            tracing.span(
+                f"redis.{operation}", {"db.system": "redis", "db.operation": operation}, kind=tracing.SpanKind.CLIENT),
+            REDIS_REQUEST_LATENCY.labels(operation=operation).time(),
+        ):
+            client = await self.get_client(write=True)
+            return await client.register_script(script)(keys, args)
 
     async def pre_init_client(self, *args, **kwargs):
         """Pre-init signal. Called before initializing Redis client."""
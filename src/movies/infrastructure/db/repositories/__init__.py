@@ -1,8 +1,12 @@
 from .cache import CacheRepository
+from .identity_map import IdentityMap, get_identity_map, identity_map_scope
 from .storage import ElasticCacheRepository, ElasticRepository, NoSQLStorageRepository
 
 __all__ = [
     "CacheRepository",
+    "IdentityMap",
+    "get_identity_map",
+    "identity_map_scope",
     "NoSQLStorageRepository",
     "ElasticRepository",
     "ElasticCacheRepository",
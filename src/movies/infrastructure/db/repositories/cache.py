@@ -1,42 +1,120 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Final
 
 import orjson
 
+from movies.core import tracing
+from movies.core.metrics import CACHE_PAYLOAD_SIZE, CACHE_REQUESTS
+
 if TYPE_CHECKING:
     from movies.common.types import ApiSchema, ApiSchemaClass
 
     from ..cache import AsyncCache
 
 
+DEFAULT_PREFIX: Final[str] = "default"
+
+
 class CacheRepository:
-    """Repository for working with data from cache."""
+    """Repository for working with data from cache.
+
+    Items are saved as JSON bytes and loaded directly from bytes returned by the cache.
+    Cache hits, misses and errors are counted by key `prefix` (key without the hashed part, e.g. `films:list:all:*`).
+    """
 
     def __init__(self, cache: AsyncCache, cache_ttl: int | None = 5 * 60) -> None:
         self.cache = cache
         self.cache_ttl = cache_ttl
 
-    async def get_list(self, key: str, schema_cls: ApiSchemaClass) -> list[ApiSchema] | None:
+    async def get_list(
+        self, key: str, schema_cls: ApiSchemaClass, *, prefix: str = DEFAULT_PREFIX,
+    ) -> list[ApiSchema] | None:
         """Get deserialized list of objects from cache."""
-        items = await self.cache.get(key)
+        items = await self._get(key, prefix)
         if items is None:
             return None
-        return [schema_cls.parse_raw(item) for item in orjson.loads(items)]
+        return self.load_items(items, schema_cls)
 
-    async def get_item(self, key: str, schema_cls: ApiSchemaClass) -> ApiSchema | None:
+    async def get_item(self, key: str, schema_cls: ApiSchemaClass, *, prefix: str = DEFAULT_PREFIX) -> ApiSchema | None:
         """Get deserialized object from cache."""
-        item = await self.cache.get(key)
+        item = await self._get(key, prefix)
         if item is None:
             return None
-        return schema_cls.parse_raw(orjson.loads(item))
+        return self.load_item(item, schema_cls)
+
+    async def get_documents(self, key: str, *, prefix: str = DEFAULT_PREFIX) -> list[dict] | None:
+        """Get list of objects from cache as dicts, without parsing them to schemas.
 
-    async def save_item(self, key: str, item: ApiSchema) -> None:
+        Used if only a part of the cached list is needed, see `parse_documents`.
+        """
+        items = await self._get(key, prefix)
+        if items is None:
+            return None
+        with tracing.span("cache.deserialize"):
+            return orjson.loads(items)
+
+    async def save_item(self, key: str, item: ApiSchema, *, prefix: str = DEFAULT_PREFIX) -> None:
         """Save deserialized item in cache."""
-        serialized_item = orjson.dumps(item.json())
-        await self.cache.set(key, serialized_item, ttl=self.cache_ttl)
+        await self._set(key, self.dump_item(item), prefix)
 
-    async def save_items(self, key: str, items: list[ApiSchema]) -> None:
+    async def save_items(self, key: str, items: list[ApiSchema], *, prefix: str = DEFAULT_PREFIX) -> None:
         """Save deserialized list of items in cache."""
-        serialized_items = orjson.dumps([item.json() for item in items])
-        await self.cache.set(key, serialized_items, ttl=self.cache_ttl)
+        await self._set(key, self.dump_items(items), prefix)
+
+    @staticmethod
+    def dump_item(item: ApiSchema, /) -> bytes:
+        """Serialize item to JSON bytes."""
+        with tracing.span("cache.serialize"):
+            return orjson.dumps(item.dict())
+
+    @staticmethod
+    def dump_items(items: list[ApiSchema], /) -> bytes:
+        """Serialize list of items to JSON bytes."""
+        with tracing.span("cache.serialize"):
+            return orjson.dumps([item.dict() for item in items])
+
+    @staticmethod
+    def load_item(data: bytes, schema_cls: ApiSchemaClass, /) -> ApiSchema:
+        """Deserialize item from JSON bytes."""
+        with tracing.span("cache.deserialize"):
+            return _parse(orjson.loads(data), schema_cls)
+
+    @staticmethod
+    def load_items(data: bytes, schema_cls: ApiSchemaClass, /) -> list[ApiSchema]:
+        """Deserialize list of items from JSON bytes."""
+        with tracing.span("cache.deserialize"):
+            return [_parse(item, schema_cls) for item in orjson.loads(data)]
+
+    @staticmethod
+    def parse_documents(documents: list[dict], schema_cls: ApiSchemaClass, /) -> list[ApiSchema]:
+        """Parse objects returned by `get_documents`."""
+        with tracing.span("cache.deserialize"):
+            return [_parse(document, schema_cls) for document in documents]
+
+    async def _get(self, key: str, prefix: str, /) -> bytes | None:
+        with tracing.span("cache.get", {"cache.key_prefix": prefix}) as span:
+            try:
+                data = await self.cache.get(key)
+            except Exception:
+                CACHE_REQUESTS.labels(prefix=prefix, result="error").inc()
+                raise
+            span.set_attribute("cache.hit", data is not None)
+        if data is None:
+            CACHE_REQUESTS.labels(prefix=prefix, result="miss").inc()
+            return None
+        CACHE_REQUESTS.labels(prefix=prefix, result="hit").inc()
+        CACHE_PAYLOAD_SIZE.labels(prefix=prefix, operation="get").observe(len(data))
+        return data
+
+    async def _set(self, key: str, data: bytes, prefix: str, /) -> None:
+        CACHE_PAYLOAD_SIZE.labels(prefix=prefix, operation="set").observe(len(data))
+        with tracing.span("cache.set", {"cache.key_prefix": prefix}):
+            await self.cache.set(key, data, ttl=self.cache_ttl)
+
+
+def _parse(value: dict | str, schema_cls: ApiSchemaClass, /) -> ApiSchema:
+    # XXX: values saved by previous versions are JSON strings with serialized items
+    if isinstance(value, str):
+        return schema_cls.parse_raw(value)
+    return schema_cls.parse_obj(value)
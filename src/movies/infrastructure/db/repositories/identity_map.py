@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import contextlib
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Hashable, Iterator
+
+if TYPE_CHECKING:
+    from movies.common.types import ApiSchema, ApiSchemaClass
+
+_identity_map: ContextVar[IdentityMap | None] = ContextVar("identity_map", default=None)
+
+
+class IdentityMap:
+    """Map of already loaded objects.
+
+    Lives for the duration of a single request: repeated lookups of the same object within a request don't go to
+    the cache or the database.
+    """
+
+    def __init__(self) -> None:
+        self._items: dict[tuple[str, Hashable, ApiSchemaClass], ApiSchema | list[ApiSchema]] = {}
+
+    def get(self, collection: str, key: Hashable, schema_cls: ApiSchemaClass) -> ApiSchema | list[ApiSchema] | None:
+        """Get loaded object (or list of objects) by the given collection, key and schema."""
+        return self._items.get((collection, key, schema_cls))
+
+    def add(
+        self, collection: str, key: Hashable, schema_cls: ApiSchemaClass, item: ApiSchema | list[ApiSchema],
+    ) -> None:
+        """Save loaded object (or list of objects)."""
+        self._items[(collection, key, schema_cls)] = item
+
+
+def get_identity_map() -> IdentityMap | None:
+    """Get identity map of the current scope (request)."""
+    return _identity_map.get()
+
+
+@contextlib.contextmanager
+def identity_map_scope() -> Iterator[IdentityMap]:
+    """Open a new identity map scope."""
+    identity_map = IdentityMap()
+    token = _identity_map.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _identity_map.reset(token)
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Collection, ContextManager, Sequence
 
 from pydantic import parse_obj_as
 
+from movies.core import tracing
+
+from ..cache import CacheKeyBuilder
+
 if TYPE_CHECKING:
+    from opentelemetry.trace import Span
+
     from movies.common.types import ApiSchema, ApiSchemaClass
 
     from ..storage import AsyncNoSQLStorage
     from .cache import CacheRepository
+    from .identity_map import IdentityMap
 
 
 class NoSQLStorageRepository(ABC):
@@ -29,6 +36,25 @@ class NoSQLStorageRepository(ABC):
     async def search(self, query: dict, schema_cls: ApiSchemaClass, **search_options) -> list[ApiSchema]:
         """Search documents in a collection."""
 
+    @abstractmethod
+    async def search_partition(
+        self,
+        query: dict,
+        schema_cls: ApiSchemaClass,
+        *,
+        partition_field: str,
+        partition_values: Collection[str] | None,
+        offset: int,
+        size: int,
+        max_depth: int = 200,
+        **search_options,
+    ) -> list[ApiSchema] | None:
+        """Search a page of documents with the given values of `partition_field` (all documents if `None`).
+
+        `query` must not be paginated. Only the first `max_depth` documents of the query may be shared by partitions.
+        Return `None` if the page can't be served, the caller should fall back to `search` with a filtered query then.
+        """
+
     @abstractmethod
     def prepare_search_request(self, *args, **options) -> dict:
         """Prepare search request for the DB."""
@@ -40,30 +66,76 @@ class NoSQLStorageRepository(ABC):
 
 
 class ElasticRepository(NoSQLStorageRepository):
-    """Repository for working with data from Elasticsearch."""
+    """Repository for working with data from Elasticsearch.
 
-    def __init__(self, storage: AsyncNoSQLStorage, index_name: str) -> None:
+    `nested_fields` are paths of nested objects of the index mapping, filters on their fields are wrapped
+    in `nested` queries.
+    """
+
+    RANGE_OPERATORS: ClassVar[frozenset[str]] = frozenset({"gt", "gte", "lt", "lte"})
+
+    def __init__(self, storage: AsyncNoSQLStorage, index_name: str, nested_fields: Sequence[str] = ()) -> None:
         self.storage = storage
         self.index_name = index_name
+        self.nested_fields = nested_fields
 
     async def get_by_id(self, doc_id: str, /, *, schema_cls: ApiSchemaClass) -> ApiSchema:
         doc = await self.storage.get_by_id(doc_id, collection=self.index_name)
-        return schema_cls(**doc)
+        with tracing.span("elastic.deserialize"):
+            return schema_cls(**doc)
 
     async def get_list(self, schema_cls: ApiSchemaClass, **search_options) -> list[ApiSchema]:
         docs = await self.storage.get_all(self.index_name, **search_options)
-        return parse_obj_as(list[schema_cls], docs)
+        with tracing.span("elastic.deserialize"):
+            return parse_obj_as(list[schema_cls], docs)
 
     async def search(self, query: dict, schema_cls: ApiSchemaClass, **search_options) -> list[ApiSchema]:
         docs = await self.storage.search(self.index_name, query, **search_options)
-        return parse_obj_as(list[schema_cls], docs)
+        with tracing.span("elastic.deserialize"):
+            return parse_obj_as(list[schema_cls], docs)
+
+    async def search_partition(
+        self,
+        query: dict,
+        schema_cls: ApiSchemaClass,
+        *,
+        partition_field: str,
+        partition_values: Collection[str] | None,
+        offset: int,
+        size: int,
+        max_depth: int = 200,
+        **search_options,
+    ) -> list[ApiSchema]:
+        search_query = {**query, "from": offset, "size": size}
+        if partition_values is not None:
+            search_query["query"] = {
+                "bool": {
+                    "must": query.get("query", {"match_all": {}}),
+                    "filter": {"terms": {partition_field: list(partition_values)}},
+                },
+            }
+        return await self.search(search_query, schema_cls, **search_options)
 
     def prepare_search_request(self, *args, **options) -> dict:
+        """Prepare search request.
+
+        `filter_fields` are exact filters that run in the filter context (no scoring, cached by Elasticsearch),
+        the type of a filter depends on the value:
+        - scalar: `term`, e.g. `{"access_type": "public"}`
+        - dict with `value` and other `term` options: `term`, e.g. `{"value": "comedy", "case_insensitive": True}`
+        - list: `terms`, e.g. `{"age_rating": ["G", "PG"]}`, a list of `term` dicts matches any of them
+        - dict with `gt`, `gte`, `lt`, `lte`: `range`, e.g. `{"imdb_rating": {"gte": 7}}`
+        A tuple of fields as a key matches if any of the fields matches, e.g. `{("actors.uuid", "writers.uuid"): id}`.
+        `search_type` is the `multi_match` type, e.g. `bool_prefix` for search-as-you-type fields (all words
+        must match, the last one as a prefix). `source_fields` limit fields of returned documents.
+        """
         page_size: int | None = options.pop("page_size", None)
         page_number: int | None = options.pop("page_number", None)
         search_query: str | None = options.pop("search_query", None)
         search_fields: list[str] | None = options.pop("search_fields", None)
-        filter_fields: dict[str, str] | None = options.pop("filter_fields", None)
+        filter_fields: dict[str, Any] | None = options.pop("filter_fields", None)
+        search_type: str | None = options.pop("search_type", None)
+        source_fields: list[str] | None = options.pop("source_fields", None)
 
         request_body = {}
         if page_size is not None and page_number is not None:
@@ -75,13 +147,38 @@ class ElasticRepository(NoSQLStorageRepository):
             request_query = {
                 "multi_match": {"query": search_query, "fields": search_fields},
             }
+            if search_type is not None:
+                request_query["multi_match"].update({"type": search_type, "operator": "and"})
+        if source_fields is not None:
+            request_body["_source"] = source_fields
         request_body["query"] = {
             "bool": {"must": request_query},
         }
         if filter_fields:
-            request_body["query"]["bool"]["filter"] = {"term": filter_fields}
+            request_body["query"]["bool"]["filter"] = [
+                self._prepare_filter(field, value) for field, value in filter_fields.items()
+            ]
+            if search_query is None:
+                # nothing to score
+                del request_body["query"]["bool"]["must"]
         return request_body
 
+    def _prepare_filter(self, field: str | tuple[str, ...], value: Any) -> dict:
+        if isinstance(field, tuple):
+            return _any_of([self._prepare_filter(name, value) for name in field])
+        if isinstance(value, (list, tuple, set, frozenset)) and any(isinstance(item, dict) for item in value):
+            clause = _any_of([{"term": {field: item}} for item in value])
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            clause = {"terms": {field: list(value)}}
+        elif isinstance(value, dict) and value.keys() <= self.RANGE_OPERATORS:
+            clause = {"range": {field: value}}
+        else:
+            clause = {"term": {field: value}}
+        path = next((path for path in self.nested_fields if field.startswith(f"{path}.")), None)
+        if path is None:
+            return clause
+        return {"nested": {"path": path, "query": clause}}
+
     @staticmethod
     def calc_offset(page_size: int, page_number: int) -> int:
         if page_number <= 1:
@@ -91,55 +188,167 @@ class ElasticRepository(NoSQLStorageRepository):
 
 
 class ElasticCacheRepository(NoSQLStorageRepository):
-    """Repository for working with data from Elasticsearch and cache."""
+    """Repository for working with data from Elasticsearch and cache.
+
+    Objects that have been already loaded in the current request are taken from the identity map.
+    """
 
     def __init__(
         self,
         elastic_repository: ElasticRepository,
         cache_repository: CacheRepository,
         key_factory: Callable[..., str],
+        identity_map: Callable[[], IdentityMap | None] | None = None,
     ) -> None:
         self.elastic_repository = elastic_repository
         self.cache_repository = cache_repository
         self.key_factory = key_factory
+        self.identity_map = identity_map
 
     async def get_by_id(self, doc_id: str, /, *, schema_cls: ApiSchemaClass) -> ApiSchema:
-        key = self.key_factory(doc_id=doc_id, schema_cls=schema_cls)
-        item = await self.cache_repository.get_item(key, schema_cls)
-        if item is not None:
+        with self._span("get_by_id") as span:
+            item = self._get_from_identity_map(doc_id, schema_cls)
+            if item is not None:
+                span.set_attribute("repository.source", "identity_map")
+                return item
+
+            key = self.key_factory(doc_id=doc_id, schema_cls=schema_cls)
+            prefix = key.replace(doc_id, "*")
+            item = await self.cache_repository.get_item(key, schema_cls, prefix=prefix)
+            span.set_attribute("repository.source", "cache")
+            if item is None:
+                span.set_attribute("repository.source", "storage")
+                item = await self.elastic_repository.get_by_id(doc_id, schema_cls=schema_cls)
+                await self.cache_repository.save_item(key, item, prefix=prefix)
+
+            self._add_to_identity_map(doc_id, schema_cls, item)
             return item
 
-        item = await self.elastic_repository.get_by_id(doc_id, schema_cls=schema_cls)
-
-        await self.cache_repository.save_item(key, item)
-        return item
-
     async def get_list(self, schema_cls: ApiSchemaClass, **search_options) -> list[ApiSchema]:
         cache_options: dict = search_options.pop("cache_options", {})
-        key = self.key_factory(**cache_options)
-        items = await self.cache_repository.get_list(key, schema_cls)
-        if items is not None:
+        with self._span("get_list") as span:
+            key = self.key_factory(**cache_options)
+            items = self._get_from_identity_map(key, schema_cls)
+            if items is not None:
+                span.set_attribute("repository.source", "identity_map")
+                return items
+
+            prefix = self._get_key_prefix(key, cache_options)
+            items = await self.cache_repository.get_list(key, schema_cls, prefix=prefix)
+            span.set_attribute("repository.source", "cache")
+            if items is None:
+                span.set_attribute("repository.source", "storage")
+                items = await self.elastic_repository.get_list(schema_cls, **search_options)
+                await self.cache_repository.save_items(key, items, prefix=prefix)
+
+            self._add_to_identity_map(key, schema_cls, items)
             return items
 
-        items = await self.elastic_repository.get_list(schema_cls, **search_options)
-
-        await self.cache_repository.save_items(key, items)
-        return items
-
     async def search(self, query: dict, schema_cls: ApiSchemaClass, **search_options) -> list[ApiSchema]:
         cache_options: dict = search_options.pop("cache_options", {})
-        key = self.key_factory(**cache_options)
-        items = await self.cache_repository.get_list(key, schema_cls)
-        if items is not None:
+        with self._span("search") as span:
+            key = self.key_factory(**cache_options)
+            items = self._get_from_identity_map(key, schema_cls)
+            if items is not None:
+                span.set_attribute("repository.source", "identity_map")
+                return items
+
+            prefix = self._get_key_prefix(key, cache_options)
+            items = await self.cache_repository.get_list(key, schema_cls, prefix=prefix)
+            span.set_attribute("repository.source", "cache")
+            if items is None:
+                span.set_attribute("repository.source", "storage")
+                items = await self.elastic_repository.search(query, schema_cls, **search_options)
+                await self.cache_repository.save_items(key, items, prefix=prefix)
+
+            self._add_to_identity_map(key, schema_cls, items)
             return items
 
-        items = await self.elastic_repository.search(query, schema_cls, **search_options)
+    async def search_partition(
+        self,
+        query: dict,
+        schema_cls: ApiSchemaClass,
+        *,
+        partition_field: str,
+        partition_values: Collection[str] | None,
+        offset: int,
+        size: int,
+        max_depth: int = 200,
+        **search_options,
+    ) -> list[ApiSchema] | None:
+        """Search a page of documents with the given values of `partition_field` (all documents if `None`).
+
+        The first `max_depth` documents of the query are cached once for all partitions and filtered in-process,
+        so e.g. pages for users with different access rights share the same cache entry and Elasticsearch query.
+        Return `None` if the page is deeper than the cached documents.
+        """
+        cache_options: dict = search_options.pop("cache_options", {})
+        with self._span("search_partition") as span:
+            key = self.key_factory(**cache_options)
+            prefix = self._get_key_prefix(key, cache_options)
+            items: list[ApiSchema] | None = None
+            documents = await self.cache_repository.get_documents(key, prefix=prefix)
+            span.set_attribute("repository.source", "cache")
+            if documents is None:
+                span.set_attribute("repository.source", "storage")
+                items = await self.elastic_repository.search(
+                    {**query, "from": 0, "size": max_depth}, schema_cls, **search_options)
+                await self.cache_repository.save_items(key, items, prefix=prefix)
+                partitions = [_get_partition(getattr(item, partition_field)) for item in items]
+            else:
+                partitions = [document.get(partition_field) for document in documents]
+
+            positions = [
+                position for position, partition in enumerate(partitions)
+                if partition_values is None or partition in partition_values
+            ]
+            if len(partitions) >= max_depth and offset + size > len(positions):
+                return None
+            page = positions[offset:offset + size]
+            if items is not None:
+                return [items[position] for position in page]
+            return self.cache_repository.parse_documents([documents[position] for position in page], schema_cls)
+
+    def _span(self, operation: str, /) -> ContextManager[Span]:
+        """Start a span of the repository operation.
+
+        `repository.source` attribute shows where objects have been taken from: identity map, cache or storage.
+        """
+        return tracing.span(f"repository.{operation}", {"db.collection": self.elastic_repository.index_name})
 
-        await self.cache_repository.save_items(key, items)
-        return items
+    @staticmethod
+    def _get_key_prefix(key: str, cache_options: dict) -> str:
+        """Get cache key without the hashed part, e.g. `films:list:public:*`."""
+        if "prefix" not in cache_options and "suffix" not in cache_options:
+            return key
+        return CacheKeyBuilder.make_key_with_affixes(
+            "*", prefix=cache_options.get("prefix"), suffix=cache_options.get("suffix"))
+
+    def _get_from_identity_map(self, key: str, schema_cls: ApiSchemaClass) -> ApiSchema | list[ApiSchema] | None:
+        identity_map = self.identity_map() if self.identity_map is not None else None
+        if identity_map is None:
+            return None
+        return identity_map.get(self.elastic_repository.index_name, key, schema_cls)
+
+    def _add_to_identity_map(self, key: str, schema_cls: ApiSchemaClass, item: ApiSchema | list[ApiSchema]) -> None:
+        identity_map = self.identity_map() if self.identity_map is not None else None
+        if identity_map is None:
+            return
+        identity_map.add(self.elastic_repository.index_name, key, schema_cls, item)
 
     def prepare_search_request(self, *args, **options) -> dict:
         return self.elastic_repository.prepare_search_request(*args, **options)
 
     def calc_offset(self, page_size: int, page_number: int) -> int:
         return self.elastic_repository.calc_offset(page_size, page_number)
+
+
+def _get_partition(value: Any, /) -> Any:
+    """Get partition value the same way as it's saved in cache, e.g. enum members by their value."""
+    return getattr(value, "value", value)
+
+
+def _any_of(clauses: list[dict], /) -> dict:
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"bool": {"should": clauses, "minimum_should_match": 1}}
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import datetime
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from typing import TYPE_CHECKING, Any, Final, Iterator
+
+from movies.core.metrics import SHARED_CACHE_REQUESTS
+
+from .cache import AsyncCache
+
+if TYPE_CHECKING:
+    from movies.common.types import seconds
+
+MAGIC: Final[bytes] = b"NMC1"
+FILE_HEADER: Final[struct.Struct] = struct.Struct("<4sII")  # magic, slots, slot size
+FILE_HEADER_SIZE: Final[int] = 64
+# version (odd while the slot is being written), key digest, expiration time (unix time), value length
+SLOT_HEADER: Final[struct.Struct] = struct.Struct("<Q16sdI4x")
+SEQ: Final[struct.Struct] = struct.Struct("<Q")
+WAYS: Final[int] = 4  # slots a key may be stored in
+
+
+def init_shared_memory_cache(
+    *, enabled: bool, path: str, slots: int, slot_size: int, default_ttl: seconds = 30,
+) -> Iterator[SharedMemoryCache | None]:
+    """Open the shared memory cache (`None` if it's disabled) and close it on shutdown."""
+    if not enabled:
+        yield None
+        return
+    cache = SharedMemoryCache(path, slots=slots, slot_size=slot_size, default_ttl=default_ttl)
+    yield cache
+    cache.close()
+
+
+class SharedMemoryCache(AsyncCache):
+    """Cache in a memory-mapped file shared by all worker processes of the host (e.g. in `/dev/shm`).
+
+    The file is a hash table of `slots` fixed-size slots, a key is stored in one of `WAYS` slots chosen by its hash,
+    expired or soonest-expiring values are evicted. Values that don't fit in a slot are not cached.
+    Reads are lock-free: a slot version is odd while the slot is being written and is checked before and after
+    reading, torn reads are misses. Writers lock the slot (`lockf`) and skip the write if it's locked by
+    another process. Values must be bytes, every value expires (in `default_ttl` seconds if `ttl` isn't given).
+    """
+
+    def __init__(self, path: str, *, slots: int, slot_size: int, default_ttl: seconds = 30) -> None:
+        if slots < WAYS or slots % WAYS:
+            raise ValueError(f"Number of slots must be a multiple of {WAYS}")
+        if slot_size <= SLOT_HEADER.size:
+            raise ValueError(f"Slot size must be greater than {SLOT_HEADER.size} bytes")
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.default_ttl = default_ttl
+        self.max_value_size = slot_size - SLOT_HEADER.size
+        self._fd = self._open_file()
+        self._mm = mmap.mmap(self._fd, FILE_HEADER_SIZE + slots * slot_size)
+
+    async def get(self, key: str, /, *, default: Any | None = None) -> Any:
+        digest = _digest(key)
+        now = time.time()
+        for offset in self._get_slot_offsets(digest):
+            seq, slot_digest, expires_at, length = SLOT_HEADER.unpack_from(self._mm, offset)
+            if seq % 2 or slot_digest != digest or expires_at <= now:
+                continue
+            start = offset + SLOT_HEADER.size
+            data = self._mm[start:start + length]
+            if SEQ.unpack_from(self._mm, offset)[0] != seq:
+                # the slot has been rewritten while it was read
+                continue
+            SHARED_CACHE_REQUESTS.labels(operation="get", result="hit").inc()
+            return data
+        SHARED_CACHE_REQUESTS.labels(operation="get", result="miss").inc()
+        return default
+
+    async def set(self, key: str, data: bytes, *, ttl: seconds | datetime.timedelta | None = None) -> bool:
+        if len(data) > self.max_value_size:
+            SHARED_CACHE_REQUESTS.labels(operation="set", result="too_large").inc()
+            return False
+        timeout = self.get_ttl(ttl)
+        if isinstance(timeout, datetime.timedelta):
+            timeout = timeout.total_seconds()
+        digest = _digest(key)
+        offset = self._choose_slot(digest)
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, self.slot_size, offset)
+        except OSError:
+            SHARED_CACHE_REQUESTS.labels(operation="set", result="locked").inc()
+            return False
+        try:
+            # a slot of a writer that has died while writing has an odd version
+            seq = SEQ.unpack_from(self._mm, offset)[0] | 1
+            SEQ.pack_into(self._mm, offset, seq)
+            SLOT_HEADER.pack_into(self._mm, offset, seq, digest, time.time() + timeout, len(data))
+            start = offset + SLOT_HEADER.size
+            self._mm[start:start + len(data)] = data
+            SEQ.pack_into(self._mm, offset, seq + 1)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self.slot_size, offset)
+        SHARED_CACHE_REQUESTS.labels(operation="set", result="stored").inc()
+        return True
+
+    def get_ttl(self, ttl: seconds | datetime.timedelta | None = None, /) -> seconds | datetime.timedelta:
+        if ttl is None:
+            return self.default_ttl
+        if isinstance(ttl, datetime.timedelta):
+            return ttl
+        return max(0, int(ttl))
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+    def _open_file(self) -> int:
+        """Open the table, create it unless another worker has already created the same one.
+
+        A table of another layout (or a partly created one) is never truncated or resized in place: processes that
+        have it mapped would get SIGBUS. A new table is built in a temporary file and atomically replaces it
+        (`os.replace`), processes that mapped the old one keep using the old file until they reopen the cache.
+        Workers create tables one at a time under `flock` of a separate lock file, so they all open the same table.
+        """
+        header = FILE_HEADER.pack(MAGIC, self.slots, self.slot_size)
+        size = FILE_HEADER_SIZE + self.slots * self.slot_size
+        lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            try:
+                fd = os.open(self.path, os.O_RDWR)
+            except FileNotFoundError:
+                pass
+            else:
+                if os.pread(fd, FILE_HEADER.size, 0) == header and os.fstat(fd).st_size == size:
+                    return fd
+                os.close(fd)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                os.ftruncate(fd, size)
+                os.pwrite(fd, header, 0)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                os.close(fd)
+                os.unlink(tmp_path)
+                raise
+            return fd
+        finally:
+            # closing the lock file releases the lock
+            os.close(lock_fd)
+
+    def _get_slot_offsets(self, digest: bytes, /) -> list[int]:
+        first_slot = int.from_bytes(digest[:8], "little") % (self.slots // WAYS) * WAYS
+        return [FILE_HEADER_SIZE + (first_slot + way) * self.slot_size for way in range(WAYS)]
+
+    def _choose_slot(self, digest: bytes, /) -> int:
+        """Choose the slot of the key, an empty or expired slot or the slot that expires first."""
+        now = time.time()
+        candidates = []
+        for offset in self._get_slot_offsets(digest):
+            _, slot_digest, expires_at, _ = SLOT_HEADER.unpack_from(self._mm, offset)
+            if slot_digest == digest:
+                return offset
+            candidates.append((max(expires_at, now), offset))
+        return min(candidates)[1]
+
+
+def _digest(key: str, /) -> bytes:
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
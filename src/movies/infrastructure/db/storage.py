@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, AsyncIterator
 
 from elasticsearch.exceptions import RequestError
 
@@ -26,6 +26,10 @@ class AsyncNoSQLStorage(ABC):
     async def get_all(self, collection: str, *args, **kwargs) -> Any:
         """Get all items from collection."""
 
+    @abstractmethod
+    def scan(self, collection: str, query: Query, *args, **kwargs) -> AsyncIterator[list]:
+        """Iterate over all items in collection that match the given query in batches."""
+
 
 class ElasticStorage(AsyncNoSQLStorage):
     """Elasticsearch database."""
@@ -45,3 +49,6 @@ class ElasticStorage(AsyncNoSQLStorage):
     async def get_all(self, collection: str, **options) -> list[dict]:
         query = {"query": {"match_all": {}}}
         return await self.search(collection, query, **options)
+
+    def scan(self, collection: str, query: Query, *args, **kwargs) -> AsyncIterator[list[dict]]:
+        return self.client.scan(collection, query, **kwargs)
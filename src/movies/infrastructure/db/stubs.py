@@ -0,0 +1,426 @@
+"""In-memory stubs of the storage, cache and views store.
+
+Used for running the app without Elasticsearch and Redis, e.g. for profiling the app's own overhead.
+"""
+
+from __future__ import annotations
+
+import datetime
+import operator
+import re
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator
+
+import orjson
+
+from movies.common.exceptions import NotFoundError
+
+from .cache import AsyncCache
+from .rate_limits import RateLimitStore
+from .storage import AsyncNoSQLStorage
+from .views import ViewStore
+
+if TYPE_CHECKING:
+    from movies.common.types import Id, Query, seconds
+
+    from .compression import CacheCompression
+
+
+DEFAULT_SEARCH_SIZE = 10  # same as in Elasticsearch
+
+_TOKEN_RE = re.compile(r"\w+")
+_MISSING = object()
+
+
+def load_documents(path: str | None = None) -> dict[str, dict[str, dict]]:
+    """Load documents from a NDJSON file with Elasticsearch bulk actions (`_index`, `_id`, `_source`)."""
+    collections: dict[str, dict[str, dict]] = {}
+    if path is None:
+        return collections
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            action = orjson.loads(line)
+            source = action["_source"]
+            collections.setdefault(action["_index"], {})[str(action.get("_id", source["uuid"]))] = source
+    return collections
+
+
+class InMemoryStorage(AsyncNoSQLStorage):
+    """In-memory storage with a subset of Elasticsearch Query DSL.
+
+    Supported queries: `match_all`, `match`, `multi_match`, `term`, `terms`, `range`, `nested` and `bool`
+    (`must`, `should`, `filter`, `must_not`). Full-text queries match any of lowercased query words,
+    results are sorted by the number of matched words if no `sort` is given. `bool_prefix` `multi_match` queries
+    match all words, the last one as a prefix.
+
+    Values and words of every queried field are indexed on the first query.
+    Documents are returned as is, without copying, unless `_source` limits their top-level fields.
+    """
+
+    def __init__(self, documents: dict[str, dict[str, dict]] | None = None) -> None:
+        self.collections: dict[str, dict[str, dict]] = documents if documents is not None else {}
+        self._values: dict[tuple[str, str], dict[str, list]] = {}
+        self._terms: dict[tuple[str, str], dict[Any, set[str]]] = {}
+        self._words: dict[tuple[str, str], dict[str, set[str]]] = {}
+
+    def add(self, collection: str, documents: list[dict], /) -> None:
+        """Add documents to the collection, documents are identified by `uuid`."""
+        self.collections.setdefault(collection, {}).update(
+            (str(document["uuid"]), document) for document in documents
+        )
+        for indices in (self._values, self._terms, self._words):
+            for index_key in [index_key for index_key in indices if index_key[0] == collection]:
+                del indices[index_key]
+
+    async def get_by_id(self, document_id: Id, /, *args, collection: str, **kwargs) -> dict:
+        try:
+            return self.collections[collection][str(document_id)]
+        except KeyError:
+            raise NotFoundError
+
+    async def search(self, collection: str, query: Query, *args, **kwargs) -> list[dict]:
+        scores = self._match(collection, query.get("query", {"match_all": {}}))
+        sort = kwargs.get("sort") or query.get("sort")
+        # ties are ordered by document keys, so results are deterministic
+        if sort:
+            keys = self._sort(collection, sorted(scores), sort)
+        else:
+            keys = sorted(scores, key=lambda key: (-scores[key], key))
+        offset = query.get("from", kwargs.get("from_", 0))
+        size = query.get("size", kwargs.get("size", DEFAULT_SEARCH_SIZE))
+        documents = self.collections.get(collection, {})
+        return [_get_source(documents[key], query) for key in keys[offset:offset + size]]
+
+    async def get_all(self, collection: str, **options) -> list[dict]:
+        query = {"query": {"match_all": {}}}
+        return await self.search(collection, query, **options)
+
+    async def scan(
+        self,
+        collection: str,
+        query: Query,
+        *,
+        batch_size: int,
+        slice_id: int | None = None,
+        max_slices: int | None = None,
+        search_after: list | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        keys = list(self._match(collection, query.get("query", {"match_all": {}})))
+        if max_slices is not None and max_slices > 1:
+            keys = [key for key in keys if zlib.crc32(key.encode()) % max_slices == slice_id]
+        keys = self._sort(collection, keys, [{"uuid": "asc"}])
+        documents = self.collections.get(collection, {})
+        if search_after is not None:
+            keys = [key for key in keys if str(documents[key]["uuid"]) > str(search_after[0])]
+        for start in range(0, len(keys), batch_size):
+            yield [_get_source(documents[key], query) for key in keys[start:start + batch_size]]
+
+    def _match(self, collection: str, query: dict) -> dict[str, float]:
+        """Find documents that match the query.
+
+        Return scores of matched documents by their keys.
+        """
+        (query_type, params), = query.items()
+        if query_type == "match_all":
+            return dict.fromkeys(self.collections.get(collection, {}), 1.0)
+        if query_type == "bool":
+            return self._match_bool(collection, params)
+        if query_type == "nested":
+            # paths in the nested query are absolute, values of nested objects are collected from all of them
+            return self._match(collection, params["query"])
+        if query_type == "term":
+            (field, value), = params.items()
+            terms = self._get_terms(collection, field)
+            if isinstance(value, dict) and value.get("case_insensitive"):
+                folded = str(value["value"]).casefold()
+                return {key: 1.0 for term, keys in terms.items() if str(term).casefold() == folded for key in keys}
+            return dict.fromkeys(terms.get(_term_value(value), ()), 1.0)
+        if query_type == "terms":
+            (field, values), = params.items()
+            terms = self._get_terms(collection, field)
+            return {key: 1.0 for value in values for key in terms.get(_normalize(value), ())}
+        if query_type == "range":
+            (field, bounds), = params.items()
+            return {
+                key: 1.0 for key, values in self._get_values(collection, field).items()
+                if any(_in_range(value, bounds) for value in values)
+            }
+        if query_type == "match":
+            (field, value), = params.items()
+            return self._match_text(collection, [field], value["query"] if isinstance(value, dict) else value)
+        if query_type == "multi_match" and params.get("type") == "bool_prefix":
+            return self._match_prefix(collection, params["fields"], params["query"])
+        if query_type == "multi_match":
+            return self._match_text(collection, params["fields"], params["query"])
+        raise ValueError(f"Query `{query_type}` is not supported")
+
+    def _match_bool(self, collection: str, params: dict) -> dict[str, float]:
+        must = [self._match(collection, clause) for clause in _as_list(params.get("must", []))]
+        filters = [self._match(collection, clause) for clause in _as_list(params.get("filter", []))]
+        must_not = [self._match(collection, clause) for clause in _as_list(params.get("must_not", []))]
+        should = [self._match(collection, clause) for clause in _as_list(params.get("should", []))]
+
+        if must or filters:
+            required = must + filters
+            keys = set(required[0]).intersection(*required[1:])
+            scores = {key: sum(clause[key] for clause in must) or 1.0 for key in keys}
+        elif should:
+            scores = dict.fromkeys(set().union(*should), 0.0)
+        else:
+            scores = dict.fromkeys(self.collections.get(collection, {}), 1.0)
+        for clause in must_not:
+            for key in clause:
+                scores.pop(key, None)
+        for clause in should:
+            for key, score in clause.items():
+                if key in scores:
+                    scores[key] += score
+        return scores
+
+    def _match_text(self, collection: str, fields: list[str], text: str) -> dict[str, float]:
+        query_words = set(_tokenize(text))
+        scores: dict[str, float] = {}
+        for field in fields:
+            words = self._get_words(collection, field)
+            field_scores: dict[str, float] = {}
+            for word in query_words:
+                for key in words.get(word, ()):
+                    field_scores[key] = field_scores.get(key, 0.0) + 1
+            for key, score in field_scores.items():
+                scores[key] = max(scores.get(key, 0.0), score)
+        return scores
+
+    def _match_prefix(self, collection: str, fields: list[str], text: str) -> dict[str, float]:
+        """Match documents that have all query words in a field, the last word as a prefix."""
+        *query_words, last_word = list(_tokenize(text)) or [""]
+        scores: dict[str, float] = {}
+        for field in fields:
+            words = self._get_words(collection, field)
+            keys = set().union(*(keys for word, keys in words.items() if word.startswith(last_word)))
+            for word in query_words:
+                keys &= words.get(word, set())
+            scores.update(dict.fromkeys(keys, float(len(query_words) + 1)))
+        return scores
+
+    def _sort(self, collection: str, keys: list[str], sort: list) -> list[str]:
+        # sort by the last field first: Python's sort is stable
+        for field, descending in reversed([_parse_sort(item) for item in sort]):
+            values = self._get_values(collection, field)
+            present = [key for key in keys if values.get(key)]
+            missing = [key for key in keys if not values.get(key)]
+            reduce = max if descending else min
+            present.sort(key=lambda key: reduce(values[key]), reverse=descending)
+            keys = present + missing
+        return keys
+
+    def _get_values(self, collection: str, field: str) -> dict[str, list]:
+        index_key = (collection, field)
+        if index_key not in self._values:
+            self._values[index_key] = {
+                key: _get_values(document, field)
+                for key, document in self.collections.get(collection, {}).items()
+            }
+        return self._values[index_key]
+
+    def _get_terms(self, collection: str, field: str) -> dict[Any, set[str]]:
+        index_key = (collection, field)
+        if index_key not in self._terms:
+            terms: dict[Any, set[str]] = {}
+            for key, values in self._get_values(collection, field).items():
+                for value in values:
+                    terms.setdefault(value, set()).add(key)
+            self._terms[index_key] = terms
+        return self._terms[index_key]
+
+    def _get_words(self, collection: str, field: str) -> dict[str, set[str]]:
+        index_key = (collection, field)
+        if index_key not in self._words:
+            words: dict[str, set[str]] = {}
+            for key, values in self._get_values(collection, field).items():
+                for value in values:
+                    for word in _tokenize(str(value)):
+                        words.setdefault(word, set()).add(key)
+            self._words[index_key] = words
+        return self._words[index_key]
+
+
+class InMemoryCache(AsyncCache):
+    """In-memory cache with the same semantics as `RedisCache`.
+
+    Values are compressed with the given `compression`, if any.
+    """
+
+    def __init__(
+        self,
+        default_ttl: seconds | datetime.timedelta | None = None,
+        compression: CacheCompression | None = None,
+    ) -> None:
+        self.default_ttl = default_ttl
+        self.compression = compression
+        self._values: dict[str, tuple[Any, float | None]] = {}
+
+    async def get(self, key: str, /, *, default: Any | None = None) -> Any:
+        value, expires_at = self._values.get(key, (None, None))
+        if value is None:
+            return default
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[key]
+            return default
+        if self.compression is not None:
+            return self.compression.decode(value)
+        return value
+
+    async def set(self, key: str, data: Any, *, ttl: seconds | None = None) -> bool:
+        if self.compression is not None:
+            data = self.compression.encode(data)
+        timeout = self.get_ttl(ttl)
+        if isinstance(timeout, datetime.timedelta):
+            timeout = timeout.total_seconds()
+        self._values[key] = (data, time.monotonic() + timeout if timeout is not None else None)
+        return True
+
+    def get_ttl(self, ttl: seconds | datetime.timedelta | None = None, /) -> seconds | datetime.timedelta | None:
+        if ttl is None and self.default_ttl is not None:
+            return self.default_ttl
+        if isinstance(ttl, datetime.timedelta):
+            return ttl
+        return None if ttl is None else max(0, int(ttl))
+
+
+class InMemoryViewStore(ViewStore):
+    """In-memory store of materialized views with the same semantics as `RedisViewStore`."""
+
+    def __init__(self) -> None:
+        self._views: dict[str, tuple[tuple[list[str], bool], float]] = {}
+        self._rankings: dict[str, tuple[list[str], float]] = {}
+        self._items: dict[str, tuple[dict[str, bytes], float]] = {}
+        self._locks: dict[str, float] = {}
+
+    async def get_page(self, key: str, offset: int, size: int) -> list[str] | None:
+        view, expires_at = self._views.get(key, (None, 0.0))
+        if view is None or expires_at <= time.monotonic():
+            return None
+        ids, truncated = view
+        if truncated and offset + size > len(ids):
+            return None
+        return ids[offset:offset + size]
+
+    async def save_views(self, views: dict[str, tuple[list[str], bool]], *, ttl: seconds) -> None:
+        expires_at = time.monotonic() + ttl
+        self._views.update((key, (view, expires_at)) for key, view in views.items())
+
+    async def get_ranked_page(self, key: str, offset: int, size: int, *, descending: bool) -> list[str] | None:
+        ids, expires_at = self._rankings.get(key, ([], 0.0))
+        if expires_at <= time.monotonic() or offset + size > len(ids):
+            return None
+        if descending:
+            ids = ids[::-1]
+        return ids[offset:offset + size]
+
+    async def save_ranking(self, key: str, scores: dict[str, float], *, ttl: seconds) -> None:
+        ids = sorted(scores, key=lambda doc_id: (scores[doc_id], doc_id))
+        self._rankings[key] = (ids, time.monotonic() + ttl)
+
+    async def get_items(self, key: str, ids: list[str]) -> list[bytes | None]:
+        items, expires_at = self._items.get(key, ({}, 0.0))
+        if expires_at <= time.monotonic():
+            items = {}
+        return [items.get(item_id) for item_id in ids]
+
+    async def save_items(self, key: str, items: dict[str, bytes], *, ttl: seconds) -> None:
+        saved, expires_at = self._items.get(key, ({}, 0.0))
+        if expires_at <= time.monotonic():
+            saved = {}
+        self._items[key] = ({**saved, **items}, time.monotonic() + ttl)
+
+    async def acquire_lock(self, key: str, *, ttl: seconds) -> bool:
+        now = time.monotonic()
+        if self._locks.get(key, 0.0) > now:
+            return False
+        self._locks[key] = now + ttl
+        return True
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """In-memory store of rate limits with the same semantics as `RedisRateLimitStore`."""
+
+    def __init__(self) -> None:
+        self._tats: dict[str, float] = {}
+
+    async def consume(self, requests: list[tuple[str, int, float]]) -> list[float]:
+        now = time.monotonic()
+        backlogs = []
+        for key, count, interval in requests:
+            tat = max(self._tats.get(key, now), now) + count * interval
+            self._tats[key] = tat
+            backlogs.append(tat - now)
+        return backlogs
+
+
+def _get_values(document: Any, path: str) -> list:
+    """Get all values of the dotted `path`, lists of nested objects are flattened.
+
+    Multi-fields (e.g. `name.raw`) are resolved to the values of the parent field.
+    """
+    values = [document]
+    for name in path.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, dict):
+                item = value.get(name, _MISSING)
+                if item is not _MISSING and item is not None:
+                    next_values.extend(item if isinstance(item, list) else [item])
+            elif not isinstance(value, list):
+                # multi-field of a scalar value
+                next_values.append(value)
+        values = next_values
+    return [_normalize(value) for value in values]
+
+
+def _get_source(document: dict, query: Query) -> dict:
+    """Limit the document to top-level `_source` fields of the query (only lists of fields are supported)."""
+    fields = query.get("_source")
+    if fields is None:
+        return document
+    return {field: document[field] for field in fields if field in document}
+
+
+def _parse_sort(item: str | dict) -> tuple[str, bool]:
+    if isinstance(item, dict):
+        (field, order), = item.items()
+        if isinstance(order, dict):
+            order = order.get("order", "asc")
+        return field, order == "desc"
+    field, _, order = item.partition(":")
+    return field, order == "desc"
+
+
+def _in_range(value: Any, bounds: dict) -> bool:
+    checks = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+    try:
+        return all(check(value, bounds[op]) for op, check in checks.items() if op in bounds)
+    except TypeError:
+        return False
+
+
+def _term_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return _normalize(value["value"])
+    return _normalize(value)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _tokenize(text: str) -> Iterator[str]:
+    return (word.lower() for word in _TOKEN_RE.findall(text))
+
+
+def _as_list(clauses: dict | list) -> list:
+    return clauses if isinstance(clauses, list) else [clauses]
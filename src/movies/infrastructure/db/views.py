@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import uuid
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from movies.common.types import seconds
+
+    from .redis import RedisClient
+
+ID_SIZE: Final[int] = 16  # UUIDs are stored as 16 raw bytes
+
+HEADER_COMPLETE: Final[bytes] = b"\x01"
+HEADER_TRUNCATED: Final[bytes] = b"\x02"
+
+
+class ViewStore(ABC):
+    """Store of materialized views and items they refer to."""
+
+    @abstractmethod
+    async def get_page(self, key: str, offset: int, size: int) -> list[str] | None:
+        """Get a page of ids from the view.
+
+        Return `None` if there is no such view or the page is beyond the end of a truncated view.
+        """
+
+    @abstractmethod
+    async def save_views(self, views: dict[str, tuple[list[str], bool]], *, ttl: seconds) -> None:
+        """Save views by their keys.
+
+        A view is an ordered list of ids and a flag whether it's truncated (the query has more results).
+        """
+
+    @abstractmethod
+    async def get_ranked_page(self, key: str, offset: int, size: int, *, descending: bool) -> list[str] | None:
+        """Get a page of ids from the ranking ordered by score, ties are ordered by id.
+
+        Return `None` if there is no such ranking or the page is beyond its end.
+        """
+
+    @abstractmethod
+    async def save_ranking(self, key: str, scores: dict[str, float], *, ttl: seconds) -> None:
+        """Replace the ranking with the given scores of ids."""
+
+    @abstractmethod
+    async def get_items(self, key: str, ids: list[str]) -> list[bytes | None]:
+        """Get serialized items by ids from the `key` collection."""
+
+    @abstractmethod
+    async def save_items(self, key: str, items: dict[str, bytes], *, ttl: seconds) -> None:
+        """Save serialized items by ids to the `key` collection."""
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, *, ttl: seconds) -> bool:
+        """Acquire a lock that expires in `ttl` seconds, return `False` if it's already held."""
+
+
+class RedisViewStore(ViewStore):
+    """Redis store of materialized views.
+
+    A view is a string with a header byte followed by packed ids (16 bytes per UUID), pages are read with `GETRANGE`
+    without loading the whole view. Rankings are sorted sets read with `ZRANGE`/`ZREVRANGE`.
+    Items are saved in a hash and read with `HMGET`.
+    The client must return bytes (`decode_responses=False`).
+    """
+
+    def __init__(self, client: RedisClient, items_batch_size: int = 1000) -> None:
+        self.client = client
+        self.items_batch_size = items_batch_size
+
+    async def get_page(self, key: str, offset: int, size: int) -> list[str] | None:
+        start = len(HEADER_COMPLETE) + offset * ID_SIZE
+        header, length, packed_ids = await self.client.pipeline(
+            "views.get_page",
+            [("GETRANGE", key, 0, 0), ("STRLEN", key), ("GETRANGE", key, start, start + size * ID_SIZE - 1)],
+        )
+        if not header:
+            return None
+        count = (length - len(header)) // ID_SIZE
+        if header == HEADER_TRUNCATED and offset + size > count:
+            return None
+        return unpack_ids(packed_ids)
+
+    async def save_views(self, views: dict[str, tuple[list[str], bool]], *, ttl: seconds) -> None:
+        commands = [
+            ("SET", key, (HEADER_TRUNCATED if truncated else HEADER_COMPLETE) + pack_ids(ids), "EX", ttl)
+            for key, (ids, truncated) in views.items()
+        ]
+        if commands:
+            await self.client.pipeline("views.save", commands, write=True)
+
+    async def get_ranked_page(self, key: str, offset: int, size: int, *, descending: bool) -> list[str] | None:
+        command = "ZREVRANGE" if descending else "ZRANGE"
+        commands = [("ZCARD", key), (command, key, offset, offset + size - 1)]
+        count, ids = await self.client.pipeline("views.get_ranked_page", commands)
+        if offset + size > count:
+            return None
+        return [doc_id.decode() for doc_id in ids]
+
+    async def save_ranking(self, key: str, scores: dict[str, float], *, ttl: seconds) -> None:
+        # the new ranking is built aside and renamed, so readers never see a partial ranking
+        temp_key = f"{key}:tmp"
+        pairs = [value for doc_id, score in scores.items() for value in (score, doc_id)]
+        batch_size = self.items_batch_size * 2
+        commands: list[tuple] = [("DEL", temp_key)]
+        commands.extend(
+            ("ZADD", temp_key, *pairs[start:start + batch_size])
+            for start in range(0, len(pairs), batch_size)
+        )
+        if scores:
+            commands.extend([("RENAME", temp_key, key), ("EXPIRE", key, ttl)])
+        else:
+            commands.append(("DEL", key))
+        await self.client.pipeline("views.save_ranking", commands, write=True)
+
+    async def get_items(self, key: str, ids: list[str]) -> list[bytes | None]:
+        if not ids:
+            return []
+        items, = await self.client.pipeline("views.get_items", [("HMGET", key, *ids)])
+        return items
+
+    async def save_items(self, key: str, items: dict[str, bytes], *, ttl: seconds) -> None:
+        pairs = [value for pair in items.items() for value in pair]
+        batch_size = self.items_batch_size * 2
+        commands: list[tuple] = [
+            ("HSET", key, *pairs[start:start + batch_size])
+            for start in range(0, len(pairs), batch_size)
+        ]
+        commands.append(("EXPIRE", key, ttl))
+        await self.client.pipeline("views.save_items", commands, write=True)
+
+    async def acquire_lock(self, key: str, *, ttl: seconds) -> bool:
+        result, = await self.client.pipeline("views.lock", [("SET", key, b"1", "NX", "EX", ttl)], write=True)
+        return bool(result)
+
+
+def pack_ids(ids: list[str], /) -> bytes:
+    """Pack UUIDs into 16 bytes each."""
+    return b"".join(uuid.UUID(doc_id).bytes for doc_id in ids)
+
+
+def unpack_ids(data: bytes, /) -> list[str]:
+    """Unpack UUIDs packed with `pack_ids`."""
+    return [str(uuid.UUID(bytes=data[start:start + ID_SIZE])) for start in range(0, len(data), ID_SIZE)]
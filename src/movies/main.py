@@ -1,13 +1,20 @@
+import gc
 import logging
+import time
 
 from fastapi import FastAPI, Request
-from fastapi.responses import ORJSONResponse
 
+from movies.api.metrics import router as metrics_router
+from movies.api.middlewares import (
+    ConcurrencyLimitMiddleware, IdentityMapMiddleware, MetricsMiddleware, ProfilingMiddleware, TracingMiddleware,
+)
+from movies.api.responses import ORJSONResponse
 from movies.api.urls import api_router
 from movies.common.exceptions import NetflixMoviesError
+from movies.core import health
 from movies.core.config import get_settings
 
-from .containers import Container, override_providers
+from .containers import Container, override_providers, preload_providers
 
 settings = get_settings()
 
@@ -33,19 +40,62 @@ def create_app() -> FastAPI:
 
     @app.exception_handler(NetflixMoviesError)
     async def project_exception_handler(_: Request, exc: NetflixMoviesError):
-        return ORJSONResponse(status_code=exc.status_code, content=exc.to_dict())
+        return ORJSONResponse(status_code=exc.status_code, content=exc.to_dict(), headers=exc.headers)
 
     @app.on_event("startup")
     async def startup():
+        start = time.perf_counter()
         await container.init_resources()
         container.check_dependencies()
-        logging.info("Start server")
+        container.readiness().unblock(health.STARTUP)
+        logging.info("Start server, resources are initialized in %.3fs", time.perf_counter() - start)
 
     @app.on_event("shutdown")
     async def shutdown():
+        container.readiness().block(health.SHUTDOWN)
         await container.shutdown_resources()
         logging.info("Cleanup resources")
 
+    app.add_middleware(IdentityMapMiddleware)
+    if settings.CONCURRENCY_LIMIT_ENABLED:
+        app.add_middleware(
+            ConcurrencyLimitMiddleware,
+            groups=settings.CONCURRENCY_LIMIT_GROUPS,
+            retry_after=settings.CONCURRENCY_LIMIT_RETRY_AFTER,
+            initial_limit=settings.CONCURRENCY_LIMIT_INITIAL,
+            min_limit=settings.CONCURRENCY_LIMIT_MIN,
+            max_limit=settings.CONCURRENCY_LIMIT_MAX,
+            latency_threshold=settings.CONCURRENCY_LIMIT_LATENCY_THRESHOLD,
+            backoff_ratio=settings.CONCURRENCY_LIMIT_BACKOFF_RATIO,
+        )
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(TracingMiddleware)
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(
+            ProfilingMiddleware,
+            buffer=container.profile_buffer(),
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+            token=settings.PROFILING_TOKEN,
+            collect_stats=settings.PROFILING_COLLECT_STATS,
+        )
+
     app.container = container
     app.include_router(api_router)
+    app.include_router(metrics_router)
+    return app
+
+
+def create_preloaded_app() -> FastAPI:
+    """Create the app in the gunicorn master process to be shared by forked workers (`preload_app`).
+
+    Everything that doesn't open sockets is prepared once: modules, DI container and wiring, routes,
+    the OpenAPI schema and static singletons. Preloaded objects are frozen, so the garbage collector doesn't
+    write to their memory pages and workers keep sharing them (copy-on-write).
+    Elasticsearch and Redis clients are initialized by every worker on startup.
+    """
+    app = create_app()
+    preload_providers(app.container)
+    app.openapi()
+    gc.collect()
+    gc.freeze()
     return app
@@ -0,0 +1,104 @@
+"""Bulk export of the catalog to a NDJSON file.
+
+Example: `python -m movies.utils.export films --slices 4 --output films.ndjson.gz`.
+"""
+
+import argparse
+import asyncio
+import gzip
+import pathlib
+from typing import BinaryIO
+
+import orjson
+
+from movies.containers import Container
+from movies.core.config import get_settings
+from movies.domain.exports import ExportResource, ExportService, to_ndjson
+
+settings = get_settings()
+
+
+async def export_slice(
+    export_service: ExportService,
+    resource: ExportResource,
+    queue: asyncio.Queue,
+    *,
+    slice_id: int, max_slices: int, after: str | None = None,
+) -> None:
+    """Export one slice of the resource into the queue."""
+    batches = export_service.iter_batches(resource, slice_id=slice_id, max_slices=max_slices, after=after)
+    async for batch in batches:
+        await queue.put((slice_id, batch))
+
+
+async def write_batches(queue: asyncio.Queue, output: BinaryIO, state_path: pathlib.Path, state: dict) -> int:
+    """Write exported batches to the output file.
+
+    State file with the last exported `uuid` of every slice is updated after each batch.
+    """
+    total = 0
+    while True:
+        item = await queue.get()
+        if item is None:
+            return total
+        slice_id, batch = item
+        output.write(to_ndjson(batch))
+        output.flush()
+        state[str(slice_id)] = batch[-1]["uuid"]
+        state_path.write_bytes(orjson.dumps(state))
+        total += len(batch)
+
+
+async def export(resource: ExportResource, output_path: pathlib.Path, slices: int) -> int:
+    """Export the resource with `slices` parallel slices.
+
+    If the previous export has been interrupted, it is resumed from the saved state.
+    """
+    state_path = output_path.with_name(f"{output_path.name}.state")
+    state: dict = orjson.loads(state_path.read_bytes()) if state_path.exists() else {}
+
+    container = Container()
+    container.config.from_pydantic(settings=settings)
+    await container.init_resources()
+    export_service: ExportService = container.export_service()
+
+    # Bounded queue: slices are paused if the writer can't keep up
+    queue: asyncio.Queue = asyncio.Queue(maxsize=slices * 2)
+    opener = gzip.open if output_path.suffix == ".gz" else open
+    try:
+        with opener(output_path, "ab") as output:
+            writer = asyncio.create_task(write_batches(queue, output, state_path, state))
+            try:
+                await asyncio.gather(*[
+                    export_slice(
+                        export_service, resource, queue,
+                        slice_id=slice_id, max_slices=slices, after=state.get(str(slice_id)),
+                    )
+                    for slice_id in range(slices)
+                ])
+            except Exception:
+                writer.cancel()
+                raise
+            await queue.put(None)
+            total = await writer
+    finally:
+        await container.shutdown_resources()
+    state_path.unlink(missing_ok=True)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export catalog to a NDJSON file.")
+    parser.add_argument("resource", choices=[resource.value for resource in ExportResource])
+    parser.add_argument("--output", type=pathlib.Path, required=True, help="Output file, `.gz` files are compressed.")
+    parser.add_argument("--slices", type=int, default=1, choices=range(1, settings.EXPORT_MAX_SLICES + 1))
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop_policy().new_event_loop()
+    total = loop.run_until_complete(export(ExportResource(args.resource), args.output, args.slices))
+    loop.close()
+    print(f"Exported {total} documents to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
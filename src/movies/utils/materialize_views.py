@@ -0,0 +1,51 @@
+"""Materialize films lists views and sync the rating index once, e.g. from a cron job or after reindexing.
+
+Example: `python -m movies.utils.materialize_views --view genres --view rating`.
+"""
+
+import argparse
+import asyncio
+
+from movies.containers import Container
+from movies.core.config import get_settings
+from movies.domain.films import FilmGenreViews, FilmRatingIndex
+
+settings = get_settings()
+
+VIEWS = ("genres", "rating")
+
+
+async def materialize(views: list[str]) -> dict[str, int]:
+    """Materialize the given views, return the number of saved views (genres) or indexed films (rating)."""
+    container = Container()
+    container.config.from_pydantic(settings=settings)
+    await container.elastic_connection.init()
+    await container.redis_sentinel_connection.init()
+    results = {}
+    try:
+        if "genres" in views:
+            genre_views: FilmGenreViews = container.film_genre_views()
+            results["genres"] = await genre_views.materialize()
+        if "rating" in views:
+            rating_index: FilmRatingIndex = container.film_rating_index()
+            results["rating"] = await rating_index.sync()
+    finally:
+        await container.shutdown_resources()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Materialize films lists views.")
+    parser.add_argument(
+        "--view", choices=VIEWS, action="append", dest="views", help="View to materialize (default: all).")
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop_policy().new_event_loop()
+    results = loop.run_until_complete(materialize(args.views or list(VIEWS)))
+    loop.close()
+    for view, total in results.items():
+        print(f"Materialized {view}: {total}")
+
+
+if __name__ == "__main__":
+    main()
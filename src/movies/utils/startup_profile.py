@@ -0,0 +1,97 @@
+"""Profile the app startup: import time per module, app creation and init time per DI resource.
+
+Import times are measured with `python -X importtime` in a fresh interpreter, resources are initialized one by one
+(dependencies of a resource are included in its time), so the sum is the sequential startup time.
+Backends are configured by `NMA_*` environment variables, resources don't connect to them on init.
+
+Example: `python -m movies.utils.startup_profile --top 20`.
+"""
+
+import argparse
+import asyncio
+import inspect
+import subprocess
+import sys
+import time
+
+import orjson
+from dependency_injector import providers
+
+IMPORT_MODULE = "movies.main"
+
+
+def profile_imports(module: str = IMPORT_MODULE) -> list[dict]:
+    """Import the module in a fresh interpreter, return import times of all imported modules in ms."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        imports.append({
+            "module": name.strip(),
+            "self_ms": round(int(self_us) / 1000, 1),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 1),
+        })
+    return imports
+
+
+async def profile_resources() -> dict:
+    """Create the app and initialize its resources one by one, return their init times in ms."""
+    start = time.perf_counter()
+    from movies.main import create_app
+
+    import_time = time.perf_counter() - start
+    start = time.perf_counter()
+    app = create_app()
+    create_time = time.perf_counter() - start
+
+    container = app.container
+    resources = {}
+    try:
+        for name, provider in container.providers.items():
+            if not isinstance(provider, providers.Resource):
+                continue
+            start = time.perf_counter()
+            result = provider.init()
+            if inspect.isawaitable(result):
+                await result
+            resources[name] = round((time.perf_counter() - start) * 1000, 1)
+    finally:
+        await container.shutdown_resources()
+    return {
+        "import_ms": round(import_time * 1000, 1),
+        "create_app_ms": round(create_time * 1000, 1),
+        "resources_ms": resources,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile the app startup.")
+    parser.add_argument("--top", type=int, default=30, help="Number of the slowest modules to show.")
+    parser.add_argument(
+        "--sort", choices=["cumulative", "self"], default="cumulative", help="Sort modules by this import time.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    imports = profile_imports()
+    imports.sort(key=lambda item: item[f"{args.sort}_ms"], reverse=True)
+    resources = asyncio.run(profile_resources())
+
+    if args.json:
+        print(orjson.dumps({"imports": imports[:args.top], **resources}, option=orjson.OPT_INDENT_2).decode())
+        return
+    print(f"{'self, ms':>10}{'cumulative, ms':>16}  module")
+    for item in imports[:args.top]:
+        print(f"{item['self_ms']:>10}{item['cumulative_ms']:>16}  {item['module']}")
+    print()
+    print(f"{'Import ' + IMPORT_MODULE:<40}{resources['import_ms']:>10} ms")
+    print(f"{'Create app':<40}{resources['create_app_ms']:>10} ms")
+    for name, init_time in resources["resources_ms"].items():
+        print(f"{'Init ' + name:<40}{init_time:>10} ms")
+
+
+if __name__ == "__main__":
+    main()
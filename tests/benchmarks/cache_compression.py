@@ -0,0 +1,90 @@
+"""Cache compression benchmark.
+
+Compares size and (de)compression time of cached `FilmDetail`, `PersonFullDetail` and `FilmList` pages
+for all available compression algorithms.
+
+Usage: `PYTHONPATH=src python -m tests.benchmarks.cache_compression [--samples 200] [--json]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import Callable
+
+import orjson
+
+from movies.common.exceptions import ImproperlyConfiguredError
+from movies.infrastructure.db.compression import COMPRESSORS, CacheCompression
+from movies.infrastructure.db.repositories import CacheRepository
+
+from .payloads import PayloadFactory
+
+
+def make_payloads(samples: int) -> dict[str, list[bytes]]:
+    """Serialize payloads the same way as `CacheRepository` does."""
+    factory = PayloadFactory()
+    return {
+        "film_detail": [CacheRepository.dump_item(factory.film_detail()) for _ in range(samples)],
+        "person_full_detail": [CacheRepository.dump_item(factory.person_full_detail()) for _ in range(samples)],
+        "film_list_page": [
+            CacheRepository.dump_items([factory.film_list() for _ in range(50)])
+            for _ in range(max(1, samples // 10))
+        ],
+    }
+
+
+def timeit(func: Callable[[bytes], bytes], values: list[bytes]) -> tuple[list[bytes], float]:
+    """Apply `func` to all values, return results and mean time per value in microseconds."""
+    start = time.perf_counter()
+    results = [func(value) for value in values]
+    elapsed = time.perf_counter() - start
+    return results, elapsed / len(values) * 1_000_000
+
+
+def run(samples: int, min_size: int) -> list[dict]:
+    payloads = make_payloads(samples)
+    results = []
+    for algorithm in COMPRESSORS:
+        try:
+            compression = CacheCompression(algorithm, min_size=min_size)
+        except ImproperlyConfiguredError as exc:
+            print(f"Skip {algorithm}: {exc}")
+            continue
+        for payload_name, values in payloads.items():
+            encoded, encode_us = timeit(compression.encode, values)
+            _, decode_us = timeit(compression.decode, encoded)
+            raw_size = statistics.mean(len(value) for value in values)
+            encoded_size = statistics.mean(len(value) for value in encoded)
+            results.append({
+                "algorithm": algorithm,
+                "payload": payload_name,
+                "raw_bytes": round(raw_size),
+                "encoded_bytes": round(encoded_size),
+                "ratio": round(raw_size / encoded_size, 2),
+                "encode_us": round(encode_us, 1),
+                "decode_us": round(decode_us, 1),
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cache compression benchmark.")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--min-size", type=int, default=1024, help="Compression threshold in bytes.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.samples, args.min_size)
+    if args.json:
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
+        return
+    columns = list(results[0].keys())
+    print("".join(f"{column:>20}" for column in columns))
+    for result in results:
+        print("".join(f"{result[column]:>20}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Reproducible benchmark dataset.
+
+Generates films, persons and genres Elasticsearch documents (the same shape as in functional tests)
+and loads them into Elasticsearch or saves them to a NDJSON file for the in-memory storage (`NMA_USE_STUBS`).
+
+Usage: `PYTHONPATH=src python -m tests.benchmarks.dataset [--films 100000] [--persons 50000] [--seed 42] [--recreate]`
+or `PYTHONPATH=src python -m tests.benchmarks.dataset --output dataset.ndjson`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import itertools
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Iterator
+
+import orjson
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+from faker import Faker
+
+from movies.domain.films import FilmAccessType, FilmAgeRating
+from movies.domain.roles import Role
+from tests.functional.testdata.elastic import ES_GENRE_MAPPING, ES_INDEX_SETTINGS, ES_MOVIES_MAPPING, ES_PERSON_MAPPING
+
+from .payloads import GENRE_NAMES
+
+DEFAULT_FILMS = 100_000
+DEFAULT_PERSONS = 50_000
+DEFAULT_SEED = 42
+
+INDICES = {
+    "genre": ES_GENRE_MAPPING,
+    "movies": ES_MOVIES_MAPPING,
+    "person": ES_PERSON_MAPPING,
+}
+
+ROLE_FIELDS = {
+    Role.ACTOR: "actors",
+    Role.WRITER: "writers",
+    Role.DIRECTOR: "directors",
+}
+
+
+def make_ids(kind: str, count: int, seed: int = DEFAULT_SEED) -> list[str]:
+    """Generate ids of the `kind` documents.
+
+    Ids don't depend on the documents content, so load scenarios can get them without generating the dataset.
+    """
+    rnd = random.Random(f"{seed}:{kind}")
+    return [str(uuid.UUID(int=rnd.getrandbits(128), version=4)) for _ in range(count)]
+
+
+@dataclass(frozen=True)
+class DatasetIds:
+    """Ids of generated documents."""
+
+    films: list[str]
+    persons: list[str]
+    genres: list[str]
+
+    @classmethod
+    def create(cls, films: int = DEFAULT_FILMS, persons: int = DEFAULT_PERSONS, seed: int = DEFAULT_SEED) -> DatasetIds:
+        return cls(
+            films=make_ids("films", films, seed),
+            persons=make_ids("persons", persons, seed),
+            genres=make_ids("genres", len(GENRE_NAMES), seed),
+        )
+
+
+class DatasetGenerator:
+    """Deterministic generator of Elasticsearch documents.
+
+    Persons popularity follows a long-tail distribution: the most popular persons take part in ~10x more films
+    than an average one.
+    """
+
+    def __init__(self, films: int = DEFAULT_FILMS, persons: int = DEFAULT_PERSONS, seed: int = DEFAULT_SEED) -> None:
+        self.ids = DatasetIds.create(films, persons, seed)
+        self.random = random.Random(seed)
+        # XXX: multi-locale Faker picks a locale with the global `random`, so locales are picked here
+        self.fakers = [Faker("en_US"), Faker("ru_RU")]
+        for faker in self.fakers:
+            faker.seed_instance(seed)
+        self.genres = [
+            {"uuid": genre_id, "name": name}
+            for genre_id, name in zip(self.ids.genres, GENRE_NAMES)
+        ]
+        self.persons = [
+            {"uuid": person_id, "full_name": self._faker().name()}
+            for person_id in self.ids.persons
+        ]
+        offset = max(1, persons // 50)
+        self._persons_cum_weights = list(itertools.accumulate(1 / (rank + offset) for rank in range(persons)))
+        self._roles: dict[str, dict[Role, list[dict]]] = {}
+
+    def genre_documents(self) -> Iterator[dict]:
+        yield from self.genres
+
+    def film_documents(self) -> Iterator[dict]:
+        """Generate films.
+
+        Person roles are collected along the way, so persons documents must be generated after films.
+        """
+        for film_id in self.ids.films:
+            film = {
+                "uuid": film_id,
+                "title": self._faker().sentence(nb_words=self.random.randint(1, 5)).removesuffix("."),
+                "imdb_rating": round(self.random.uniform(1, 10), 1),
+                "description": self._faker().paragraph(nb_sentences=6),
+                "release_date": self._faker().date_between(start_date="-60y").isoformat(),
+                "age_rating": self.random.choice(list(FilmAgeRating)).value,
+                "access_type": self.random.choice(list(FilmAccessType)).value,
+                "genre": self.random.sample(self.genres, k=self.random.randint(1, 3)),
+            }
+            brief = {key: film[key] for key in ("uuid", "title", "imdb_rating", "access_type")}
+            counts = {
+                Role.ACTOR: self.random.randint(5, 15),
+                Role.WRITER: self.random.randint(1, 3),
+                Role.DIRECTOR: self.random.randint(1, 2),
+            }
+            for role, count in counts.items():
+                persons = self._sample_persons(count)
+                film[ROLE_FIELDS[role]] = persons
+                film[f"{ROLE_FIELDS[role]}_names"] = [person["full_name"] for person in persons]
+                for person in persons:
+                    self._roles.setdefault(person["uuid"], {}).setdefault(role, []).append(brief)
+            film["genres_names"] = [genre["name"] for genre in film["genre"]]
+            yield film
+
+    def person_documents(self) -> Iterator[dict]:
+        for person in self.persons:
+            roles = self._roles.get(person["uuid"], {})
+            yield {
+                **person,
+                "films_ids": list(dict.fromkeys(film["uuid"] for films in roles.values() for film in films)),
+                "roles": [{"role": role.value, "films": films} for role, films in roles.items()],
+            }
+
+    def documents(self) -> Iterator[tuple[str, dict]]:
+        """Generate all documents with names of their indices."""
+        for index, documents in (
+            ("genre", self.genre_documents()),
+            ("movies", self.film_documents()),
+            ("person", self.person_documents()),
+        ):
+            for document in documents:
+                yield index, document
+
+    def _faker(self) -> Faker:
+        return self.random.choice(self.fakers)
+
+    def _sample_persons(self, count: int) -> list[dict]:
+        indexes = {
+            bisect.bisect(self._persons_cum_weights, self.random.random() * self._persons_cum_weights[-1])
+            for _ in range(count)
+        }
+        return [self.persons[min(index, len(self.persons) - 1)] for index in sorted(indexes)]
+
+
+async def load_dataset(
+    elastic: AsyncElasticsearch, generator: DatasetGenerator, *, recreate: bool = False, chunk_size: int = 1000,
+) -> int:
+    """Create indices and load generated documents."""
+    for index, mapping in INDICES.items():
+        if recreate:
+            await elastic.indices.delete(index=index, ignore=[404])
+        body = {"settings": {**ES_INDEX_SETTINGS, "refresh_interval": "-1"}, "mappings": mapping}
+        await elastic.indices.create(index=index, body=body, ignore=[400])
+
+    actions = (
+        {"_index": index, "_id": document["uuid"], "_source": document}
+        for index, document in generator.documents()
+    )
+    loaded, _ = await async_bulk(elastic, actions, chunk_size=chunk_size)
+
+    refresh_settings = {"refresh_interval": ES_INDEX_SETTINGS["refresh_interval"]}
+    for index in INDICES:
+        await elastic.indices.put_settings(index=index, body=refresh_settings)
+        await elastic.indices.refresh(index=index)
+    return loaded
+
+
+def save_dataset(path: str, generator: DatasetGenerator) -> int:
+    """Save generated documents as Elasticsearch bulk actions, one per line."""
+    saved = 0
+    with open(path, "wb") as file:
+        for index, document in generator.documents():
+            file.write(orjson.dumps({"_index": index, "_id": document["uuid"], "_source": document}) + b"\n")
+            saved += 1
+    return saved
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    if args.output is not None:
+        saved = save_dataset(args.output, DatasetGenerator(films=args.films, persons=args.persons, seed=args.seed))
+        print(f"Saved {saved} documents to {args.output}")
+        return
+
+    elastic = AsyncElasticsearch(hosts=[{"host": args.es_host, "port": args.es_port}], request_timeout=60)
+    try:
+        start = time.perf_counter()
+        generator = DatasetGenerator(films=args.films, persons=args.persons, seed=args.seed)
+        loaded = await load_dataset(elastic, generator, recreate=args.recreate)
+        print(f"Loaded {loaded} documents in {time.perf_counter() - start:.1f}s")
+    finally:
+        await elastic.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate benchmark dataset and load it into Elasticsearch.")
+    parser.add_argument("--films", type=int, default=DEFAULT_FILMS)
+    parser.add_argument("--persons", type=int, default=DEFAULT_PERSONS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--es-host", default=os.environ.get("NE_ES_HOST", "localhost"))
+    parser.add_argument("--es-port", type=int, default=int(os.environ.get("NE_ES_PORT", 9200)))
+    parser.add_argument("--recreate", action="store_true", help="Delete existing indices.")
+    parser.add_argument("--output", help="Save documents to a NDJSON file instead of loading them into Elasticsearch.")
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop_policy().new_event_loop()
+    loop.run_until_complete(main_async(args))
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Films list caching benchmark.
+
+Replays the same random `GET /api/v1/films` workload (subscribers and other users, sorting, genre filter,
+mostly first pages) against films lists cached per access type and against the list shared by all access types
+(`NMA_FILMS_SHARED_LIST_DEPTH`). Storage is the in-memory stub, so storage queries and fetched documents stand for
+Elasticsearch load and cached keys and bytes for Redis footprint.
+
+Usage: `PYTHONPATH=src python -m tests.benchmarks.film_list_cache [--films 5000] [--requests 5000] [--json]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import random
+import time
+from dataclasses import dataclass
+
+import orjson
+
+from movies.domain.films import FilmFilter, FilmRepository, film_key_factory
+from movies.infrastructure.db.cache import CacheKeyBuilder
+from movies.infrastructure.db.repositories import CacheRepository, ElasticCacheRepository, ElasticRepository
+from movies.infrastructure.db.stubs import InMemoryCache, InMemoryStorage
+
+from .dataset import DEFAULT_SEED, DatasetGenerator
+from .payloads import GENRE_NAMES
+
+SORTS = [None, ["imdb_rating:desc"], ["imdb_rating"], ["title.raw"]]
+
+
+@dataclass(frozen=True)
+class FilmsRequest:
+    is_subscriber: bool
+    page_size: int
+    page_number: int
+    sort: list[str] | None
+    genre: str | None
+
+
+def make_workload(requests: int, subscribers_share: float, seed: int = DEFAULT_SEED) -> list[FilmsRequest]:
+    rnd = random.Random(seed)
+    return [
+        FilmsRequest(
+            is_subscriber=rnd.random() < subscribers_share,
+            page_size=rnd.choice([10, 20, 50]),
+            # most users don't go further than the first pages
+            page_number=min(int(rnd.expovariate(0.7)) + 1, 20),
+            sort=rnd.choice(SORTS),
+            genre=rnd.choice([None, None, *GENRE_NAMES]),
+        )
+        for _ in range(requests)
+    ]
+
+
+class CountingStorage(InMemoryStorage):
+    """In-memory storage that counts queries and returned documents."""
+
+    queries = 0
+    documents = 0
+
+    async def search(self, collection, query, *args, **kwargs):
+        documents = await super().search(collection, query, *args, **kwargs)
+        self.queries += 1
+        self.documents += len(documents)
+        return documents
+
+
+async def run_layout(films: list[dict], workload: list[FilmsRequest], shared_list_depth: int) -> dict:
+    storage = CountingStorage()
+    storage.add("movies", films)
+    cache = InMemoryCache()
+    repository = FilmRepository(
+        ElasticCacheRepository(
+            elastic_repository=ElasticRepository(storage, index_name="movies"),
+            cache_repository=CacheRepository(cache),
+            key_factory=functools.partial(film_key_factory, CacheKeyBuilder(), 10),
+        ),
+        shared_list_depth=shared_list_depth,
+    )
+
+    start = time.perf_counter()
+    for request in workload:
+        params = {
+            "page_size": request.page_size, "page_number": request.page_number, "sort": request.sort,
+            "filters": FilmFilter(genre=[request.genre]) if request.genre is not None else None,
+        }
+        if request.is_subscriber:
+            await repository.get_all(**params)
+        else:
+            await repository.get_public(**params)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "layout": f"shared:{shared_list_depth}" if shared_list_depth else "per_access_type",
+        "storage_queries": storage.queries,
+        "storage_documents": storage.documents,
+        "cache_keys": len(cache._values),
+        "cache_bytes": sum(len(value) for value, _ in cache._values.values()),
+        "mean_request_us": round(elapsed / len(workload) * 1_000_000, 1),
+    }
+
+
+async def run(films: int, requests: int, subscribers_share: float, depths: list[int]) -> list[dict]:
+    documents = list(DatasetGenerator(films=films, persons=max(1, films // 2)).film_documents())
+    workload = make_workload(requests, subscribers_share)
+    return [await run_layout(documents, workload, depth) for depth in [0, *depths]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Films list caching benchmark.")
+    parser.add_argument("--films", type=int, default=5_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--subscribers-share", type=float, default=0.3)
+    parser.add_argument(
+        "--depth", type=int, action="append", dest="depths",
+        help="Shared list depth, can be repeated (default: 100, 200 and 500).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.films, args.requests, args.subscribers_share, args.depths or [100, 200, 500]))
+    if args.json:
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
+        return
+    columns = list(results[0].keys())
+    print("".join(f"{column:>20}" for column in columns))
+    for result in results:
+        print("".join(f"{result[column]:>20}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""Load testing of API endpoints.
+
+Every scenario sends requests to one endpoint (`mixed` - to all of them) from `--concurrency` workers
+for `--duration` seconds and reports RPS and latency percentiles.
+Results are saved as JSON with the current commit, so they can be compared across commits.
+
+The API is run in-process by default (with backends configured by `NMA_*` environment variables),
+or it can be tested over HTTP with `--base-url`.
+Load the dataset with `tests.benchmarks.dataset` first and use the same `--films`, `--persons` and `--seed`.
+
+Usage:
+- `PYTHONPATH=src python -m tests.benchmarks.load run [--scenario films_list] [--output results.json]`
+- `PYTHONPATH=src python -m tests.benchmarks.load compare base.json results.json [--threshold 0.1]`
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable
+
+import httpx
+import orjson
+from faker import Faker
+from jose import jwt
+
+from movies.common.constants import DefaultRoles
+
+from .dataset import DEFAULT_FILMS, DEFAULT_PERSONS, DEFAULT_SEED, DatasetIds
+from .payloads import GENRE_NAMES
+
+PathFactory = Callable[[random.Random, "ScenarioData"], str]
+
+
+@dataclass(frozen=True)
+class ScenarioData:
+    """Data for building requests: ids of the generated documents and search terms."""
+
+    films: list[str]
+    persons: list[str]
+    genres: list[str]
+    film_words: list[str]
+    person_names: list[str]
+
+    @classmethod
+    def create(cls, ids: DatasetIds, *, hot_set: int | None, seed: int) -> ScenarioData:
+        """Create scenario data.
+
+        Only first `hot_set` films and persons are requested, so some requests hit the cache.
+        """
+        faker = Faker(["en_US", "ru_RU"])
+        faker.seed_instance(seed)
+        return cls(
+            films=ids.films[:hot_set],
+            persons=ids.persons[:hot_set],
+            genres=ids.genres,
+            film_words=faker["en_US"].words(nb=200),
+            person_names=[faker[locale].last_name() for locale in ("en_US", "ru_RU") for _ in range(100)],
+        )
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Load scenario: weighted paths of requests."""
+
+    name: str
+    paths: list[tuple[PathFactory, int]]
+    subscriber: bool = False
+
+    def make_path(self, rnd: random.Random, data: ScenarioData) -> str:
+        factories, weights = zip(*self.paths)
+        factory = rnd.choices(factories, weights=weights)[0]
+        return factory(rnd, data)
+
+
+def _page(rnd: random.Random) -> str:
+    return f"page[number]={rnd.randint(1, 50)}&page[size]=50"
+
+
+def films_list(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/films/?{_page(rnd)}&sort=-imdb_rating"
+
+
+def films_list_genre(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/films/?{_page(rnd)}&filter[genre]={rnd.choice(GENRE_NAMES)}"
+
+
+def films_search(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/films/search?query={rnd.choice(data.film_words)}&page[number]={rnd.randint(1, 5)}"
+
+
+def film_detail(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/films/{rnd.choice(data.films)}"
+
+
+def genres_list(rnd: random.Random, data: ScenarioData) -> str:
+    return "/api/v1/genres/"
+
+
+def genre_detail(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/genres/{rnd.choice(data.genres)}"
+
+
+def persons_list(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/persons/?{_page(rnd)}"
+
+
+def persons_search(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/persons/search?query={rnd.choice(data.person_names)}"
+
+
+def person_detail(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/persons/{rnd.choice(data.persons)}"
+
+
+def person_full_detail(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/persons/full/{rnd.choice(data.persons)}"
+
+
+def person_films(rnd: random.Random, data: ScenarioData) -> str:
+    return f"/api/v1/persons/{rnd.choice(data.persons)}/films"
+
+
+def export_genres(rnd: random.Random, data: ScenarioData) -> str:
+    return "/api/v1/export/genres"
+
+
+def healthcheck(rnd: random.Random, data: ScenarioData) -> str:
+    return "/api/v1/healthcheck/"
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("healthcheck", [(healthcheck, 1)]),
+        Scenario("films_list", [(films_list, 1)]),
+        Scenario("films_list_subscriber", [(films_list, 1)], subscriber=True),
+        Scenario("films_list_genre", [(films_list_genre, 1)]),
+        Scenario("films_search", [(films_search, 1)]),
+        Scenario("film_detail", [(film_detail, 1)]),
+        Scenario("genres_list", [(genres_list, 1)]),
+        Scenario("genre_detail", [(genre_detail, 1)]),
+        Scenario("persons_list", [(persons_list, 1)]),
+        Scenario("persons_search", [(persons_search, 1)]),
+        Scenario("person_detail", [(person_detail, 1)]),
+        Scenario("person_full_detail", [(person_full_detail, 1)]),
+        Scenario("person_films", [(person_films, 1)]),
+        Scenario("export_genres", [(export_genres, 1)]),
+        Scenario(
+            "mixed",
+            [
+                (films_list, 20), (films_list_genre, 10), (films_search, 10), (film_detail, 25),
+                (genres_list, 5), (genre_detail, 2), (persons_list, 3), (persons_search, 5),
+                (person_detail, 10), (person_full_detail, 5), (person_films, 5),
+            ],
+        ),
+    )
+}
+
+DEFAULT_SCENARIOS = [name for name in SCENARIOS if name != "export_genres"]
+
+
+@dataclass
+class ScenarioResult:
+    """Latencies (in seconds) and status codes of scenario requests."""
+
+    latencies: list[float] = field(default_factory=list)
+    status_codes: Counter = field(default_factory=Counter)
+    errors: int = 0
+    elapsed: float = 0
+
+    def to_dict(self) -> dict:
+        count = len(self.latencies)
+        if count < 2:
+            percentiles = [self.latencies[0] if count else 0.0] * 99
+        else:
+            percentiles = statistics.quantiles(self.latencies, n=100, method="inclusive")
+        return {
+            "requests": count,
+            "errors": self.errors + sum(number for status, number in self.status_codes.items() if status >= 400),
+            "rps": round(count / self.elapsed, 1) if self.elapsed else 0.0,
+            "mean_ms": round(statistics.fmean(self.latencies) * 1000, 2) if count else 0.0,
+            "p50_ms": round(percentiles[49] * 1000, 2),
+            "p90_ms": round(percentiles[89] * 1000, 2),
+            "p99_ms": round(percentiles[98] * 1000, 2),
+            "status_codes": {str(status): number for status, number in sorted(self.status_codes.items())},
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    data: ScenarioData,
+    *,
+    concurrency: int, duration: float, warmup: float, seed: int, headers: dict[str, str],
+) -> ScenarioResult:
+    """Run `concurrency` workers sending requests of the scenario.
+
+    Requests sent during `warmup` seconds are not measured.
+    """
+    result = ScenarioResult()
+    warmup_end = time.perf_counter() + warmup
+    deadline = warmup_end + duration
+    scenario_headers = headers if scenario.subscriber else {}
+
+    async def worker(worker_id: int) -> None:
+        rnd = random.Random(f"{seed}:{scenario.name}:{worker_id}")
+        while (start := time.perf_counter()) < deadline:
+            path = scenario.make_path(rnd, data)
+            try:
+                response = await client.get(path, headers=scenario_headers)
+                await response.aclose()
+            except httpx.HTTPError:
+                status_code = None
+            else:
+                status_code = response.status_code
+            if start < warmup_end:
+                continue
+            result.latencies.append(time.perf_counter() - start)
+            if status_code is None:
+                result.errors += 1
+            else:
+                result.status_codes[status_code] += 1
+
+    await asyncio.gather(*[worker(worker_id) for worker_id in range(concurrency)])
+    result.elapsed = time.perf_counter() - warmup_end
+    return result
+
+
+def make_subscriber_token(secret_key: str, algorithm: str) -> str:
+    expires_at = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(days=1)
+    return jwt.encode({"roles": [DefaultRoles.SUBSCRIBERS.value], "exp": expires_at}, secret_key, algorithm=algorithm)
+
+
+def get_commit() -> dict:
+    """Get current commit and whether the working tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout
+        status = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit.strip(), "dirty": bool(status.strip())}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from movies.core.config import get_settings
+
+    settings = get_settings()
+    data = ScenarioData.create(
+        DatasetIds.create(films=args.films, persons=args.persons, seed=args.seed), hot_set=args.hot_set, seed=args.seed)
+    token = make_subscriber_token(settings.JWT_AUTH_SECRET_KEY, settings.JWT_AUTH_ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    app = None
+    if args.base_url is not None:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout)
+    else:
+        from movies.main import create_app
+
+        app = create_app()
+        await app.router.startup()
+        client = httpx.AsyncClient(app=app, base_url="http://benchmark", limits=limits, timeout=args.timeout)
+
+    results = {}
+    try:
+        for name in args.scenario or DEFAULT_SCENARIOS:
+            result = await run_scenario(
+                client, SCENARIOS[name], data,
+                concurrency=args.concurrency, duration=args.duration, warmup=args.warmup, seed=args.seed,
+                headers=headers,
+            )
+            results[name] = result.to_dict()
+            print(_format_result(name, results[name]), file=sys.stderr)
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    return {
+        **get_commit(),
+        "created_at": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+        "target": args.base_url or "in-process",
+        "options": {
+            "concurrency": args.concurrency, "duration": args.duration, "warmup": args.warmup,
+            "films": args.films, "persons": args.persons, "seed": args.seed, "hot_set": args.hot_set,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(base: dict, head: dict, threshold: float) -> tuple[list[str], bool]:
+    """Compare results of two runs.
+
+    Return report lines and whether RPS or p99 latency of any scenario regressed by more than `threshold`.
+    """
+    lines = [f"{'scenario':<24}{'rps':<27}{'p50_ms':<27}{'p99_ms':<27}"]
+    regressed = False
+    for name, head_result in head["scenarios"].items():
+        base_result = base["scenarios"].get(name)
+        if base_result is None:
+            continue
+        columns = []
+        for metric, higher_is_better in (("rps", True), ("p50_ms", False), ("p99_ms", False)):
+            base_value, head_value = base_result[metric], head_result[metric]
+            change = (head_value - base_value) / base_value if base_value else 0.0
+            if metric != "p50_ms" and (-change if higher_is_better else change) > threshold:
+                regressed = True
+            columns.append(f"{base_value:>8} -> {head_value:<8}{change:>+7.1%}")
+        lines.append(f"{name:<24}" + "".join(columns))
+    return lines, regressed
+
+
+def _format_result(name: str, result: dict) -> str:
+    return (
+        f"{name:<24} {result['rps']:>9} rps  p50 {result['p50_ms']:>8} ms  p99 {result['p99_ms']:>8} ms  "
+        f"errors {result['errors']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load testing of API endpoints.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run load scenarios.")
+    run_parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Default: all but export.")
+    run_parser.add_argument("--base-url", help="Test API over HTTP instead of the in-process app.")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=10, help="Measurement duration in seconds.")
+    run_parser.add_argument("--warmup", type=float, default=2, help="Warmup duration in seconds.")
+    run_parser.add_argument("--timeout", type=float, default=30, help="Request timeout in seconds.")
+    run_parser.add_argument("--films", type=int, default=DEFAULT_FILMS)
+    run_parser.add_argument("--persons", type=int, default=DEFAULT_PERSONS)
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_parser.add_argument("--hot-set", type=int, default=1000, help="Number of requested films and persons.")
+    run_parser.add_argument("--output", help="Save results to a JSON file.")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare results of two runs.")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed regression, 0.1 is 10%%.")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.base, "rb") as base_file, open(args.head, "rb") as head_file:
+            lines, regressed = compare(orjson.loads(base_file.read()), orjson.loads(head_file.read()), args.threshold)
+        print("\n".join(lines))
+        sys.exit(1 if regressed else 0)
+
+    loop = asyncio.get_event_loop_policy().new_event_loop()
+    results = loop.run_until_complete(run(args))
+    loop.close()
+    output = orjson.dumps(results, option=orjson.OPT_INDENT_2)
+    if args.output is None:
+        print(output.decode())
+        return
+    with open(args.output, "wb") as output_file:
+        output_file.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Realistic API payloads for benchmarks."""
+
+from __future__ import annotations
+
+import random
+import uuid
+
+from faker import Faker
+
+from movies.domain.films import FilmAccessType, FilmAgeRating, FilmDetail, FilmList
+from movies.domain.genres import GenreDetail
+from movies.domain.persons import PersonList
+from movies.domain.roles import PersonFullDetail, PersonRoleFilmList, Role
+
+GENRE_NAMES = (
+    "Action", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary", "Drama", "Family", "Fantasy",
+    "History", "Horror", "Music", "Musical", "Mystery", "Romance", "Sci-Fi", "Sport", "Thriller", "War", "Western",
+)
+
+
+class PayloadFactory:
+    """Deterministic factory of films and persons with realistic field sizes."""
+
+    def __init__(self, seed: int = 42) -> None:
+        self.random = random.Random(seed)
+        self.faker = Faker(["en_US", "ru_RU"])
+        self.faker.seed_instance(seed)
+        self.genres = [GenreDetail(uuid=self.make_uuid(), name=name) for name in GENRE_NAMES]
+
+    def make_uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def person(self) -> PersonList:
+        return PersonList(uuid=self.make_uuid(), full_name=self.faker.name())
+
+    def film_list(self) -> FilmList:
+        return FilmList(
+            uuid=self.make_uuid(),
+            title=self.title(),
+            imdb_rating=round(self.random.uniform(1, 10), 1),
+            access_type=self.random.choice(list(FilmAccessType)),
+        )
+
+    def film_detail(self) -> FilmDetail:
+        return FilmDetail(
+            uuid=self.make_uuid(),
+            title=self.title(),
+            imdb_rating=round(self.random.uniform(1, 10), 1),
+            description=self.faker.paragraph(nb_sentences=6),
+            release_date=self.faker.date_between(start_date="-60y"),
+            age_rating=self.random.choice(list(FilmAgeRating)),
+            access_type=self.random.choice(list(FilmAccessType)),
+            genre=self.random.sample(self.genres, k=self.random.randint(1, 3)),
+            actors=[self.person() for _ in range(self.random.randint(5, 15))],
+            writers=[self.person() for _ in range(self.random.randint(1, 3))],
+            directors=[self.person() for _ in range(self.random.randint(1, 2))],
+        )
+
+    def person_full_detail(self) -> PersonFullDetail:
+        roles = self.random.sample(list(Role), k=self.random.randint(1, 3))
+        return PersonFullDetail(
+            uuid=self.make_uuid(),
+            full_name=self.faker.name(),
+            roles=[
+                PersonRoleFilmList(role=role, films=[self.film_list() for _ in range(self.random.randint(5, 30))])
+                for role in roles
+            ],
+        )
+
+    def title(self) -> str:
+        return self.faker.sentence(nb_words=self.random.randint(1, 5)).removesuffix(".")
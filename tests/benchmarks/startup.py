@@ -0,0 +1,123 @@
+"""Startup benchmark: gunicorn startup time and memory of workers with and without preloading the app.
+
+Starts gunicorn with `conf/gunicorn.conf.py` (`GUNICORN_PRELOAD=false` and `true`) and in-memory stubs loaded with
+the `--dataset`, waits until all workers have started and reads memory of the master and workers from
+`/proc/<pid>/smaps_rollup` (Linux only): RSS, PSS (shared pages are divided between processes sharing them)
+and USS (private pages). PSS and USS show how much memory workers actually share.
+`NMA_*` settings are taken from the environment.
+
+Usage: `PYTHONPATH=src python -m tests.benchmarks.startup [--workers 4] [--dataset dataset.ndjson] [--json]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+
+import orjson
+
+CONFIG_PATH = pathlib.Path(__file__).parents[2] / "conf" / "gunicorn.conf.py"
+READY_LINE = "Application startup complete"
+
+
+def run_gunicorn(*, preload: bool, workers: int, dataset: str | None, timeout: float) -> dict:
+    env = {
+        **os.environ,
+        "GUNICORN_PRELOAD": str(preload).lower(),
+        "GUNICORN_BIND": f"127.0.0.1:{_get_free_port()}",
+        "WEB_CONCURRENCY": str(workers),
+        "NMA_USE_STUBS": "true",
+    }
+    if dataset is not None:
+        env["NMA_STUBS_DATASET_PATH"] = dataset
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", str(CONFIG_PATH)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        started = 0
+        while started < workers:
+            line = process.stderr.readline()
+            if not line or time.perf_counter() - start > timeout:
+                raise RuntimeError("Gunicorn hasn't started")
+            started += READY_LINE in line
+        startup_time = time.perf_counter() - start
+        # let workers settle before measuring memory
+        time.sleep(1)
+        workers_memory = [_get_memory(pid) for pid in _get_children(process.pid)]
+        master_memory = _get_memory(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        "preload": preload,
+        "startup_s": round(startup_time, 2),
+        "master_rss_mb": master_memory["rss"],
+        "worker_rss_mb": _mean(memory["rss"] for memory in workers_memory),
+        "worker_pss_mb": _mean(memory["pss"] for memory in workers_memory),
+        "worker_uss_mb": _mean(memory["uss"] for memory in workers_memory),
+        "total_pss_mb": round(master_memory["pss"] + sum(memory["pss"] for memory in workers_memory), 1),
+    }
+
+
+def _get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get_children(pid: int, /) -> list[int]:
+    children = pathlib.Path(f"/proc/{pid}/task/{pid}/children").read_text()
+    return [int(child) for child in children.split()]
+
+
+def _get_memory(pid: int, /) -> dict[str, float]:
+    """Get RSS, PSS and USS of the process in MB."""
+    values = {}
+    for line in pathlib.Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value, *_ = line.split()
+        values[name.removesuffix(":")] = int(value) / 1024
+    return {
+        "rss": round(values["Rss"], 1),
+        "pss": round(values["Pss"], 1),
+        "uss": round(values["Private_Clean"] + values["Private_Dirty"], 1),
+    }
+
+
+def _mean(values, /) -> float:
+    values = list(values)
+    return round(sum(values) / len(values), 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Startup benchmark.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--dataset", help="Dataset for in-memory stubs, see `tests.benchmarks.dataset`.")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    results = [
+        run_gunicorn(preload=preload, workers=args.workers, dataset=args.dataset, timeout=args.timeout)
+        for preload in (False, True)
+    ]
+    if args.json:
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
+        return
+    columns = list(results[0].keys())
+    print("".join(f"{column:>16}" for column in columns))
+    for result in results:
+        print("".join(f"{result[column]!s:>16}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
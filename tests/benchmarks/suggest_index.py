@@ -0,0 +1,124 @@
+"""Suggest index benchmark: memory and lookup latency of the in-process prefix index.
+
+Builds `PrefixIndex` of film titles and person names (`--entries` of each) and reports build time, memory
+per 100k entries (`tracemalloc`, the index only) and p50/p99 lookup latency of prefixes of 1-8 characters
+of random labels. `sorted_list` is a baseline with the same keys (labels and their word suffixes) in sorted lists
+of `str` objects and tuples of ids and labels, for comparison with the packed strings and offsets of `PrefixIndex`.
+
+Usage: `PYTHONPATH=src python -m tests.benchmarks.suggest_index [--entries 100000] [--queries 10000] [--json]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Callable
+
+import orjson
+
+from movies.domain.suggestions import PrefixIndex
+
+from .payloads import PayloadFactory
+
+
+class SortedListIndex:
+    """Baseline: normalized labels and their word suffixes in sorted lists of strings."""
+
+    def __init__(self, entries: list[tuple[str, str]]) -> None:
+        heads, tails = [], []
+        for entry in entries:
+            words = PrefixIndex.normalize(entry[1]).split(" ")
+            heads.append((" ".join(words), entry))
+            tails.extend((" ".join(words[position:]), entry) for position in range(1, len(words)))
+        heads.sort()
+        tails.sort()
+        self.keys = [[key for key, _ in heads], [key for key, _ in tails]]
+        self.entries = [[entry for _, entry in heads], [entry for _, entry in tails]]
+
+    def find(self, query: str, size: int) -> list[tuple[str, str]]:
+        prefix = PrefixIndex.normalize(query)
+        found: dict[tuple[str, str], None] = {}
+        for keys, entries in zip(self.keys, self.entries):
+            index = bisect.bisect_left(keys, prefix)
+            while index < len(keys) and len(found) < size and keys[index].startswith(prefix):
+                found[entries[index]] = None
+                index += 1
+        return list(found)
+
+
+def make_entries(kind: str, count: int, factory: PayloadFactory) -> list[tuple[str, str]]:
+    if kind == "films":
+        return [(str(factory.make_uuid()), factory.title()) for _ in range(count)]
+    return [(str(factory.make_uuid()), factory.faker.name()) for _ in range(count)]
+
+
+def make_queries(entries: list[tuple[str, str]], count: int, factory: PayloadFactory) -> list[str]:
+    labels = [label for _, label in factory.random.sample(entries, k=min(count, len(entries)))]
+    return [label[:factory.random.randint(1, 8)] for label in labels]
+
+
+def measure(build: Callable[[list[tuple[str, str]]], object], entries: list[tuple[str, str]]) -> tuple[object, dict]:
+    """Build the index, return it with build time in seconds and its memory per 100k entries in MB."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = build(entries)
+    build_time = time.perf_counter() - start
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return index, {
+        "build_s": round(build_time, 2),
+        "mb_per_100k": round(memory / len(entries) * 100_000 / 1024 / 1024, 1),
+    }
+
+
+def run(entries_count: int, queries_count: int, size: int) -> list[dict]:
+    factory = PayloadFactory()
+    results = []
+    for kind in ("films", "persons"):
+        entries = make_entries(kind, entries_count, factory)
+        queries = make_queries(entries, queries_count, factory)
+        for name, build in (("prefix_index", PrefixIndex), ("sorted_list", SortedListIndex)):
+            index, stats = measure(build, entries)
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                index.find(query, size)
+                latencies.append((time.perf_counter() - start) * 1_000_000)
+            percentiles = statistics.quantiles(latencies, n=100)
+            results.append({
+                "entries": kind,
+                "index": name,
+                **stats,
+                "p50_us": round(percentiles[49], 1),
+                "p99_us": round(percentiles[98], 1),
+            })
+            del index
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Suggest index benchmark.")
+    parser.add_argument("--entries", type=int, default=100_000, help="Number of films and of persons.")
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--size", type=int, default=10, help="Suggestions per query.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.entries, args.queries, args.size)
+    if args.json:
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
+        return
+    columns = list(results[0].keys())
+    print("".join(f"{column:>16}" for column in columns))
+    for result in results:
+        print("".join(f"{result[column]!s:>16}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
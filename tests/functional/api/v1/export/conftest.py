@@ -0,0 +1,18 @@
+import pytest
+
+from movies.domain.films.schemas import FilmAccessType, FilmDetail
+from tests.functional.utils.helpers import add_film_document_to_elastic
+
+pytestmark = [pytest.mark.asyncio]
+
+
+@pytest.fixture
+def films_dto(model_factory) -> list[FilmDetail]:
+    films_ = model_factory.create_factory(FilmDetail, access_type=FilmAccessType.PUBLIC.value).batch(size=5)
+    return films_
+
+
+@pytest.fixture
+async def films_es(elastic, films_dto):
+    for film in films_dto:
+        await add_film_document_to_elastic(elastic, film)
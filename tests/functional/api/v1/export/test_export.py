@@ -0,0 +1,62 @@
+import orjson
+import pytest
+
+from ..base import BaseClientTest
+
+pytestmark = [pytest.mark.asyncio]
+
+
+class TestExport(BaseClientTest):
+    """Tests for the bulk export."""
+
+    endpoint = "/api/v1/export/"
+
+    async def test_export_ok(self, films_es, films_dto):
+        """All public films are exported as NDJSON sorted by uuid."""
+        got = await self.client.get(f"{self.endpoint}/films")
+
+        uuids = [orjson.loads(line)["uuid"] for line in got.splitlines()]
+        assert uuids == sorted(str(film.uuid) for film in films_dto)
+
+    async def test_export_resume(self, films_es, films_dto):
+        """Export is resumed after the document from the `after` parameter."""
+        uuids = sorted(str(film.uuid) for film in films_dto)
+
+        got = await self.client.get(f"{self.endpoint}/films", params={"after": uuids[1]})
+
+        assert [orjson.loads(line)["uuid"] for line in got.splitlines()] == uuids[2:]
+
+    async def test_export_slices(self, films_es, films_dto):
+        """Each document is exported in exactly one slice."""
+        exported = []
+        for slice_id in range(2):
+            params = {"slice[id]": slice_id, "slice[max]": 2}
+            got = await self.client.get(f"{self.endpoint}/films", params=params)
+            exported.extend(orjson.loads(line)["uuid"] for line in got.splitlines())
+
+        assert sorted(exported) == sorted(str(film.uuid) for film in films_dto)
+
+    async def test_export_gzip(self, films_es, films_dto):
+        """Export is compressed with gzip if the client accepts it."""
+        headers = {"Accept-Encoding": "gzip"}
+        response = await self.client.get(f"{self.endpoint}/films", headers=headers, as_response=True)
+
+        content = await response.read()
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert len(content.splitlines()) == len(films_dto)
+
+    async def test_export_gzip_refused(self, films_es, films_dto):
+        """Export isn't compressed if the client refuses gzip (`q=0`)."""
+        headers = {"Accept-Encoding": "gzip;q=0"}
+        response = await self.client.get(f"{self.endpoint}/films", headers=headers, as_response=True)
+
+        content = await response.read()
+        assert "Content-Encoding" not in response.headers
+        assert len(content.splitlines()) == len(films_dto)
+
+    async def test_invalid_slice(self, elastic):
+        """If `slice[id]` is not less than `slice[max]`, response with 400 status is returned."""
+        got = await self.client.get(
+            f"{self.endpoint}/films", params={"slice[id]": 2, "slice[max]": 2}, expected_status_code=400)
+
+        assert got["error"]["code"] == "bad_request"
@@ -82,6 +82,10 @@ ES_MOVIES_MAPPING = {
                 "raw": {
                     "type": "keyword",
                 },
+                "suggest": {
+                    "type": "search_as_you_type",
+                    "analyzer": "ru_en",
+                },
             },
         },
         "description": {
@@ -177,6 +181,10 @@ ES_PERSON_MAPPING = {
                 "raw": {
                     "type": "keyword",
                 },
+                "suggest": {
+                    "type": "search_as_you_type",
+                    "analyzer": "ru_en",
+                },
             },
         },
         "films_ids": {
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from fastapi import FastAPI
+
+from movies.api.middlewares import ConcurrencyLimitMiddleware
+from movies.core import concurrency
+from movies.core.config import get_settings
+
+from ..testlib import APIClient
+
+pytestmark = [pytest.mark.asyncio]
+
+
+@pytest.fixture
+def app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/films/search")
+    async def search():
+        concurrency.add_backend_latency(0.01)
+        await asyncio.sleep(0.1)
+        return {"status": "ok"}
+
+    @app.get("/api/v1/films/{uuid}")
+    async def detail(uuid: str):
+        return {"status": "ok"}
+
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        groups={"search": r"^/api/v1/films/search", "detail": r"^/api/v1/films/[^/]+"},
+        retry_after=2,
+        initial_limit=2,
+    )
+    return app
+
+
+async def test_shed_requests(app):
+    """Requests over the limit of their route group are rejected with 503, other groups are not affected."""
+    async with APIClient(app=app, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *(client.request("GET", "/api/v1/films/search") for _ in range(3)),
+            client.request("GET", "/api/v1/films/1"),
+        )
+
+    assert sorted(response.status_code for response in responses[:3]) == [200, 200, 503]
+    assert responses[3].status_code == 200
+    shed = next(response for response in responses if response.status_code == 503)
+    assert shed.headers["Retry-After"] == "2"
+    assert shed.json()["error"]["code"] == "service_unavailable"
+
+
+async def test_limits_reported_by_workers():
+    """Limits are reported on the first request, not when the app is created (e.g. in the gunicorn master)."""
+    app = FastAPI()
+    app.add_middleware(ConcurrencyLimitMiddleware, groups={"reported": r"^/api/v1/reported"}, initial_limit=3)
+
+    assert REGISTRY.get_sample_value("movies_concurrency_limit", {"group": "reported"}) is None
+    async with APIClient(app=app, base_url="http://test") as client:
+        await client.request("GET", "/api/v1/reported")
+
+    assert REGISTRY.get_sample_value("movies_concurrency_limit", {"group": "reported"}) == 3
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/api/v1/films/search", "search"),
+    ("/api/v1/persons/suggest", "suggest"),
+    ("/api/v1/films/suggest", "suggest"),
+    ("/api/v1/films/", "films_list"),
+    ("/api/v1/films/00000000-0000-4000-8000-000000000000", "detail"),
+    ("/api/v1/healthcheck/ready", None),
+])
+async def test_default_groups(path, expected):
+    """Search-as-you-type requests have their own limit, separate from detail lookups."""
+    middleware = ConcurrencyLimitMiddleware(FastAPI(), groups=get_settings().CONCURRENCY_LIMIT_GROUPS)
+
+    group = middleware.get_group(path)
+
+    assert (group[0] if group is not None else None) == expected
@@ -0,0 +1,13 @@
+import pytest
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_metrics(client):
+    """Endpoint /metrics returns request latency by route in the Prometheus format."""
+    await client.get("/api/v1/healthcheck/")
+
+    response = await client.get("/metrics", as_response=True)
+
+    assert response.status_code == 200
+    assert 'movies_http_request_duration_seconds_count{method="GET",route="/api/v1/healthcheck/"' in response.text
@@ -0,0 +1,41 @@
+import pytest
+
+from movies.core.config import get_settings
+from movies.main import create_app
+
+from ..testlib import APIClient
+
+pytestmark = [pytest.mark.asyncio]
+
+PROFILING_TOKEN = "secret"
+
+
+@pytest.fixture
+async def profiling_client(monkeypatch) -> APIClient:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", PROFILING_TOKEN)
+    monkeypatch.setattr(settings, "USE_STUBS", True)
+    async with APIClient(app=create_app(), base_url="http://test") as ac:
+        yield ac
+
+
+async def test_profile_with_token(profiling_client):
+    """Requests with the profiling token are profiled, timings of spans are collected."""
+    headers = {"X-Profile-Token": PROFILING_TOKEN}
+    await profiling_client.get("/api/v1/genres/", headers=headers)
+    await profiling_client.get("/api/v1/healthcheck/")
+
+    profiles = await profiling_client.get("/api/v1/admin/profiles", headers=headers)
+    profile = await profiling_client.get(f"/api/v1/admin/profiles/{profiles[-1]['id']}", headers=headers)
+
+    assert [profile["route"] for profile in profiles] == ["/api/v1/genres/"]
+    assert profile["reason"] == "header"
+    assert {"repository.get_list", "cache.get", "response.render"} <= profile["timings"].keys()
+    assert "cumulative" in profile["stats"]
+
+
+async def test_profiles_require_token(profiling_client):
+    """Profiles are not available without the profiling token."""
+    await profiling_client.get("/api/v1/admin/profiles", expected_status_code=401)
+    await profiling_client.get("/api/v1/admin/profiles", headers={"X-Profile-Token": "wrong"}, expected_status_code=401)
@@ -0,0 +1,54 @@
+import pytest
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from movies.core.config import get_settings
+from movies.main import create_app
+
+from ..testlib import APIClient
+
+pytestmark = [pytest.mark.asyncio]
+
+
+@pytest.fixture
+async def rate_limited_client(monkeypatch) -> APIClient:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMITS", {"/api/v1/films/search": "2/minute"})
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_SHARE", 1.0)
+    monkeypatch.setattr(settings, "USE_STUBS", True)
+    # as behind gunicorn with `forwarded_allow_ips`, the test client's address is the trusted proxy
+    app = ProxyHeadersMiddleware(create_app(), trusted_hosts="127.0.0.1")
+    async with APIClient(app=app, base_url="http://test") as ac:
+        yield ac
+
+
+async def test_rate_limit(rate_limited_client):
+    """Search requests over the limit are rejected with 429 and `Retry-After`, other routes aren't limited."""
+    allowed = [
+        await rate_limited_client.request("GET", "/api/v1/films/search", params={"query": "star"}) for _ in range(2)
+    ]
+
+    response = await rate_limited_client.request("GET", "/api/v1/films/search", params={"query": "star"})
+    unlimited = await rate_limited_client.request("GET", "/api/v1/films/")
+
+    assert [allowed_response.status_code for allowed_response in allowed] == [200, 200]
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert response.json()["error"]["code"] == "too_many_requests"
+    assert unlimited.status_code == 200
+    assert "Retry-After" not in unlimited.headers
+
+
+async def test_rate_limit_forwarded_clients(rate_limited_client):
+    """Anonymous clients behind the proxy are limited by their forwarded addresses, not by the proxy's one."""
+    for _ in range(2):
+        await rate_limited_client.get(
+            "/api/v1/films/search", params={"query": "star"}, headers={"X-Forwarded-For": "10.0.0.1"})
+
+    limited = await rate_limited_client.request(
+        "GET", "/api/v1/films/search", params={"query": "star"}, headers={"X-Forwarded-For": "10.0.0.1"})
+    other = await rate_limited_client.request(
+        "GET", "/api/v1/films/search", params={"query": "star"}, headers={"X-Forwarded-For": "10.0.0.2"})
+
+    assert limited.status_code == 429
+    assert other.status_code == 200
@@ -0,0 +1,43 @@
+import orjson
+import pytest
+
+from movies.core.config import get_settings
+from movies.main import create_app
+
+from ...testlib import APIClient
+
+pytestmark = [pytest.mark.asyncio]
+
+
+@pytest.fixture
+async def stub_client(monkeypatch) -> APIClient:
+    monkeypatch.setattr(get_settings(), "USE_STUBS", True)
+    app = create_app()
+    app.container.elastic_storage().add("movies", [
+        {"uuid": f"00000000-0000-4000-9000-{index:012}", "title": f"Film {index}", "access_type": "public"}
+        for index in range(3)
+    ])
+    async with APIClient(app=app, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "compressed"),
+    [
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("GZIP; q=0.0, deflate", False),
+        ("*;q=1, gzip;q=0", False),
+        ("identity", False),
+    ],
+)
+async def test_export_gzip(stub_client, accept_encoding, compressed):
+    """Export is compressed with gzip only if `Accept-Encoding` accepts it with a non-zero q-value."""
+    response = await stub_client.request("GET", "/api/v1/export/films", headers={"Accept-Encoding": accept_encoding})
+
+    assert response.status_code == 200
+    assert (response.headers.get("Content-Encoding") == "gzip") is compressed
+    # httpx decodes gzip responses
+    assert [orjson.loads(line)["title"] for line in response.content.splitlines()] == ["Film 0", "Film 1", "Film 2"]
@@ -1,4 +1,12 @@
+import asyncio
+
 import pytest
+from dependency_injector import providers
+
+from movies.core import health
+from movies.main import create_app
+
+from ...testlib import APIClient
 
 pytestmark = [pytest.mark.asyncio]
 
@@ -8,3 +16,98 @@ async def test_ok(client):
     response = await client.get("/api/v1/healthcheck/")
 
     assert response["status"] == "ok"
+
+
+async def test_liveness(client):
+    """Endpoint /healthcheck/live returns 200 HTTP status."""
+    response = await client.get("/api/v1/healthcheck/live")
+
+    assert response["status"] == "ok"
+
+
+async def test_readiness():
+    """Worker is ready once resources are initialized and until shutdown."""
+    app = create_app()
+    app.container.dependency_checks.override(providers.Singleton(health.DependencyChecks, checks={}))
+    async with APIClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/healthcheck/ready", expected_status_code=503)
+        assert response == {"status": "not_ready", "reasons": ["startup"]}
+
+        await app.router.startup()
+        response = await client.get("/api/v1/healthcheck/ready")
+        assert response["status"] == "ok"
+
+        await app.router.shutdown()
+        response = await client.get("/api/v1/healthcheck/ready", expected_status_code=503)
+        assert response["reasons"] == ["shutdown"]
+
+
+async def test_readiness_dependencies():
+    """Worker isn't ready while a backend is unavailable, backends are checked concurrently."""
+    async def available():
+        return True
+
+    async def slow():
+        await asyncio.sleep(10)
+        return True
+
+    async def failing():
+        raise ConnectionError
+
+    app = create_app()
+    app.container.dependency_checks.override(
+        providers.Singleton(health.DependencyChecks, checks={"elasticsearch": available, "redis": slow}, timeout=0.1),
+    )
+    async with APIClient(app=app, base_url="http://test") as client:
+        await app.router.startup()
+        response = await client.get("/api/v1/healthcheck/ready", expected_status_code=503)
+        assert response == {
+            "status": "not_ready", "reasons": ["redis"], "checks": {"elasticsearch": True, "redis": False},
+        }
+
+        app.container.dependency_checks.override(
+            providers.Singleton(health.DependencyChecks, checks={"elasticsearch": failing, "redis": available}),
+        )
+        response = await client.get("/api/v1/healthcheck/ready", expected_status_code=503)
+        assert response["reasons"] == ["elasticsearch"]
+
+        app.container.dependency_checks.override(
+            providers.Singleton(health.DependencyChecks, checks={"elasticsearch": available, "redis": available}),
+        )
+        response = await client.get("/api/v1/healthcheck/ready")
+        assert response == {"status": "ok", "checks": {"elasticsearch": True, "redis": True}}
+        await app.router.shutdown()
+
+
+async def test_deep_health():
+    """Deep health reports backends probed in the background, 200 if a backend is degraded, 503 if it's down."""
+    async def elasticsearch():
+        return {"status": health.OK, "cluster_status": "green"}
+
+    async def redis_sentinel():
+        return {"status": health.DEGRADED, "sentinels": 1}
+
+    async def redis_master():
+        return False
+
+    app = create_app()
+    async with APIClient(app=app, base_url="http://test") as client:
+        probes = health.HealthProbes({"elasticsearch": elasticsearch})
+        app.container.health_probes.override(providers.Object(probes))
+        await probes.probe()
+        response = await client.get("/api/v1/healthcheck/deep")
+        assert response["status"] == health.OK
+        assert response["backends"]["elasticsearch"]["details"] == {"cluster_status": "green"}
+
+        probes = health.HealthProbes({"elasticsearch": elasticsearch, "redis_sentinel": redis_sentinel})
+        app.container.health_probes.override(providers.Object(probes))
+        await probes.probe()
+        response = await client.get("/api/v1/healthcheck/deep")
+        assert response["status"] == health.DEGRADED
+        assert response["backends"]["redis_sentinel"]["status"] == health.DEGRADED
+
+        probes = health.HealthProbes({"elasticsearch": elasticsearch, "redis_master": redis_master})
+        app.container.health_probes.override(providers.Object(probes))
+        await probes.probe()
+        response = await client.get("/api/v1/healthcheck/deep", expected_status_code=503)
+        assert response["status"] == health.DOWN
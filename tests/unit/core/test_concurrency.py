@@ -0,0 +1,36 @@
+import pytest
+
+from movies.core import concurrency
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_aimd_limiter():
+    """The limit grows while requests are fast and shrinks multiplicatively after slow or failed requests."""
+    limiter = concurrency.AIMDLimiter(initial_limit=2, min_limit=1, max_limit=3, latency_threshold=0.1)
+
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+    limiter.release(0.01)
+    limiter.release(0.01)
+    assert limiter.limit == 3
+
+    assert limiter.try_acquire()
+    limiter.release(0.5)
+    assert limiter.limit == pytest.approx(2.7)
+    assert limiter.try_acquire()
+    limiter.release(0.01, dropped=True)
+    assert limiter.limit == pytest.approx(2.43)
+    assert limiter.in_flight == 0
+
+
+async def test_backend_latency():
+    """The slowest backend call inside the scope is recorded."""
+    concurrency.add_backend_latency(1.0)
+    with concurrency.sample_scope() as sample:
+        concurrency.add_backend_latency(0.2)
+        concurrency.add_backend_latency(0.1)
+
+    assert sample.backend_latency == 0.2
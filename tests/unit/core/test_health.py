@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from movies.core import health
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_health_probes():
+    """Probes are run concurrently, their latency percentiles, details and failures are reported."""
+    async def elasticsearch():
+        return {"status": health.DEGRADED, "cluster_status": "yellow"}
+
+    async def redis_master():
+        return True
+
+    async def redis_replica():
+        await asyncio.sleep(10)
+        return True
+
+    probes = health.HealthProbes(
+        {"elasticsearch": elasticsearch, "redis_master": redis_master, "redis_replica": redis_replica},
+        timeout=0.1,
+    )
+    assert probes.report()["backends"]["redis_master"] == {"status": health.UNKNOWN}
+
+    await probes.probe()
+    report = probes.report()
+
+    assert report["status"] == health.DOWN
+    assert report["backends"]["elasticsearch"]["status"] == health.DEGRADED
+    assert report["backends"]["elasticsearch"]["details"] == {"cluster_status": "yellow"}
+    assert report["backends"]["redis_master"]["status"] == health.OK
+    assert set(report["backends"]["redis_master"]["latency_ms"]) == {"p50", "p95", "p99"}
+    assert report["backends"]["redis_replica"]["status"] == health.DOWN
+    assert report["backends"]["redis_replica"]["latency_ms"] is None
+    assert report["backends"]["redis_replica"]["failures"] == 1
+
+
+async def test_health_probes_latency(mocker):
+    """Backends with high 95th percentile latency are degraded."""
+    async def redis_master():
+        return True
+
+    probes = health.HealthProbes({"redis_master": redis_master}, window=20, latency_threshold=0.5)
+    mocker.patch("movies.core.health.time.perf_counter", side_effect=[0, 0.01] * 18 + [0, 1] * 2)
+    for _ in range(20):
+        await probes.probe()
+
+    backend = probes.report()["backends"]["redis_master"]
+    assert backend["latency_ms"] == {"p50": 10.0, "p95": 1000.0, "p99": 1000.0}
+    assert backend["status"] == health.DEGRADED
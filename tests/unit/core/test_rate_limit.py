@@ -0,0 +1,48 @@
+import pytest
+
+from movies.common.exceptions import ImproperlyConfiguredError
+from movies.core.rate_limit import RateLimit, RateLimiter
+from movies.infrastructure.db.stubs import InMemoryRateLimitStore
+
+pytestmark = [pytest.mark.asyncio]
+
+ROUTE = "/api/v1/films/search"
+
+
+async def test_parse_rate_limit():
+    """Limits are parsed from `<requests>/<period>` strings."""
+    assert RateLimit.parse("60/minute") == RateLimit(requests=60, period=60)
+    assert RateLimit.parse("60/minute").interval == 1
+    with pytest.raises(ImproperlyConfiguredError):
+        RateLimit.parse("60 per minute")
+
+
+async def test_local_buckets(mocker):
+    """Requests are limited by local buckets with a share of the limit, buckets refill at the limit rate."""
+    now = mocker.patch("movies.core.rate_limit.time.monotonic", return_value=1000.0)
+    limiter = RateLimiter(InMemoryRateLimitStore(), {ROUTE: "60/minute"}, local_share=0.05)
+
+    assert [limiter.hit(ROUTE, "ip:1") for _ in range(3)] == [None, None, None]
+    assert limiter.hit(ROUTE, "ip:1") == pytest.approx(1)
+    assert limiter.hit(ROUTE, "ip:2") is None
+    assert limiter.hit("/api/v1/films/", "ip:1") is None
+
+    now.return_value = 1001.0
+    assert limiter.hit(ROUTE, "ip:1") is None
+
+
+async def test_sync(mocker):
+    """Requests of all workers are counted in the store, clients over the limit are blocked until it allows them."""
+    mocker.patch("time.monotonic", return_value=1000.0)
+    store = InMemoryRateLimitStore()
+    workers = [RateLimiter(store, {ROUTE: "10/second"}, local_share=0.5) for _ in range(3)]
+
+    for worker in workers:
+        assert [worker.hit(ROUTE, "user:1") for _ in range(5)] == [None] * 5
+    assert [await worker.sync() for worker in workers] == [1, 1, 1]
+
+    assert workers[2].hit(ROUTE, "user:1") == pytest.approx(0.5)
+    # the first worker has synced before others, it learns about their requests on the next sync
+    assert workers[0].hit(ROUTE, "user:1") is None
+    assert await workers[0].sync() == 1
+    assert workers[0].hit(ROUTE, "user:1") == pytest.approx(0.6)
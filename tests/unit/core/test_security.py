@@ -0,0 +1,80 @@
+import time
+
+import pytest
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from movies.core.security import HMACJWTBackend, JoseJWTBackend, TokenRolesCache
+
+SECRET_KEY = "secret"
+
+
+@pytest.fixture
+def backend():
+    return HMACJWTBackend(SECRET_KEY, "HS256")
+
+
+def test_hmac_backend_same_claims_as_jose(backend):
+    """HMAC backend returns the same claims as `python-jose`."""
+    token = jwt.encode({"roles": ["subscribers"], "exp": int(time.time()) + 60}, SECRET_KEY, algorithm="HS256")
+
+    assert backend.decode(token) == JoseJWTBackend(SECRET_KEY, "HS256").decode(token)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        jwt.encode({"roles": ["subscribers"]}, "another secret", algorithm="HS256"),
+        jwt.encode({"roles": ["subscribers"]}, SECRET_KEY, algorithm="HS512"),
+        jwt.encode({"roles": ["subscribers"], "nbf": int(time.time()) + 60}, SECRET_KEY, algorithm="HS256"),
+        "header.payload.signature",
+        "not a token",
+    ],
+)
+def test_hmac_backend_invalid_token(backend, token):
+    """Tokens with a wrong signature or algorithm, not yet valid and malformed tokens are rejected."""
+    with pytest.raises(JWTError):
+        backend.decode(token)
+
+
+def test_hmac_backend_expired_token(backend):
+    """Expired tokens are rejected."""
+    token = jwt.encode({"roles": ["subscribers"], "exp": int(time.time()) - 1}, SECRET_KEY, algorithm="HS256")
+
+    with pytest.raises(ExpiredSignatureError):
+        backend.decode(token)
+
+
+def test_cache_hit(backend, mocker):
+    """Roles of the same token are cached, the least recently used tokens are evicted."""
+    cache = TokenRolesCache(backend, max_size=2)
+    decode = mocker.spy(backend, "decode")
+    tokens = [jwt.encode({"roles": [str(index)]}, SECRET_KEY, algorithm="HS256") for index in range(3)]
+
+    roles = [cache.get_roles(token) for token in (tokens[0], tokens[1], tokens[0], tokens[2], tokens[1])]
+
+    assert roles == [["0"], ["1"], ["0"], ["2"], ["1"]]
+    assert decode.call_count == 4
+
+
+def test_cache_until_exp(backend, mocker):
+    """Tokens are cached until `exp`, expired tokens are verified again."""
+    cache = TokenRolesCache(backend)
+    now = time.time()
+    token = jwt.encode({"roles": ["subscribers"], "exp": int(now) + 10}, SECRET_KEY, algorithm="HS256")
+
+    assert cache.get_roles(token) == ["subscribers"]
+    mocker.patch("time.time", return_value=now + 11)
+    with pytest.raises(ExpiredSignatureError):
+        cache.get_roles(token)
+
+
+def test_cache_subject(backend, mocker):
+    """Subjects are read from the same cached claims as roles."""
+    cache = TokenRolesCache(backend)
+    decode = mocker.spy(backend, "decode")
+    token = jwt.encode({"roles": ["subscribers"], "sub": "user-1"}, SECRET_KEY, algorithm="HS256")
+
+    assert cache.get_roles(token) == ["subscribers"]
+    assert cache.get_subject(token) == "user-1"
+    assert decode.call_count == 1
@@ -0,0 +1,37 @@
+import orjson
+import pytest
+from opentelemetry.trace import INVALID_SPAN
+
+from movies.core import tracing
+from movies.core.tracing import configure_tracing
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_span_noop():
+    """If tracing is disabled, spans are not recorded."""
+    resource = configure_tracing(enabled=False, service_name="movies")
+    await resource.__anext__()
+
+    with tracing.span("noop") as span:
+        assert span is INVALID_SPAN
+    assert not tracing.is_tracing_enabled()
+
+
+async def test_span_file_exporter(tmp_path):
+    """Spans are exported to a file with one JSON span per line."""
+    file_path = tmp_path / "spans.ndjson"
+    resource = configure_tracing(enabled=True, service_name="movies", exporter="file", file_path=str(file_path))
+    await resource.__anext__()
+
+    with tracing.span("parent"), tracing.span("child", {"db.system": "redis"}):
+        pass
+    with pytest.raises(StopAsyncIteration):
+        await resource.__anext__()
+
+    spans = [orjson.loads(line) for line in file_path.read_text().splitlines()]
+    child, parent = spans
+    assert child["name"] == "child"
+    assert child["attributes"] == {"db.system": "redis"}
+    assert child["parent_id"] == parent["context"]["span_id"]
+    assert not tracing.is_tracing_enabled()
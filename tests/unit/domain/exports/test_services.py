@@ -0,0 +1,68 @@
+import gzip
+
+import orjson
+import pytest
+
+from movies.domain.exports import ExportResource, ExportService, gzip_stream
+
+pytestmark = [pytest.mark.asyncio]
+
+
+class FakeStorage:
+    """Storage that returns pre-defined batches."""
+
+    def __init__(self, batches: list[list[dict]]) -> None:
+        self.batches = batches
+        self.scan_calls = []
+
+    async def scan(self, collection: str, query: dict, **options):
+        self.scan_calls.append((collection, query, options))
+        for batch in self.batches:
+            yield batch
+
+
+@pytest.fixture
+def batches():
+    return [
+        [{"uuid": "1", "title": "First"}, {"uuid": "2", "title": "Second"}],
+        [{"uuid": "3", "title": "Third"}],
+    ]
+
+
+@pytest.fixture
+def storage(batches):
+    return FakeStorage(batches)
+
+
+@pytest.fixture
+def export_service(storage):
+    return ExportService(storage, indices={"films": "movies"}, batch_size=2)
+
+
+async def test_export_ndjson(export_service, batches):
+    """Documents are exported as NDJSON, one chunk per batch."""
+    chunks = [chunk async for chunk in export_service.export(ExportResource.FILMS)]
+
+    assert len(chunks) == len(batches)
+    lines = b"".join(chunks).splitlines()
+    assert [orjson.loads(line) for line in lines] == [doc for batch in batches for doc in batch]
+
+
+async def test_export_options(export_service, storage):
+    """Slice, resume token and filters are passed to the storage."""
+    batches = export_service.iter_batches(
+        ExportResource.FILMS, slice_id=1, max_slices=4, after="2", filter_fields={"access_type": "public"})
+    _ = [batch async for batch in batches]
+
+    collection, query, options = storage.scan_calls[0]
+    assert collection == "movies"
+    assert query == {"query": {"bool": {"filter": {"term": {"access_type": "public"}}}}}
+    assert options == {"batch_size": 2, "slice_id": 1, "max_slices": 4, "search_after": ["2"]}
+
+
+async def test_gzip_stream(export_service, batches):
+    """Compressed stream can be decompressed with gzip."""
+    chunks = [chunk async for chunk in gzip_stream(export_service.export(ExportResource.FILMS))]
+
+    lines = gzip.decompress(b"".join(chunks)).splitlines()
+    assert len(lines) == sum(len(batch) for batch in batches)
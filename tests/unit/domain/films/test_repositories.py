@@ -0,0 +1,128 @@
+import functools
+
+import pytest
+
+from movies.domain.films import FilmFilter, FilmRepository, film_key_factory
+from movies.infrastructure.db.cache import CacheKeyBuilder
+from movies.infrastructure.db.repositories import CacheRepository, ElasticCacheRepository, ElasticRepository
+from movies.infrastructure.db.stubs import InMemoryCache, InMemoryStorage
+
+pytestmark = [pytest.mark.asyncio]
+
+FILMS_COUNT = 30
+GENRES = ["Comedy", "Drama"]
+AGE_RATINGS = ["G", "PG", "R"]
+PERSONS = [f"20000000-0000-4000-8000-{index:012}" for index in range(5)]
+
+
+@pytest.fixture
+def storage():
+    storage = InMemoryStorage()
+    storage.add("movies", [
+        {
+            "uuid": f"00000000-0000-4000-8000-{index:012}", "title": f"Film {index}", "imdb_rating": index / 10,
+            "access_type": "subscription" if index % 3 else "public",
+            "genre": [{"uuid": "00000000-0000-4000-8000-000000000000", "name": GENRES[index % 2]}],
+            "age_rating": AGE_RATINGS[index % 3], "release_date": f"{2000 + index}-01-01",
+            "actors": [{"uuid": PERSONS[index % 4], "full_name": "Actor"}], "writers": [],
+            "directors": [{"uuid": PERSONS[index % 5], "full_name": "Director"}],
+        }
+        for index in range(FILMS_COUNT)
+    ])
+    return storage
+
+
+def make_repository(storage: InMemoryStorage, shared_list_depth: int) -> FilmRepository:
+    return FilmRepository(
+        ElasticCacheRepository(
+            elastic_repository=ElasticRepository(
+                storage, index_name="movies", nested_fields=["genre", "actors", "writers", "directors"]),
+            cache_repository=CacheRepository(InMemoryCache()),
+            key_factory=functools.partial(film_key_factory, CacheKeyBuilder(), 10),
+        ),
+        shared_list_depth=shared_list_depth,
+    )
+
+
+@pytest.mark.parametrize("shared_list_depth", [10, 100])
+@pytest.mark.parametrize("page_number", [1, 2, 3])
+@pytest.mark.parametrize("is_subscriber", [True, False])
+async def test_shared_list_pages(storage, shared_list_depth, page_number, is_subscriber):
+    """Pages from the shared list are the same as pages queried per access type, deeper pages fall back to them."""
+    params = {"page_size": 4, "page_number": page_number, "sort": ["imdb_rating:desc"]}
+    repositories = [make_repository(storage, shared_list_depth), make_repository(storage, 0)]
+
+    if is_subscriber:
+        shared, separate = [await repository.get_all(**params) for repository in repositories]
+    else:
+        shared, separate = [await repository.get_public(**params) for repository in repositories]
+
+    assert shared == separate
+
+
+async def test_shared_list_single_query(storage, mocker):
+    """Pages of both access types are served by a single storage query."""
+    repository = make_repository(storage, 100)
+    search = mocker.spy(storage, "search")
+
+    for page_number in range(1, 4):
+        await repository.get_all(page_size=5, page_number=page_number)
+        await repository.get_public(page_size=5, page_number=page_number)
+
+    assert search.call_count == 1
+
+
+@pytest.mark.parametrize(("filters", "expected"), [
+    (FilmFilter(genre=["comedy"], imdb_rating_gte=2), [20, 22, 24, 26, 28]),
+    (FilmFilter(genre=["Comedy", "DRAMA"], imdb_rating_lte=0.4), [0, 1, 2, 3, 4]),
+    (FilmFilter(age_rating=["G", "R"], release_date_gte="2020-01-01", release_date_lte="2024-12-31"), [20, 21, 23, 24]),
+    (FilmFilter(person=PERSONS[3]), [3, 7, 8, 11, 13, 15, 18, 19, 23, 27, 28]),
+])
+async def test_filters(storage, filters, expected):
+    """Films match all the filters and any of the values of a filter."""
+    repository = make_repository(storage, 0)
+
+    films = await repository.get_all(page_size=FILMS_COUNT, page_number=1, sort=["imdb_rating"], filters=filters)
+
+    assert [round(film.imdb_rating * 10) for film in films] == expected
+
+
+async def test_filters_cache_key(storage, mocker):
+    """Equal filters share cached pages regardless of the order and case of values."""
+    repository = make_repository(storage, 0)
+    search = mocker.spy(storage, "search")
+
+    for filters in (
+        FilmFilter(genre=["Comedy", "Drama"], age_rating=["PG", "G"]),
+        FilmFilter(genre=["drama", "comedy"], age_rating=["G", "PG", "G"]),
+    ):
+        await repository.get_all(page_size=5, page_number=1, filters=filters)
+
+    assert search.call_count == 1
+
+
+async def test_search_cache_key(storage, mocker):
+    """Queries that differ in case, whitespace and Unicode forms share cached pages."""
+    repository = make_repository(storage, 0)
+    search = mocker.spy(storage, "search")
+
+    pages = [
+        await repository.search(query, page_size=5, page_number=1, sort=["imdb_rating:desc"])
+        for query in ("Film 1", " film  1 ", "ＦＩＬＭ 1")
+    ]
+
+    assert search.call_count == 1
+    assert search.call_args.args[1]["query"]["bool"]["must"]["multi_match"]["query"] == "film 1"
+    assert pages[0] and pages[0] == pages[1] == pages[2]
+
+
+async def test_suggest(storage):
+    """Films are suggested by prefixes of their titles, suggestions are cached per normalized prefix."""
+    repository = make_repository(storage, 0)
+
+    suggestions = await repository.suggest("  FILM 1", size=20)
+    cached = await repository.suggest("film  1", size=20)
+
+    assert [suggestion.title for suggestion in suggestions] == ["Film 1", *(f"Film {index}" for index in range(10, 20))]
+    assert cached == suggestions
+    assert await repository.suggest("  ", size=20) == []
@@ -0,0 +1,128 @@
+import pytest
+
+from movies.domain.films import FilmFilter, FilmGenreViews, FilmRatingIndex, FilmRepository
+from movies.infrastructure.db.repositories import ElasticRepository
+from movies.infrastructure.db.stubs import InMemoryStorage, InMemoryViewStore
+
+pytestmark = [pytest.mark.asyncio]
+
+GENRES = ["Comedy", "Sci-Fi"]
+
+
+@pytest.fixture
+def storage():
+    storage = InMemoryStorage()
+    storage.add("genre", [
+        {"uuid": f"00000000-0000-4000-8000-{index:012}", "name": name} for index, name in enumerate(GENRES)
+    ])
+    storage.add("movies", [
+        {
+            "uuid": f"00000000-0000-4000-9000-{index:012}", "title": f"Film {index}", "imdb_rating": index % 7,
+            "access_type": "subscription" if index % 3 else "public",
+            "genre": [{"uuid": f"10000000-0000-4000-8000-{index % 2:012}", "name": GENRES[index % 2]}],
+        }
+        for index in range(40)
+    ])
+    return storage
+
+
+@pytest.fixture
+def depth():
+    return 100
+
+
+@pytest.fixture
+def genre_views(storage, depth):
+    return FilmGenreViews(
+        InMemoryViewStore(),
+        ElasticRepository(storage, index_name="movies"),
+        ElasticRepository(storage, index_name="genre"),
+        enabled=True, sorts=["", "imdb_rating:desc"], depth=depth,
+    )
+
+
+@pytest.mark.parametrize("sort", [None, ["imdb_rating:desc"]])
+@pytest.mark.parametrize("access_type", [None, "public"])
+async def test_view_pages(storage, genre_views, sort, access_type):
+    """Pages from views are the same as pages from Elasticsearch."""
+    repository = FilmRepository(ElasticRepository(storage, index_name="movies"))
+    await genre_views.materialize()
+    filter_fields = {"access_type": access_type} if access_type else None
+
+    for page_number in (1, 2, 6):
+        page = await genre_views.get_page(
+            genre="comedy", sort=sort, access_type=access_type, offset=(page_number - 1) * 4, size=4)
+        expected = await repository.get_all(
+            page_size=4, page_number=page_number, sort=sort, filters=FilmFilter(genre=["Comedy"]),
+            filter_fields=filter_fields,
+        )
+        assert page == expected
+
+
+@pytest.mark.parametrize("depth", [8])
+async def test_truncated_view(genre_views):
+    """Pages beyond the end of a truncated view are not served."""
+    await genre_views.materialize()
+
+    assert len(await genre_views.get_page(genre="comedy", sort=None, access_type=None, offset=4, size=4)) == 4
+    assert await genre_views.get_page(genre="comedy", sort=None, access_type=None, offset=6, size=4) is None
+
+
+async def test_view_not_materialized(genre_views):
+    """Genres and sorts without views are not served."""
+    await genre_views.materialize()
+
+    assert await genre_views.get_page(genre="sci", sort=None, access_type=None, offset=0, size=4) is None
+    assert await genre_views.get_page(genre="comedy", sort=["title"], access_type=None, offset=0, size=4) is None
+
+
+async def test_refresh_lock(genre_views, mocker):
+    """Views are refreshed once per refresh interval."""
+    materialize = mocker.spy(genre_views, "materialize")
+
+    assert await genre_views.refresh()
+    assert not await genre_views.refresh()
+    assert materialize.await_count == 1
+
+
+@pytest.fixture
+def rating_index(storage):
+    return FilmRatingIndex(InMemoryViewStore(), storage, "movies", enabled=True, batch_size=7)
+
+
+@pytest.mark.parametrize("sort", [["imdb_rating:desc"], ["imdb_rating"]])
+@pytest.mark.parametrize("access_type", [None, "public"])
+async def test_rating_index_pages(storage, rating_index, sort, access_type):
+    """Pages from the rating index and from Elasticsearch are the same, films with equal ratings are ordered by id.
+
+    Pages that reach unrated films are queried from Elasticsearch, so every film is listed once.
+    """
+    for index, doc in enumerate(storage.collections["movies"].values()):
+        doc["imdb_rating"] = (7.5 if index % 2 else 8.1) if index < 30 else None
+    repository = FilmRepository(ElasticRepository(storage, index_name="movies"))
+    indexed_repository = FilmRepository(ElasticRepository(storage, index_name="movies"), rating_index=rating_index)
+    filter_fields = {"access_type": access_type} if access_type else None
+    films_count = 40 if access_type is None else 14
+
+    assert await rating_index.sync() == 30
+    films = []
+    for page_number in range(1, films_count // 4 + 2):
+        page = await indexed_repository.get_all(
+            page_size=4, page_number=page_number, sort=sort, filter_fields=filter_fields)
+        expected = await repository.get_all(
+            page_size=4, page_number=page_number, sort=sort, filter_fields=filter_fields)
+        assert page == expected
+        films.extend(film.uuid for film in page)
+    assert len(set(films)) == len(films) == films_count
+    assert await rating_index.get_page(sort=sort, access_type=access_type, offset=0, size=4) is not None
+
+
+async def test_rating_index_unrated_films(storage, rating_index):
+    """Films without rating are not indexed, pages that reach them are not served."""
+    for doc in list(storage.collections["movies"].values())[:10]:
+        doc["imdb_rating"] = None
+
+    assert await rating_index.sync() == 30
+    assert await rating_index.get_page(sort=["imdb_rating:desc"], access_type=None, offset=24, size=4) is not None
+    assert await rating_index.get_page(sort=["imdb_rating:desc"], access_type=None, offset=28, size=4) is None
+    assert await rating_index.get_page(sort=["title"], access_type=None, offset=0, size=4) is None
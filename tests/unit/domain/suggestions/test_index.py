@@ -0,0 +1,53 @@
+import pytest
+
+from movies.domain.films import FilmRepository, FilmSuggestion
+from movies.domain.suggestions import PrefixIndex, SuggestIndex
+from movies.infrastructure.db.repositories import ElasticRepository
+from movies.infrastructure.db.stubs import InMemoryStorage
+
+pytestmark = [pytest.mark.asyncio]
+
+TITLES = ["Star Wars", "Star Trek", "The Wars of the Roses", "Звёздные войны", "star"]
+
+
+@pytest.fixture
+def storage():
+    storage = InMemoryStorage()
+    storage.add("movies", [
+        {"uuid": f"00000000-0000-4000-8000-{index:012}", "title": title} for index, title in enumerate(TITLES)
+    ])
+    return storage
+
+
+async def test_prefix_index():
+    """Labels starting with the query come first, then labels with a word starting with it, then other matches.
+
+    Other matches have a word starting with every query word, in any order.
+    """
+    index = PrefixIndex((str(number), title) for number, title in enumerate(TITLES))
+
+    assert index.find("STAR  w", size=10) == [("0", "Star Wars")]
+    assert index.find("star", size=10) == [("4", "star"), ("1", "Star Trek"), ("0", "Star Wars")]
+    assert index.find("war", size=10) == [("0", "Star Wars"), ("2", "The Wars of the Roses")]
+    assert index.find("ВОЙ", size=10) == [("3", "Звёздные войны")]
+    assert index.find("star", size=2) == [("4", "star"), ("1", "Star Trek")]
+    assert index.find("roses the", size=10) == [("2", "The Wars of the Roses")]
+    assert index.find("wars st", size=10) == [("0", "Star Wars")]
+    assert index.find("star roses", size=10) == []
+    assert index.find(" ", size=10) == []
+
+
+async def test_suggest_index(storage):
+    """Films are suggested from the local index once it's loaded, from Elasticsearch before that."""
+    suggest_index = SuggestIndex(storage, "movies", "title", enabled=True)
+    repository = FilmRepository(ElasticRepository(storage, index_name="movies"), suggest_index=suggest_index)
+    star_wars = FilmSuggestion(uuid="00000000-0000-4000-8000-000000000000", title="Star Wars")
+
+    assert suggest_index.find("star w", size=10) is None
+    assert await repository.suggest("star w", size=10) == [star_wars]
+    assert await repository.suggest("wars star", size=10) == [star_wars]
+    assert await suggest_index.refresh() == len(TITLES)
+    storage.collections["movies"].clear()
+
+    assert await repository.suggest("star w", size=10) == [star_wars]
+    assert await repository.suggest("wars star", size=10) == [star_wars]
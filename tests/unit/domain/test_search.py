@@ -0,0 +1,29 @@
+import pytest
+
+from movies.domain.search import QueryNormalizer, normalize_query
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Star Wars", "star wars"),
+    ("  STAR \t WARS\n", "star wars"),
+    ("ＳＴＡＲ　ｗａｒｓ", "star wars"),
+    ("Straße", "straße"),
+    ("Звёздные  ВОЙНЫ", "звёздные войны"),
+])
+def test_normalize_query(query, expected):
+    """Queries are NFKC-normalized and lowercased like the `lowercase` filter, whitespace is collapsed."""
+    assert normalize_query(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("The Lord of the Rings", "lord rings"),
+    ("Война и мир", "война мир"),
+    ("The The", "the the"),
+])
+def test_remove_stopwords(query, expected):
+    """Stop words of the `ru_en` analyzer are removed unless the query consists of them only."""
+    normalizer = QueryNormalizer(remove_stopwords=True)
+
+    assert normalizer.normalize(query, prefix="films:search") == expected
+    assert normalizer.normalize(query, prefix="films:suggest", prefix_search=True) == normalize_query(query)
+    assert QueryNormalizer().normalize(query, prefix="films:search") == normalize_query(query)
@@ -0,0 +1,63 @@
+import orjson
+import pytest
+
+from movies.domain.films import FilmDetail, FilmList
+from movies.infrastructure.db.repositories import CacheRepository
+
+pytestmark = [pytest.mark.asyncio]
+
+
+class DictCache:
+    """Cache that stores values in a dict."""
+
+    def __init__(self) -> None:
+        self.data = {}
+
+    async def get(self, key: str, /):
+        return self.data.get(key)
+
+    async def set(self, key: str, data: bytes, *, ttl=None) -> bool:
+        self.data[key] = data
+        return True
+
+
+@pytest.fixture
+def cache():
+    return DictCache()
+
+
+@pytest.fixture
+def cache_repository(cache):
+    return CacheRepository(cache)
+
+
+async def test_item_roundtrip(cache, cache_repository, model_factory):
+    """Item is saved as JSON bytes and loaded back."""
+    film = model_factory.create_factory(FilmDetail).build()
+
+    await cache_repository.save_item("films:1", film)
+
+    assert isinstance(cache.data["films:1"], bytes)
+    assert await cache_repository.get_item("films:1", FilmDetail) == film
+
+
+async def test_items_roundtrip(cache_repository, model_factory):
+    """List of items is saved and loaded back."""
+    films = model_factory.create_factory(FilmList).batch(size=3)
+
+    await cache_repository.save_items("films:list", films)
+
+    assert await cache_repository.get_list("films:list", FilmList) == films
+
+
+async def test_legacy_values(cache, cache_repository, model_factory):
+    """Items saved as JSON strings with serialized items can be loaded."""
+    films = model_factory.create_factory(FilmList).batch(size=2)
+    cache.data["films:list"] = orjson.dumps([film.json() for film in films])
+
+    assert await cache_repository.get_list("films:list", FilmList) == films
+
+
+async def test_missing_key(cache_repository):
+    """If there is no value in cache, None is returned."""
+    assert await cache_repository.get_item("films:missing", FilmDetail) is None
@@ -0,0 +1,112 @@
+import pytest
+
+from movies.domain.genres import GenreDetail
+from movies.infrastructure.db.repositories import (
+    ElasticCacheRepository, ElasticRepository, get_identity_map, identity_map_scope,
+)
+
+pytestmark = [pytest.mark.asyncio]
+
+
+@pytest.fixture
+def genre(model_factory):
+    return model_factory.create_factory(GenreDetail).build()
+
+
+@pytest.fixture
+def elastic_repository(mocker, genre):
+    repository = mocker.AsyncMock()
+    repository.index_name = "genre"
+    repository.get_by_id.return_value = genre
+    repository.get_list.return_value = [genre]
+    return repository
+
+
+@pytest.fixture
+def cache_repository(mocker):
+    repository = mocker.AsyncMock()
+    repository.get_item.return_value = None
+    repository.get_list.return_value = None
+    return repository
+
+
+@pytest.fixture
+def storage_repository(elastic_repository, cache_repository):
+    return ElasticCacheRepository(
+        elastic_repository=elastic_repository,
+        cache_repository=cache_repository,
+        key_factory=lambda **kwargs: f"genres:{kwargs.get('doc_id', 'list')}",
+        identity_map=get_identity_map,
+    )
+
+
+async def test_repeated_lookup_in_scope(storage_repository, elastic_repository, cache_repository, genre):
+    """Repeated lookups of the same object within a scope don't go to the cache or the database."""
+    with identity_map_scope():
+        first = await storage_repository.get_by_id(str(genre.uuid), schema_cls=GenreDetail)
+        second = await storage_repository.get_by_id(str(genre.uuid), schema_cls=GenreDetail)
+
+    assert first is second
+    assert cache_repository.get_item.await_count == 1
+    assert elastic_repository.get_by_id.await_count == 1
+
+
+async def test_repeated_list_lookup_in_scope(storage_repository, cache_repository):
+    """Repeated list lookups within a scope go to the cache only once."""
+    with identity_map_scope():
+        await storage_repository.get_list(GenreDetail)
+        await storage_repository.get_list(GenreDetail)
+
+    assert cache_repository.get_list.await_count == 1
+
+
+async def test_lookup_without_scope(storage_repository, cache_repository, genre):
+    """Objects are not memoized outside of a scope."""
+    await storage_repository.get_by_id(str(genre.uuid), schema_cls=GenreDetail)
+    await storage_repository.get_by_id(str(genre.uuid), schema_cls=GenreDetail)
+
+    assert cache_repository.get_item.await_count == 2
+
+
+async def test_scopes_are_isolated(storage_repository, cache_repository, genre):
+    """Objects loaded in one scope are not visible in another one."""
+    with identity_map_scope():
+        await storage_repository.get_by_id(str(genre.uuid), schema_cls=GenreDetail)
+    with identity_map_scope():
+        await storage_repository.get_by_id(str(genre.uuid), schema_cls=GenreDetail)
+
+    assert cache_repository.get_item.await_count == 2
+
+
+async def test_prepare_search_request_filters():
+    """Filters of several fields run in the filter context, filters of nested fields are wrapped in `nested`."""
+    repository = ElasticRepository(storage=None, index_name="movies", nested_fields=["genre"])
+
+    request = repository.prepare_search_request(
+        page_size=10, page_number=2,
+        filter_fields={
+            "access_type": "public",
+            "age_rating": ["G", "PG"],
+            "imdb_rating": {"gte": 7, "lt": 9},
+            "genre.name.raw": {"value": "comedy", "case_insensitive": True},
+        },
+    )
+
+    assert request == {
+        "size": 10, "from": 10,
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"access_type": "public"}},
+                    {"terms": {"age_rating": ["G", "PG"]}},
+                    {"range": {"imdb_rating": {"gte": 7, "lt": 9}}},
+                    {
+                        "nested": {
+                            "path": "genre",
+                            "query": {"term": {"genre.name.raw": {"value": "comedy", "case_insensitive": True}}},
+                        },
+                    },
+                ],
+            },
+        },
+    }
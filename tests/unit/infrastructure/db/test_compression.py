@@ -0,0 +1,42 @@
+import pytest
+
+from movies.common.exceptions import ImproperlyConfiguredError
+from movies.infrastructure.db.compression import CacheCompression
+
+
+@pytest.fixture
+def payload() -> bytes:
+    return b'{"title": "Star Wars"}' * 100
+
+
+def test_small_values_not_compressed():
+    """Values smaller than the threshold are saved as is."""
+    compression = CacheCompression("zlib", min_size=1024)
+
+    assert compression.encode(b"[]") == b"[]"
+
+
+def test_compressed_roundtrip(payload):
+    """Compressed value is prefixed with a header byte and can be decompressed."""
+    compression = CacheCompression("zlib", min_size=1024)
+
+    encoded = compression.encode(payload)
+
+    assert encoded[:1] == b"\x01"
+    assert len(encoded) < len(payload)
+    assert compression.decode(encoded) == payload
+
+
+def test_compressed_and_raw_values_coexist(payload):
+    """Values saved before compression has been enabled are returned as is."""
+    compressed = CacheCompression("zlib", min_size=1024).encode(payload)
+    compression = CacheCompression(None)
+
+    assert compression.decode(payload) == payload
+    assert compression.decode(compressed) == payload
+
+
+def test_unknown_algorithm():
+    """Unknown compression algorithm can't be used."""
+    with pytest.raises(ImproperlyConfiguredError):
+        CacheCompression("xxx")
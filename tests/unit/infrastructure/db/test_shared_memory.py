@@ -0,0 +1,113 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from movies.infrastructure.db.cache import TieredCache
+from movies.infrastructure.db.shared_memory import FILE_HEADER_SIZE, SharedMemoryCache
+from movies.infrastructure.db.stubs import InMemoryCache
+
+pytestmark = [pytest.mark.asyncio]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache")
+
+
+@pytest.fixture
+def cache(path):
+    cache = SharedMemoryCache(path, slots=8, slot_size=128, default_ttl=60)
+    yield cache
+    cache.close()
+
+
+async def test_get_set(cache):
+    """Values are saved and read by keys, values larger than a slot are not saved."""
+    assert await cache.get("films:1") is None
+    assert await cache.set("films:1", b"film")
+    assert not await cache.set("films:2", b"x" * 128)
+
+    assert await cache.get("films:1") == b"film"
+    assert await cache.get("films:2", default=b"") == b""
+
+
+async def test_expiration(cache, mocker):
+    """Values expire in `ttl` seconds."""
+    await cache.set("films:1", b"film", ttl=10)
+    now = time.time()
+
+    mocker.patch("movies.infrastructure.db.shared_memory.time.time", return_value=now + 5)
+    assert await cache.get("films:1") == b"film"
+    mocker.patch("movies.infrastructure.db.shared_memory.time.time", return_value=now + 11)
+    assert await cache.get("films:1") is None
+
+
+async def test_eviction(cache):
+    """Keys replace values that expire first if all slots of the key are taken."""
+    for index in range(100):
+        await cache.set(f"films:{index}", str(index).encode(), ttl=100 + index)
+
+    values = [await cache.get(f"films:{index}") for index in range(100)]
+
+    assert values[-1] == b"99"
+    assert len([value for value in values if value is not None]) <= 8
+
+
+def _set_in_process(path: str) -> None:
+    cache = SharedMemoryCache(path, slots=8, slot_size=128)
+    asyncio.run(cache.set("films:1", b"film"))
+    cache.close()
+
+
+async def test_shared_by_processes(cache, path):
+    """Values saved by a process are read by others."""
+    process = multiprocessing.get_context("fork").Process(target=_set_in_process, args=(path,))
+    process.start()
+    process.join()
+
+    assert await cache.get("films:1") == b"film"
+
+
+async def test_reinit_on_layout_change(cache, path):
+    """A table with another layout is recreated."""
+    await cache.set("films:1", b"film")
+    other = SharedMemoryCache(path, slots=16, slot_size=128)
+
+    assert await other.get("films:1") is None
+    other.close()
+
+
+async def test_layout_change_keeps_mapped_tables(cache, path):
+    """A smaller table replaces the file without truncating it under processes that have mapped it."""
+    await cache.set("films:1", b"film")
+    other = SharedMemoryCache(path, slots=4, slot_size=128)
+
+    assert await cache.get("films:1") == b"film"
+    assert await other.get("films:1") is None
+    other.close()
+
+
+async def test_torn_read(cache):
+    """Slots that are being written are not read."""
+    await cache.set("films:1", b"film")
+    for slot in range(cache.slots):
+        # an odd version: the slot is being written
+        cache._mm[FILE_HEADER_SIZE + slot * cache.slot_size] |= 1
+
+    assert await cache.get("films:1") is None
+
+
+async def test_tiered_cache(cache):
+    """Values are read from the local cache first, remote values are copied to it."""
+    remote = InMemoryCache()
+    tiered = TieredCache(remote, cache, local_ttl=10)
+    await remote.set("films:1", b"film")
+
+    assert await tiered.get("films:1") == b"film"
+    assert await cache.get("films:1") == b"film"
+
+    await tiered.set("films:2", b"other", ttl=60)
+    assert await cache.get("films:2") == b"other"
+    assert await remote.get("films:2") == b"other"
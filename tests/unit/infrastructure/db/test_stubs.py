@@ -0,0 +1,143 @@
+import pytest
+
+from movies.common.exceptions import NotFoundError
+from movies.domain.films import FilmFilter, FilmRepository
+from movies.domain.persons import PersonRepository
+from movies.infrastructure.db.repositories import ElasticRepository
+from movies.infrastructure.db.stubs import InMemoryCache, InMemoryStorage
+
+pytestmark = [pytest.mark.asyncio]
+
+
+@pytest.fixture
+def films():
+    return [
+        {
+            "uuid": "1", "title": "Star Wars", "imdb_rating": 8.6, "access_type": "public",
+            "genres_names": ["Sci-Fi"], "genre": [{"uuid": "g1", "name": "Sci-Fi"}],
+            "actors": [{"uuid": "a1", "full_name": "Mark Hamill"}],
+        },
+        {
+            "uuid": "2", "title": "Star Trek", "imdb_rating": 7.9, "access_type": "subscription",
+            "genres_names": ["Sci-Fi"], "genre": [{"uuid": "g1", "name": "Sci-Fi"}],
+            "actors": [{"uuid": "a2", "full_name": "William Shatner"}],
+        },
+        {
+            "uuid": "3", "title": "The Wars of the Roses", "imdb_rating": None, "access_type": "public",
+            "genres_names": ["Comedy"], "genre": [{"uuid": "g2", "name": "Comedy"}],
+            "actors": [{"uuid": "a1", "full_name": "Mark Hamill"}],
+        },
+    ]
+
+
+@pytest.fixture
+def storage(films):
+    storage = InMemoryStorage()
+    storage.add("movies", films)
+    return storage
+
+
+@pytest.fixture
+def repository(storage):
+    return ElasticRepository(storage, index_name="movies", nested_fields=["genre", "actors"])
+
+
+async def test_get_by_id(storage, films):
+    """Document is returned by id, `NotFoundError` is raised for unknown ids."""
+    assert await storage.get_by_id("2", collection="movies") == films[1]
+    with pytest.raises(NotFoundError):
+        await storage.get_by_id("4", collection="movies")
+
+
+async def test_search_multi_match(storage, repository):
+    """Full-text search matches any of the query words, documents with more matched words go first."""
+    query = repository.prepare_search_request(search_query="star wars", search_fields=["title", "genres_names"])
+
+    docs = await storage.search("movies", query)
+
+    assert [doc["uuid"] for doc in docs] == ["1", "2", "3"]
+
+
+async def test_search_bool_prefix(storage, repository):
+    """Search-as-you-type queries match all words, the last one as a prefix, and return only source fields."""
+    query = repository.prepare_search_request(
+        search_query="star w", search_fields=FilmRepository.es_film_suggest_fields, search_type="bool_prefix",
+        source_fields=["uuid", "title"], page_size=10, page_number=1,
+    )
+
+    docs = await storage.search("movies", query)
+
+    assert query["_source"] == ["uuid", "title"]
+    assert query["query"]["bool"]["must"]["multi_match"]["operator"] == "and"
+    assert [doc["uuid"] for doc in docs] == ["1"]
+    assert all(doc.keys() == {"uuid", "title"} for doc in docs)
+
+
+async def test_search_filter_sort_and_pagination(storage, repository):
+    """Term filter, sorting (missing values go last) and `from`/`size` are supported."""
+    query = repository.prepare_search_request(
+        page_size=1, page_number=2, filter_fields={"access_type": "public"})
+
+    docs = await storage.search("movies", query, sort=["imdb_rating:desc"])
+
+    assert [doc["uuid"] for doc in docs] == ["3"]
+
+
+async def test_search_nested_term(storage):
+    """Person films query (nested terms in `should` clauses) is supported."""
+    query = PersonRepository.prepare_films_search_request("a1")
+
+    docs = await storage.search("movies", query, sort=["uuid"])
+
+    assert [doc["uuid"] for doc in docs] == ["1", "3"]
+
+
+async def test_search_film_genre(storage, repository):
+    """Films are filtered by an exact case-insensitive genre name."""
+    query = repository.prepare_search_request(**FilmRepository.get_list_request_options(FilmFilter(genre=["sci-fi"])))
+
+    docs = await storage.search("movies", query, sort=["uuid"])
+
+    assert [doc["uuid"] for doc in docs] == ["1", "2"]
+
+
+async def test_search_range_and_terms_filters(storage, repository):
+    """Range and terms filters are supported."""
+    query = repository.prepare_search_request(
+        filter_fields={"imdb_rating": {"gte": 8}, "access_type": ["public", "subscription"]})
+
+    docs = await storage.search("movies", query)
+
+    assert [doc["uuid"] for doc in docs] == ["1"]
+
+
+async def test_unsupported_query(storage):
+    """Unsupported queries are not silently ignored."""
+    with pytest.raises(ValueError, match="Query `fuzzy` is not supported"):
+        await storage.search("movies", {"query": {"fuzzy": {"title": "star"}}})
+
+
+async def test_scan_slices(storage):
+    """Slices don't overlap, documents are sorted by `uuid` and iteration can be resumed."""
+    sliced = [await _scan(storage, batch_size=1, slice_id=slice_id, max_slices=2) for slice_id in range(2)]
+    resumed = await _scan(storage, batch_size=2, search_after=["1"])
+
+    assert sorted(sliced[0] + sliced[1]) == ["1", "2", "3"]
+    assert all(uuids == sorted(uuids) for uuids in sliced)
+    assert resumed == ["2", "3"]
+
+
+async def test_cache_ttl():
+    """Values expire after ttl."""
+    cache = InMemoryCache()
+
+    await cache.set("key", b"value")
+    await cache.set("expired", b"value", ttl=0)
+
+    assert await cache.get("key") == b"value"
+    assert await cache.get("expired") is None
+    assert await cache.get("unknown") is None
+
+
+async def _scan(storage: InMemoryStorage, **options) -> list[str]:
+    return [doc["uuid"] async for batch in storage.scan("movies", {}, **options) for doc in batch]
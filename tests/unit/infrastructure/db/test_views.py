@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+
+from movies.infrastructure.db.views import HEADER_COMPLETE, HEADER_TRUNCATED, RedisViewStore, pack_ids
+
+pytestmark = [pytest.mark.asyncio]
+
+IDS = [str(uuid.uuid4()) for _ in range(3)]
+
+
+@pytest.fixture
+def client(mocker):
+    return mocker.AsyncMock()
+
+
+@pytest.mark.parametrize(
+    "header, offset, expected",
+    [
+        (HEADER_COMPLETE, 1, IDS[1:]),
+        (HEADER_COMPLETE, 2, IDS[2:]),
+        (HEADER_TRUNCATED, 1, IDS[1:]),
+        (HEADER_TRUNCATED, 2, None),
+    ],
+)
+async def test_get_page(client, header, offset, expected):
+    """Pages are unpacked from the byte range, pages beyond the end of a truncated view are not served."""
+    client.pipeline.return_value = [header, len(header) + 16 * len(IDS), pack_ids(IDS)[offset * 16:]]
+
+    assert await RedisViewStore(client).get_page("view", offset, 2) == expected
+    _, commands = client.pipeline.await_args.args
+    assert commands[-1] == ("GETRANGE", "view", 1 + offset * 16, 1 + (offset + 2) * 16 - 1)
+
+
+async def test_get_page_missing_view(client):
+    """Missing views are not served."""
+    client.pipeline.return_value = [b"", 0, b""]
+
+    assert await RedisViewStore(client).get_page("view", 0, 2) is None
+
+
+async def test_get_ranked_page(client):
+    """Ranked pages are read with `ZREVRANGE`, pages beyond the end of the ranking are not served."""
+    client.pipeline.return_value = [3, [doc_id.encode() for doc_id in IDS[1:]]]
+
+    assert await RedisViewStore(client).get_ranked_page("ranking", 1, 2, descending=True) == IDS[1:]
+    assert await RedisViewStore(client).get_ranked_page("ranking", 2, 2, descending=True) is None
+    _, commands = client.pipeline.await_args.args
+    assert commands[-1] == ("ZREVRANGE", "ranking", 2, 3)